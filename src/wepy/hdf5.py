@@ -43,6 +43,7 @@ The items right under the root of the tree are:
 
 - runs
 - topology
+- units
 - _settings
 
 The first item 'runs' is itself a group that contains all of the
@@ -59,9 +60,19 @@ a frame of atom positions. This information is placed in the
 The topology field has no specified internal structure at this
 time. However, with the current implementation of the WepyHDF5Reporter
 (which is the principal implementation of generating a WepyHDF5
-object/file from simulations) this is simply a string dataset. This
-string dataset should be a JSON compliant string. The format of which
-is specified elsewhere and was borrowed from the mdtraj library.
+object/file from simulations) it is a JSON compliant string. The
+format of which is specified elsewhere and was borrowed from the
+mdtraj library.
+
+How the string is stored depends on the format version of the file
+(see '_settings' below):
+
+- version 1: a scalar variable length string dataset.
+- version 2: a 1-D uint8 dataset of the UTF-8 encoded string,
+  chunked and gzip compressed. Reading it directly with h5py gives
+  the byte array, which must be decoded to get the JSON string.
+
+The `get_topology` method reads both.
 
 Warning! this format and specification for the topology is subject to
 change in the future and will likely be kept unspecified indefinitely.
@@ -96,6 +107,56 @@ sparse trajectory fields.
 The '_settings' is specified as a simple key-value structure, however
 values may be arbitrarily complex.
 
+The '_settings' group has a 'format_version' attribute with the
+version of the layout of the file when it was created. Files without
+it have the version 1 layout. Files are created with the version 2
+layout unless the version 1 layout is asked for (with the
+`format_version` constructor option) so that they can be read by
+older versions of wepy. Readers accept the layouts of both
+versions for each item, since runs may be added to or linked into
+files of the other version.
+
+Settings
+^^^^^^^^
+
+The items of '_settings' holding the information about the
+trajectory fields are laid out differently in the two versions.
+
+The feature shapes and dtypes of the trajectory fields:
+
+- version 1: the groups 'field_feature_shapes' and
+  'field_feature_dtypes' with a dataset for each field path. A shape
+  is an integer array (a scalar NaN if unspecified) and a dtype is the
+  JSON string of the numpy dtype descr (or 'None').
+
+- version 2: the single compound dataset 'fields_meta' with a row for
+  each field and the variable length string columns:
+
+  - path : the trajectory field path
+  - shape : the JSON list of the feature shape, or 'None'
+  - dtype : the JSON string of the numpy dtype descr, or 'None'
+
+  Rows are added or updated as the shapes and dtypes of fields are
+  set at runtime.
+
+The atom indices of the alternate representations, 'alt_reps_idxs':
+
+- version 1: a group with an integer dataset of the atom indices for
+  each alt rep name.
+
+- version 2: a compound dataset with a row for each alt rep and the
+  columns 'name' (variable length string) and 'idxs' (variable length
+  int64 array).
+
+The units of the trajectory fields are in the 'units' item at the
+root:
+
+- version 1: a group with a scalar string dataset of the unit for
+  each field path given one.
+
+- version 2: a compound dataset with a row for each field given a
+  unit and the variable length string columns 'path' and 'unit'.
+
 Runs
 ----
 
@@ -329,9 +390,35 @@ negligent to rely on outside sources (such as the filesystem) for the
 initial structures that seeded the simulations. These states (and
 weights) can be stored in this group.
 
-The format of this group is identical to the one for trajectories
-except that there is only one frame for each slot and so the shape of
-the datasets for each field is just the shape of the feature vector.
+In the version 1 layout (which is also used in version 2 files when
+the walkers don't all have the same fields with the same shapes) the
+group has a sub-group for each walker index. The format of these is
+identical to the one for trajectories except that there is only one
+frame for each slot and so the shape of the datasets for each field
+is just the shape of the feature vector.
+
+In the version 2 layout the walkers are packed like the frames of a
+single trajectory: the group has a dataset for each field, plus
+'weights', with the walkers along the first dimension. So the
+'positions' of 8 walkers with 100 atoms is a dataset of shape (8,
+100, 3) and the 'weights' of shape (8, 1). A packed group is told
+apart by its 'weights' item being a dataset.
+
+Decision
+^^^^^^^^
+
+The 'decision' group holds the enumeration of the decision types of
+the resampling records, mapping each decision name (e.g. 'CLONE') to
+the integer 'decision_id' used for it in the records:
+
+- version 1: a scalar integer dataset for each decision name.
+
+- version 2: a single scalar compound dataset named '_enum' with a
+  field for each decision name holding its integer value, stored with
+  the compact layout. It is told apart from the datasets of the
+  version 1 layout by its name.
+
+The `decision_enum` method reads both.
 
 Record Groups
 ^^^^^^^^^^^^^
@@ -389,14 +476,19 @@ it is a fairly straightforward task from a developers perspective.
 
 """
 
+import os
 import os.path as osp
-from collections import Sequence, namedtuple, defaultdict, Counter
+from collections import namedtuple, defaultdict, Counter
+from collections.abc import Sequence
 import itertools as it
 import json
 from warnings import warn
 from copy import copy
 import logging
 import gc
+import multiprocessing as mp
+from functools import lru_cache, partial
+from contextlib import contextmanager
 
 import numpy as np
 import h5py
@@ -427,6 +519,25 @@ except ModuleNotFoundError:
 # in a new virtualenv if this is a problem for you
 H5PY_LIBVER = 'latest'
 
+# variable length strings are not supported by numpy so this is the
+# 'special' h5py datatype for them, made once here since it is used
+# for all of the string datasets
+VLEN_STR_DTYPE = h5py.special_dtype(vlen=str)
+"""The h5py datatype for variable length strings."""
+
+# the raw data chunk cache of HDF5 defaults to 1 MiB which is smaller
+# than a single chunk of the trajectory fields of most systems, in
+# which case every read of a frame would decompress its chunk again
+RDCC_NBYTES = 64 * 1024**2
+"""Default size in bytes of the raw data chunk cache for each dataset."""
+
+RDCC_NSLOTS = 10007
+"""Default number of chunk slots in the raw data chunk cache hash
+table. Should be a prime number."""
+
+RDCC_W0 = 0.75
+"""Default chunk preemption policy of the raw data chunk cache."""
+
 ## Header and settings keywords
 
 TOPOLOGY = 'topology'
@@ -435,6 +546,15 @@ TOPOLOGY = 'topology'
 SETTINGS = '_settings'
 """Name of the settings group in the header group."""
 
+FORMAT_VERSION_STR = 'format_version'
+"""Attribute of the settings group with the format version of the
+layout of the file."""
+
+FORMAT_VERSION = 2
+"""The default format version of the layout of files created
+here. Files without a format version attribute have the version 1
+layout."""
+
 RUNS = 'runs'
 """The group name for runs."""
 
@@ -443,6 +563,10 @@ RUNS = 'runs'
 RUN_IDX = 'run_idx'
 """Metadata field for run groups for the run index within this file."""
 
+RUN_N_CYCLES = 'n_cycles'
+"""Metadata field for run groups for the number of cycles the run was
+expected to have when it was created, if it was given."""
+
 RUN_START_SNAPSHOT_HASH = 'start_snapshot_hash'
 """Metadata field for a run that corresponds to the hash of the
 starting simulation snapshot in orchestration."""
@@ -485,6 +609,21 @@ FIELD_FEATURE_SHAPES_STR = 'field_feature_shapes'
 FIELD_FEATURE_DTYPES_STR = 'field_feature_dtypes'
 """Settings field name for the trajectory field data types."""
 
+FIELDS_META = 'fields_meta'
+"""Settings field name for the table of trajectory field shapes and
+data types. Supersedes the FIELD_FEATURE_SHAPES_STR and
+FIELD_FEATURE_DTYPES_STR groups, which are still read from older
+files."""
+
+CHUNK_BYTES = 'chunk_bytes'
+"""Settings field name for the target size in bytes of the chunks of
+trajectory field datasets."""
+
+FIELD_FILTERS = 'field_filters'
+"""Settings field name for the JSON encoded HDF5 filter options
+(compression, shuffle and scale-offset) used for the compressed
+trajectory fields."""
+
 UNITS = 'units'
 """Settings field name for the units of the trajectory fields."""
 
@@ -506,6 +645,11 @@ INIT_WALKERS = 'init_walkers'
 DECISION = 'decision'
 """Run field name for the decision enumeration group."""
 
+DECISION_ENUM = '_enum'
+"""Name of the compound dataset in the decision group holding the
+value of every decision, older files have a dataset for each decision
+instead."""
+
 ## Record Groups Names
 RESAMPLING = 'resampling'
 """Record group run field name for the resampling records """
@@ -598,7 +742,7 @@ OBSERVABLES = 'observables'
 WEIGHT_SHAPE = (1,)
 """Weights feature vector shape."""
 
-WEIGHT_DTYPE = np.float
+WEIGHT_DTYPE = np.float64
 """Weights feature vector data type."""
 
 # Default Trajectory Field Constants
@@ -610,17 +754,22 @@ FIELD_FEATURE_SHAPES = ((TIME, (1,)),
                         )
 """Default shapes for the default fields."""
 
-FIELD_FEATURE_DTYPES = ((POSITIONS, np.float),
-                        (VELOCITIES, np.float),
-                        (FORCES, np.float),
-                        (TIME, np.float),
-                        (BOX_VECTORS, np.float),
-                        (BOX_VOLUME, np.float),
-                        (KINETIC_ENERGY, np.float),
-                        (POTENTIAL_ENERGY, np.float),
+FIELD_FEATURE_DTYPES = ((POSITIONS, np.float64),
+                        (VELOCITIES, np.float64),
+                        (FORCES, np.float64),
+                        (TIME, np.float64),
+                        (BOX_VECTORS, np.float64),
+                        (BOX_VOLUME, np.float64),
+                        (KINETIC_ENERGY, np.float64),
+                        (POTENTIAL_ENERGY, np.float64),
                         )
 """Default data types for the default fields."""
 
+SCALAR_DTYPE_FIELDS = (BOX_VOLUME, KINETIC_ENERGY, POTENTIAL_ENERGY)
+"""Default fields with a single value per frame whose data type can be
+set with the `scalar_dtype` option, e.g. to store them in single
+precision."""
+
 # Positions (and thus velocities and forces) are determined by the
 # N_DIMS (which can be customized) and more importantly the number of
 # particles which is always different. All the others are always wacky
@@ -628,6 +777,62 @@ FIELD_FEATURE_DTYPES = ((POSITIONS, np.float),
 POSITIONS_LIKE_FIELDS = (VELOCITIES, FORCES)
 """Default trajectory fields which are the same shape as the main positions field."""
 
+DEFAULT_CHUNK_BYTES = 256 * 1024
+"""Default target size in bytes (256 KiB) of a single chunk of a
+trajectory field or record dataset."""
+
+COMPRESSED_FIELDS = (POSITIONS, VELOCITIES, FORCES)
+"""Trajectory fields which are compressed, along with all of the
+alt_reps. These hold the bulk of the data in a file."""
+
+COMPRESSED_RECORDS = (RESAMPLING,)
+"""Record groups whose fields, other than variable length ones, are
+compressed. The resampling records have a row for every walker of
+every cycle, which are mostly the same decision."""
+
+COMPRESSION = 'lzf'
+"""Default HDF5 compression filter for the compressed trajectory
+fields."""
+
+SHUFFLE = True
+"""Default for whether the byte shuffle filter is applied before
+compressing the compressed trajectory fields."""
+
+TRACK_TIMES = False
+"""Whether the datasets created record their creation and modification
+times. These are never used and writing them adds to the object
+header of every dataset, and makes otherwise identical files differ."""
+
+FS_STRATEGY = 'page'
+"""Default HDF5 file space strategy for new files. With paged
+aggregation metadata and raw data are allocated in whole pages,
+which keeps files that grow by many small appends from fragmenting.
+The strategy is persisted in the file."""
+
+FS_PAGE_SIZE_CHUNKS = 2
+"""Default file space page size of new files, as a multiple of the
+target chunk size so that a whole chunk always fits into a page."""
+
+H5PY_PAGED_VERSION = (3, 3)
+"""The first h5py version which can set the file space strategy and
+the page buffer size. With older versions these options are ignored."""
+
+MAX_READ_SELECTIONS = 4096
+"""Maximum number of hyperslabs (runs of consecutive frames) selected
+for a single read of frames from a dataset. Selecting is linear in the number of hyperslabs
+already selected so larger reads are split into batches."""
+
+MAX_INMEM_READ_BYTES = 2 * 1024**3
+"""Maximum size in bytes of the span of frames that is read whole, and
+then selected from in memory, when a frame selection (e.g. every Nth
+frame) would touch every chunk of that span anyway."""
+
+MAX_CHUNK_FRAMES = 1024
+"""Maximum number of frames in a single chunk of a trajectory field
+dataset. Chunks are allocated whole, so this keeps the chunks of
+small features (like weights) from being mostly empty for typical
+trajectory lengths."""
+
 ## Trajectory field features keys
 
 # sparse trajectory fields
@@ -637,6 +842,15 @@ DATA = 'data'
 SPARSE_IDXS = '_sparse_idxs'
 """Name of the dataset that indexes sparse trajectory fields."""
 
+def _available_memory():
+    """The amount of available physical memory in bytes, if it can be
+    found for this platform, otherwise None."""
+
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return None
+
 # utility for paths
 def _iter_field_paths(grp):
     """Return all subgroup field name paths from a group.
@@ -661,23 +875,762 @@ def _iter_field_paths(grp):
 
     Returns
     -------
-    subfield_names : list of str
-        The full names for the subfields of the group.
+    subfield_names : list of str
+        The full names for the subfields of the group.
+
+    """
+    # read the sparse fields once instead of for every subfield
+    sparse_fields = set(grp.file['{}/{}'.format(SETTINGS, SPARSE_FIELDS)][:])
+
+    field_paths = []
+    for field_name, field in grp.items():
+        if isinstance(field, h5py.Group):
+
+            # if it is a sparse field don't do the subfields since
+            # they will be _sparse_idxs and data which are not
+            # what we want here
+            if field_name not in sparse_fields:
+                field_paths.extend([field_name + '/' + subfield
+                                    for subfield in field])
+            else:
+                field_paths.append(field_name)
+        else:
+            field_paths.append(field_name)
+    return field_paths
+
+def _default_chunks(feature_shape, dtype, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Chunk shape for a trajectory field or record dataset.
+
+    Chunks span the whole feature vector and as many frames as fit
+    into the target chunk size so that reading consecutive frames of
+    a trajectory touches as few chunks as possible. Only when a
+    single frame is larger than the target size is the feature
+    vector split, by halving its largest dimension until the chunk
+    fits.
+
+    Parameters
+    ----------
+    feature_shape : tuple of int
+        Shape of a single frame's feature vector.
+
+    dtype : dtype_spec
+        The datatype of the field.
+
+    chunk_bytes : int
+        Target size of a chunk in bytes.
+
+    Returns
+    -------
+    chunks : tuple of int
+        Chunk shape including the frame dimension.
+
+    """
+
+    itemsize = np.dtype(dtype).itemsize
+    frame_bytes = int(np.prod(feature_shape, dtype=int)) * itemsize
+
+    if frame_bytes <= chunk_bytes:
+        n_frames = max(1, chunk_bytes // max(1, frame_bytes))
+        n_frames = min(n_frames, MAX_CHUNK_FRAMES)
+
+        return (n_frames, *feature_shape)
+
+    # a single frame doesn't fit so split up the features
+    feature_chunks = list(feature_shape)
+    while int(np.prod(feature_chunks, dtype=int)) * itemsize > chunk_bytes:
+        dim_idx = int(np.argmax(feature_chunks))
+        if feature_chunks[dim_idx] <= 1:
+            break
+        feature_chunks[dim_idx] = -(-feature_chunks[dim_idx] // 2)
+
+    return (1, *feature_chunks)
+
+def _frame_runs(frames):
+    """Split sorted unique frame indices into runs of consecutive frames.
+
+    Parameters
+    ----------
+    frames : numpy.ndarray of int
+        Sorted and unique frame indices.
+
+    Returns
+    -------
+    run_starts : numpy.ndarray of int
+        The first frame of each run.
+
+    run_lengths : numpy.ndarray of int
+        The number of frames in each run.
+
+    """
+
+    if len(frames) == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+
+    # a run ends wherever the next frame isn't the following one
+    breaks = np.flatnonzero(np.diff(frames) != 1) + 1
+
+    run_start_idxs = np.concatenate(([0], breaks))
+    run_end_idxs = np.concatenate((breaks, [len(frames)]))
+
+    return frames[run_start_idxs], run_end_idxs - run_start_idxs
+
+@lru_cache(maxsize=64)
+def _frame_run_reader(feature_shape, dtype):
+    """Make a reader of runs of consecutive frames specialized for
+    datasets with a feature shape and dtype.
+
+    The selection offsets and the memory dataspace for single frames
+    are made once here and reused for every read, bypassing h5py's
+    general purpose slicing.
+
+    Parameters
+    ----------
+    feature_shape : tuple of int
+
+    dtype : numpy.dtype
+
+    Returns
+    -------
+    read_run : callable
+        Function taking the dataset, the first frame and the number of
+        frames, returning the data for those frames.
+
+    """
+
+    feature_start = (0,) * len(feature_shape)
+    frame_mem_space = h5py.h5s.create_simple((1, *feature_shape))
+
+    def read_run(dset, run_start, run_length):
+
+        data = np.empty((run_length, *feature_shape), dtype=dtype)
+
+        if run_length == 1:
+            mem_space = frame_mem_space
+        else:
+            mem_space = h5py.h5s.create_simple(data.shape)
+
+        file_space = dset.id.get_space()
+        file_space.select_hyperslab((int(run_start), *feature_start),
+                                    (int(run_length), *feature_shape))
+
+        dset.id.read(mem_space, file_space, data)
+
+        return data
+
+    return read_run
+
+def _read_batches(run_starts, run_lengths, chunk_frames):
+    """Split runs of frames into batches of at most MAX_READ_SELECTIONS
+    runs for reading, without splitting a chunk between batches.
+
+    Chunks always start at multiples of the number of frames in a
+    chunk so the chunk of each frame is known without looking it up in
+    the file. When two batches would share a chunk it would be read
+    (and decompressed) for both, so the batch is ended before the
+    first run in that chunk.
+
+    Parameters
+    ----------
+    run_starts : numpy.ndarray of int
+        The first frame of each run, increasing.
+    run_lengths : numpy.ndarray of int
+        The number of frames in each run.
+    chunk_frames : int
+        Number of frames in a chunk of the dataset.
+
+    Returns
+    -------
+    batches : list of tuple of int
+        The (start, end) indices of the runs in each batch.
+
+    """
+
+    n_runs = len(run_starts)
+
+    if n_runs <= MAX_READ_SELECTIONS:
+        return [(0, n_runs)]
+
+    # a batch can end before a run if it starts in a later chunk than
+    # the previous run ends in
+    first_chunks = run_starts // chunk_frames
+    last_chunks = (run_starts + run_lengths - 1) // chunk_frames
+    can_split = np.ones(n_runs + 1, dtype=bool)
+    can_split[1:n_runs] = first_chunks[1:] > last_chunks[:-1]
+
+    batches = []
+    batch_start = 0
+    while batch_start < n_runs:
+        batch_end = min(batch_start + MAX_READ_SELECTIONS, n_runs)
+
+        # move the end back to a chunk boundary if there is one
+        split_end = batch_end
+        while split_end > batch_start + 1 and not can_split[split_end]:
+            split_end -= 1
+        if can_split[split_end]:
+            batch_end = split_end
+
+        batches.append((batch_start, batch_end))
+        batch_start = batch_end
+
+    return batches
+
+def _read_whole(dset, out=None):
+    """Read a whole dataset, into a given array if there is one.
+
+    Parameters
+    ----------
+    dset : h5py.Dataset
+
+    out : numpy.ndarray, optional
+        Array of the same shape as the dataset to read into.
+
+    Returns
+    -------
+    data : numpy.ndarray
+        The `out` array if given, otherwise a new array.
+
+    """
+
+    if out is None:
+        return dset[()]
+
+    if out.shape != dset.shape:
+        raise ValueError("out has shape {} but the data has shape {}".format(
+            out.shape, dset.shape))
+
+    # an empty selection can't be read
+    if out.size > 0:
+        dset.read_direct(out)
+
+    return out
+
+def _read_frames_bulk(dset, frames):
+    """Read a selection of frames (rows of the first dimension) from a
+    dataset.
+
+    Rather than reading each frame separately or with h5py's fancy
+    indexing, the frames are coalesced into runs of consecutive
+    frames. A single run is read as a slice, otherwise the runs are
+    all selected as hyperslabs of the dataset's dataspace and read
+    together with a single read (for up to MAX_READ_SELECTIONS runs at
+    a time).
+
+    Parameters
+    ----------
+    dset : h5py.Dataset
+
+    frames : arraylike of int
+        The indices of the frames to read. May be in any order and
+        have repeats.
+
+    Returns
+    -------
+    frames_data : numpy.ndarray
+        The data for the frames in the order they were given.
+
+    """
+
+    frames = np.asarray(frames, dtype=int)
+    feature_shape = dset.shape[1:]
+
+    # the dataspace can only be read in increasing order so we read
+    # the unique frames and reorder them after
+    read_frames, frame_order = np.unique(frames, return_inverse=True)
+
+    run_starts, run_lengths = _frame_runs(read_frames)
+
+    # a single run is just a slice
+    if len(run_starts) == 1:
+        read_run = _frame_run_reader(feature_shape, dset.dtype)
+        data = read_run(dset, run_starts[0], run_lengths[0])
+        return data[frame_order]
+
+    # if the frames are so close together (e.g. strided) that on
+    # average there is one in every chunk, all of the chunks they span
+    # are read anyway so we read the span as a slice and select the
+    # frames from it in memory, if it fits
+    if len(run_starts) > 1:
+
+        span_start = read_frames[0]
+        n_span_frames = read_frames[-1] - span_start + 1
+
+        chunk_frames = dset.chunks[0] if dset.chunks is not None else 1
+        frame_bytes = int(np.prod(feature_shape, dtype=int)) * dset.dtype.itemsize
+
+        if (n_span_frames < len(read_frames) * chunk_frames) and \
+           (n_span_frames * frame_bytes <= MAX_INMEM_READ_BYTES):
+
+            span_data = dset[span_start : span_start + n_span_frames]
+            return span_data[read_frames - span_start][frame_order]
+
+    data = np.empty((len(read_frames), *feature_shape), dtype=dset.dtype)
+
+    # the hyperslab for a run is the whole feature for its frames
+    feature_start = (0,) * len(feature_shape)
+
+    # the position of each run in the read data
+    run_offsets = np.concatenate(([0], np.cumsum(run_lengths)))
+
+    chunk_frames = dset.chunks[0] if dset.chunks is not None else 1
+
+    for batch_start, batch_end in _read_batches(run_starts, run_lengths, chunk_frames):
+
+        file_space = dset.id.get_space()
+        file_space.select_none()
+        for run_start, run_length in zip(run_starts[batch_start:batch_end],
+                                         run_lengths[batch_start:batch_end]):
+            file_space.select_hyperslab((int(run_start), *feature_start),
+                                        (int(run_length), *feature_shape),
+                                        op=h5py.h5s.SELECT_OR)
+
+        batch_data = data[run_offsets[batch_start] : run_offsets[batch_end]]
+        mem_space = h5py.h5s.create_simple(batch_data.shape)
+
+        dset.id.read(mem_space, file_space, batch_data)
+
+    return data[frame_order]
+
+def _write_direct_chunks(dset, start, frames):
+    """Write the whole chunks in a block of frames directly to a
+    dataset, bypassing the HDF5 selection and conversion machinery.
+
+    Only datasets without any filters (e.g. compression) have their
+    chunks written directly, since the stored chunk is then just the
+    bytes of the array. Compressing the chunks here is no faster than
+    letting HDF5 do it.
+
+    The dataset must already be large enough to hold the frames.
+
+    Parameters
+    ----------
+    dset : h5py.Dataset
+
+    start : int
+        Index of the frame the block starts at in the dataset.
+
+    frames : numpy.ndarray
+        The frames of the block.
+
+    Returns
+    -------
+    direct_start, direct_end : int
+        The range of the frames of the block which were written, the
+        others still have to be written.
+
+    """
+
+    n_frames = frames.shape[0]
+    chunks = dset.chunks
+
+    # only chunks spanning whole feature vectors of the same type are
+    # written directly
+    if (chunks is None) or (tuple(chunks[1:]) != tuple(frames.shape[1:])) or \
+       (frames.dtype != dset.dtype) or (not dset.dtype.isnative) or \
+       (dset.dtype.kind not in 'iuf') or \
+       (not hasattr(dset.id, 'write_direct_chunk')):
+        return 0, 0
+
+    chunk_frames = chunks[0]
+
+    # the frames of the whole chunks in the block
+    direct_start = -start % chunk_frames
+    n_chunks = max(0, n_frames - direct_start) // chunk_frames
+    direct_end = direct_start + n_chunks * chunk_frames
+
+    if (n_chunks == 0) or (dset.id.get_create_plist().get_nfilters() > 0):
+        return 0, 0
+
+    feature_offset = (0,) * (len(chunks) - 1)
+    for chunk_start in range(direct_start, direct_end, chunk_frames):
+        chunk = np.ascontiguousarray(frames[chunk_start : chunk_start + chunk_frames])
+        dset.id.write_direct_chunk((start + chunk_start, *feature_offset),
+                                   chunk.tobytes())
+
+    return direct_start, direct_end
+
+# utilities for the fields metadata table
+def _fields_meta_dtype():
+    """The compound datatype of the fields metadata settings table.
+
+    Each row has the field path, the JSON serialized feature shape,
+    and the JSON serialized feature dtype. Unspecified shapes and
+    dtypes are given as the NONE_STR.
+
+    Returns
+    -------
+    fields_meta_dtype : numpy.dtype
+
+    """
+
+    return np.dtype([('path', VLEN_STR_DTYPE),
+                     ('shape', VLEN_STR_DTYPE),
+                     ('dtype', VLEN_STR_DTYPE)])
+
+def _alt_reps_idxs_dtype():
+    """The compound datatype of the alt reps atom indices settings table.
+
+    Each row has the name of the alt rep and the variable length
+    array of the atom indices it includes.
+
+    Returns
+    -------
+    alt_reps_idxs_dtype : numpy.dtype
+
+    """
+
+    return np.dtype([('name', VLEN_STR_DTYPE),
+                     ('idxs', h5py.special_dtype(vlen=np.dtype(np.int64)))])
+
+def _units_dtype():
+    """The compound datatype of the units table.
+
+    Each row has the field path and the string spec of its unit.
+
+    Returns
+    -------
+    units_dtype : numpy.dtype
+
+    """
+
+    return np.dtype([('path', VLEN_STR_DTYPE),
+                     ('unit', VLEN_STR_DTYPE)])
+
+def _field_shape_str(field_shape):
+    """Serialize a feature shape for the fields metadata table.
+
+    Parameters
+    ----------
+    field_shape : None or tuple of int
+
+    Returns
+    -------
+    shape_str : str
+
+    """
+
+    if field_shape is None:
+        return NONE_STR
+    else:
+        return json.dumps([int(i) for i in field_shape])
+
+def _field_dtype_str(field_dtype):
+    """Serialize a feature dtype for the fields metadata table.
+
+    Parameters
+    ----------
+    field_dtype : None or dtype_spec
+
+    Returns
+    -------
+    dtype_str : str
+
+    """
+
+    if field_dtype is None:
+        return NONE_STR
+    else:
+        # we call np.dtype again because there is no np.float.descr
+        # attribute
+        return _dtype_descr_str(np.dtype(field_dtype))
+
+@lru_cache(maxsize=None)
+def _dtype_descr_str(dtype):
+    """Make a JSON string of a datatype that can be read in again.
+
+    Only a handful of distinct dtypes are ever used for the fields so
+    these are memoized.
+
+    Parameters
+    ----------
+    dtype : numpy.dtype
+
+    Returns
+    -------
+    dtype_str : str
+
+    """
+
+    return json.dumps(dtype.descr)
+
+def _field_shape_from_str(shape_str):
+    """Deserialize a feature shape from the fields metadata table.
+
+    Parameters
+    ----------
+    shape_str : str
+
+    Returns
+    -------
+    field_shape : None or tuple of int
+
+    """
+
+    if shape_str == NONE_STR:
+        return None
+    else:
+        return tuple(json.loads(shape_str))
+
+def _field_dtype_from_str(dtype_str):
+    """Deserialize a feature dtype from the fields metadata table.
+
+    Parameters
+    ----------
+    dtype_str : str
+
+    Returns
+    -------
+    field_dtype : None or numpy.dtype
+
+    """
+
+    if dtype_str == NONE_STR:
+        return None
+    else:
+        return _dtype_from_descr_str(dtype_str)
+
+@lru_cache(maxsize=None)
+def _dtype_from_descr_str(dtype_str):
+    """Read a datatype from a JSON string of its descr.
+
+    Parameters
+    ----------
+    dtype_str : str
+
+    Returns
+    -------
+    dtype : numpy.dtype
+
+    """
+
+    dtype_obj = json.loads(dtype_str)
+    dtype_obj = [tuple(d) for d in dtype_obj]
+
+    # the descr of a simple (non-structured) dtype is a single
+    # unnamed field, which would otherwise be read back as a
+    # structured dtype
+    if len(dtype_obj) == 1 and dtype_obj[0][0] == '' and len(dtype_obj[0]) == 2:
+        return np.dtype(dtype_obj[0][1])
+
+    return np.dtype(dtype_obj)
+
+COMPACT_MAX_BYTES = 32 * 1024
+"""Largest settings value (in bytes) stored with the compact layout,
+inside the object header, instead of in a separately allocated block.
+HDF5 caps compact datasets at 64 KiB including the header messages."""
+
+SparseField = namedtuple('SparseField', ['data', 'sparse_idxs', 'n_frames'])
+"""The values of a sparse trajectory field without filling in the
+frames it has no values for.
+
+The `data` rows are the values for the frames (cycles) in
+`sparse_idxs`, out of `n_frames` frames in the trajectory.
+"""
+
+def _masked_frames(data, present):
+    """Make a masked array of the frames of a sparse field where the
+    frames with no values are masked.
+
+    Parameters
+    ----------
+    data : numpy.ndarray
+        The values of the frames which are present in order.
+    present : numpy.ndarray of bool
+        For each frame, whether it has a value.
+
+    Returns
+    -------
+    masked_data : numpy.ma.MaskedArray
+
+    """
+
+    shape = (len(present), *data.shape[1:])
+    missing = ~present
+
+    # each part of the arrays is only written once
+    filled_data = np.empty(shape)
+    filled_data[missing] = np.nan
+    filled_data[present] = data
+
+    # the mask of each frame is the same for all of its features
+    mask = np.empty(shape, dtype=bool)
+    mask[...] = missing.reshape((-1,) + (1,) * (len(shape) - 1))
+
+    return np.ma.masked_array(filled_data, mask=mask)
+
+def _create_compact_dataset(grp, name, data):
+    """Create a small fixed-size dataset with the compact layout so its
+    value is read along with the object header.
+
+    Values too large for the compact layout get the default layout.
+
+    Parameters
+    ----------
+    grp : h5py.Group
+        Group to create the dataset in.
+    name : str
+        Name or path of the dataset relative to the group, its parent
+        group must already exist.
+    data : arraylike or str
+        The value to store, strings are saved as variable length.
+
+    Returns
+    -------
+    dset : h5py.Dataset
+
+    """
+
+    if isinstance(data, str):
+        arr = np.array(data, dtype=h5py.string_dtype())
+        nbytes = len(data.encode())
+    else:
+        arr = np.asarray(data)
+        nbytes = arr.nbytes
+
+    if nbytes > COMPACT_MAX_BYTES:
+        return grp.create_dataset(name, data=arr, track_times=TRACK_TIMES)
+
+    # the high level interface ignores the creation property list for
+    # scalar datasets so we create it directly
+    dcpl = h5py.h5p.create(h5py.h5p.DATASET_CREATE)
+    dcpl.set_layout(h5py.h5d.COMPACT)
+    dcpl.set_obj_track_times(TRACK_TIMES)
+
+    if arr.shape == ():
+        space = h5py.h5s.create(h5py.h5s.SCALAR)
+    else:
+        space = h5py.h5s.create_simple(arr.shape)
+
+    tid = h5py.h5t.py_create(arr.dtype, logical=True)
+    dset = h5py.Dataset(h5py.h5d.create(grp.id, name.encode(), tid, space, dcpl=dcpl))
+    dset[()] = arr
+
+    return dset
+
+@lru_cache(maxsize=2**16)
+def _traj_path(run_idx, traj_idx):
+    """Full path of the group of a trajectory in the file, built once for
+    each trajectory.
+
+    Parameters
+    ----------
+    run_idx : int
+    traj_idx : int
+
+    Returns
+    -------
+    traj_path : str
+
+    """
+
+    return '{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx)
+
+@lru_cache(maxsize=2**16)
+def _traj_field_path(run_idx, traj_idx, field_path):
+    """Full path of a field of a trajectory in the file, built once for
+    each trajectory field.
+
+    Parameters
+    ----------
+    run_idx : int
+    traj_idx : int
+    field_path : str
+
+    Returns
+    -------
+    traj_field_path : str
+
+    """
+
+    return '{}/{}'.format(_traj_path(run_idx, traj_idx), field_path)
+
+@lru_cache(maxsize=1024)
+def _run_path(run_idx, grp_name=None):
+    """Full path of the group of a run, or of one of its subgroups, in
+    the file, built once for each.
+
+    Parameters
+    ----------
+    run_idx : int
+    grp_name : str, optional
+        Name of the subgroup of the run, e.g. a record group.
+
+    Returns
+    -------
+    run_path : str
+
+    """
+
+    if grp_name is None:
+        return '{}/{}'.format(RUNS, int(run_idx))
+    else:
+        return '{}/{}/{}'.format(RUNS, int(run_idx), grp_name)
+
+# the file opened by each worker process of WepyHDF5.traj_fields_map
+_worker_wepy_h5 = None
+
+TRAJ_FIELDS_MAP_START_METHOD = 'spawn'
+"""Start method of the worker processes of WepyHDF5.traj_fields_map.
+
+The processes must not be forked since the file is open in the
+parent, which HDF5 does not support."""
+
+def _init_traj_fields_worker(filename, file_kwargs):
+    """Open a file read-only for a worker process of
+    WepyHDF5.traj_fields_map.
+
+    Parameters
+    ----------
+    filename : str
+    file_kwargs : dict
+        Keyword arguments for the WepyHDF5 constructor.
+
+    """
+
+    global _worker_wepy_h5
+
+    _worker_wepy_h5 = WepyHDF5(filename, mode='r', **file_kwargs)
+    _worker_wepy_h5.open()
+
+def _traj_fields_worker(func, fields, traj_id, *args):
+    """Read the fields of a trajectory in a worker process and apply a
+    function to them.
+
+    Parameters
+    ----------
+    func : callable
+    fields : list of str
+    traj_id : tuple of int
+        The (run_idx, traj_idx) of the trajectory.
+    args : positional arguments to func
+
+    Returns
+    -------
+    result : arraylike
+
+    """
+
+    fields_data = next(_worker_wepy_h5.iter_trajs_fields(fields, traj_sel=[traj_id]))
+
+    return func(fields_data, *args)
+
+def _apply_traj_fields_func(func, call_args):
+    """Apply a function to the fields of a trajectory, sent from
+    WepyHDF5.traj_fields_map, in a worker process.
+
+    Parameters
+    ----------
+    func : callable
+    call_args : tuple
+        The trajectory fields followed by the other positional
+        arguments to func.
+
+    Returns
+    -------
+    result : arraylike
 
     """
-    field_paths = []
-    for field_name in grp:
-        if isinstance(grp[field_name], h5py.Group):
-            for subfield in grp[field_name]:
-
-                # if it is a sparse field don't do the subfields since
-                # they will be _sparse_idxs and data which are not
-                # what we want here
-                if field_name not in grp.file['_settings/sparse_fields']:
-                    field_paths.append(field_name + '/' + subfield)
-        else:
-            field_paths.append(field_name)
-    return field_paths
+
+    return func(*call_args)
 
 class WepyHDF5(object):
     """Wrapper for h5py interface to an HDF5 file object for creation and
@@ -705,6 +1658,22 @@ class WepyHDF5(object):
                  n_dims=None,
                  alt_reps=None, main_rep_idxs=None,
                  swmr_mode=False,
+                 chunk_bytes=None,
+                 scalar_dtype=None,
+                 positions_dtype=None,
+                 compression=COMPRESSION,
+                 compression_opts=None,
+                 shuffle=SHUFFLE,
+                 scaleoffset=None,
+                 rdcc_nbytes=RDCC_NBYTES,
+                 rdcc_nslots=RDCC_NSLOTS,
+                 rdcc_w0=RDCC_W0,
+                 driver=None,
+                 driver_kwargs=None,
+                 page_buf_size=None,
+                 fs_strategy=FS_STRATEGY,
+                 fs_page_size=None,
+                 format_version=FORMAT_VERSION,
                  expert_mode=False
     ):
         """Constructor for the WepyHDF5 class.
@@ -712,7 +1681,9 @@ class WepyHDF5(object):
         Initialize a new Wepy HDF5 file. This will create an h5py.File
         object.
 
-        The File will be closed after construction by default.
+        The File is left open after construction so that it need not be
+        opened again for the first use. It is closed at the end of the
+        first context manager block or by calling `close`.
 
         mode:
         r        Readonly, file must exist
@@ -758,6 +1729,109 @@ class WepyHDF5(object):
             The indices of atom positions to save as the main 'positions'
             trajectory field. Defaults to all atoms.
 
+        swmr_mode : bool
+            If True and the file is opened in a write mode it is
+            switched to single-writer multiple-reader mode every time
+            it is opened, after it has been initialized, so that it
+            can be read while a simulation is writing to it. This
+            requires the 'latest' file format (see H5PY_LIBVER) which
+            is always used. No new datasets can be created in this
+            mode, so all trajectory fields must already exist.
+
+        chunk_bytes : int, optional
+            Target size in bytes of the chunks of trajectory field
+            and record datasets. Only used when creating a file, where it is
+            saved in the settings. Defaults to DEFAULT_CHUNK_BYTES.
+
+        scalar_dtype : dtype_spec, optional
+            Data type to use for the default scalar fields in
+            SCALAR_DTYPE_FIELDS instead of the module defaults,
+            e.g. numpy.float32 to halve their size. Weights are always
+            saved as WEIGHT_DTYPE since they can be too small for
+            single precision.
+
+        positions_dtype : dtype_spec, optional
+            Data type to use for the positions and the positions-like
+            fields (POSITIONS_LIKE_FIELDS) instead of the module
+            defaults, e.g. numpy.float32 which halves the bulk of a
+            file and compresses better with the byte shuffle
+            filter. For lossy compression beyond that see
+            `scaleoffset`.
+
+        compression : str or int or None, default: COMPRESSION
+            HDF5 compression filter (as accepted by h5py) used for the
+            fields in COMPRESSED_FIELDS and the alt_reps. If None
+            these fields are not compressed. Only used when creating a
+            file, where it is saved in the settings.
+
+        compression_opts : optional
+            Options for the compression filter, e.g. the gzip level.
+
+        shuffle : bool, default: SHUFFLE
+            Whether to apply the byte shuffle filter to the compressed
+            fields.
+
+        scaleoffset : int, optional
+            If given, the compressed fields are also stored lossily
+            with HDF5's scale-offset filter, keeping this many decimal
+            digits (e.g. 3 for an accuracy of 1e-3 nm for positions).
+            Only for floating point fields.
+
+        rdcc_nbytes : int, default: RDCC_NBYTES
+            Size in bytes of the raw data chunk cache used for every
+            dataset each time the file is opened.
+
+        rdcc_nslots : int, default: RDCC_NSLOTS
+            Number of slots in the raw data chunk cache hash table.
+
+        rdcc_w0 : float, default: RDCC_W0
+            Chunk preemption policy of the raw data chunk cache.
+
+        driver : str, optional
+            The HDF5 file driver to open the file with each time, see
+            h5py.File. For writing a whole run that fits in memory,
+            e.g. from a reporter, driver='core' with
+            driver_kwargs={'backing_store' : True, 'block_size' : 64 * 1024**2}
+            keeps the file in memory and writes it out once when it is
+            closed.
+
+        driver_kwargs : dict, optional
+            Keyword arguments for the driver.
+
+        page_buf_size : int, optional
+            Size in bytes of the HDF5 page buffer used each time the
+            file is opened. It caches whole file pages (metadata and
+            raw data) and must be at least the file space page
+            size. Only files created with the paged file space
+            strategy (the default) can use it, for others it is
+            skipped with a warning. Needs h5py 3.3 or later (see
+            H5PY_PAGED_VERSION), with older versions, e.g. the h5py 2
+            versions this package is pinned to, it is ignored with a
+            warning.
+
+        fs_strategy : str or None, default: FS_STRATEGY
+            HDF5 file space strategy, see h5py.File. Only used when
+            creating a file. The default paged strategy makes the
+            smallest file two pages large and needs HDF5 1.10 or
+            later which is already required by the 'latest' file
+            format used. If None the HDF5 default is used. Needs h5py
+            3.3 or later to be set, with older versions the HDF5
+            default is always used, with a warning if a strategy
+            other than the default was given.
+
+        fs_page_size : int, optional
+            File space page size in bytes for the paged strategy.
+            Defaults to FS_PAGE_SIZE_CHUNKS times the chunk
+            size. Ignored with a warning for h5py versions older than
+            3.3.
+
+        format_version : int, default: FORMAT_VERSION
+            Format version of the layout to create the file with, see
+            the module documentation. Version 1 is the layout of older
+            files which older versions of wepy can read. Only used
+            when creating a file, later runs are added in the layout
+            of the version saved in it.
+
         expert_mode : bool
             If True no initialization is performed other than the
             setting of the filename. Useful mainly for debugging.
@@ -771,6 +1845,9 @@ class WepyHDF5(object):
         AssertionError
             If a topology is not given for a creation mode.
 
+        AssertionError
+            If the format version is not supported.
+
         Warns
         -----
 
@@ -781,6 +1858,67 @@ class WepyHDF5(object):
         self._filename = filename
         self._swmr_mode = swmr_mode
 
+        # the chunk cache settings are used every time the file is
+        # opened and are not saved in the file
+        self._rdcc_nbytes = rdcc_nbytes
+        self._rdcc_nslots = rdcc_nslots
+        self._rdcc_w0 = rdcc_w0
+
+        self._driver = driver
+        self._driver_kwargs = {} if driver_kwargs is None else dict(driver_kwargs)
+
+        self._page_buf_size = page_buf_size
+
+        # the number of context manager blocks the file is open for
+        # and whether the file is still open from the constructor
+        self._open_count = 0
+        self._init_handle = False
+
+        # handles to objects in the open file by their full path
+        self._h5_cache = {}
+
+        # the sparse fields of the open file as a set
+        self._sparse_fields_set_cache = None
+
+        # the record fields of each record group of the open file
+        self._record_fields_cache = None
+
+        # the feature shapes and dtypes of the trajectory fields of
+        # the open file
+        self._field_feature_shapes_cache = None
+        self._field_feature_dtypes_cache = None
+
+        # the continuations of the open file
+        self._continuations_cache = None
+
+        # the number of runs and the number of trajectories of each
+        # run in the open file
+        self._n_runs_cache = None
+        self._run_n_trajs_cache = {}
+
+        # the mdtraj topologies of the representations of the open
+        # file, by alt_rep
+        self._mdtraj_topology_cache = {}
+
+        # frames waiting to be appended to datasets, by their full
+        # path, when writes are being buffered
+        self._pending_writes = None
+        self._pending_flush_n = None
+
+        # whether the trajectory chunks have been checked against the
+        # size of the chunk cache
+        self._chunk_cache_checked = False
+
+        # in-memory file of empty sparse field groups which are
+        # copied into new trajectories instead of being recreated, and
+        # their paths in it
+        self._traj_templates = None
+        self._traj_template_paths = None
+
+        # the expected number of cycles of the runs of the open file,
+        # by run index
+        self._run_n_cycles_cache = {}
+
         if expert_mode is True:
             self._h5 = None
             self._wepy_mode = None
@@ -793,6 +1931,24 @@ class WepyHDF5(object):
         assert mode in self.MODES, \
           "mode must be either one of: {}".format(', '.join(self.MODES))
 
+        assert format_version in (1, FORMAT_VERSION), \
+          "format_version must be either 1 or {}".format(FORMAT_VERSION)
+
+        # older versions of h5py can't set these so they are dropped
+        # (in _h5py_file_kwargs and _file_space_kwargs), but not
+        # silently unless they are the defaults
+        if h5py.version.version_tuple < H5PY_PAGED_VERSION:
+            ignored_kwargs = [kwarg for kwarg, value, default in
+                              [('page_buf_size', page_buf_size, None),
+                               ('fs_strategy', fs_strategy, FS_STRATEGY),
+                               ('fs_page_size', fs_page_size, None)]
+                              if value != default]
+            if ignored_kwargs:
+                warn("{} need h5py {} or later and are ignored with h5py {}".format(
+                    ', '.join(ignored_kwargs),
+                    '.'.join(str(i) for i in H5PY_PAGED_VERSION),
+                    h5py.version.version), RuntimeWarning)
+
         # the top level mode enforced by wepy.hdf5
         self._wepy_mode = mode
 
@@ -809,6 +1965,16 @@ class WepyHDF5(object):
         self._units = units
         self._n_dims = n_dims
         self._n_coords = None
+        self._chunk_bytes_kwarg = chunk_bytes
+        self._fs_strategy_kwarg = fs_strategy
+        self._fs_page_size_kwarg = fs_page_size
+        self._format_version_kwarg = format_version
+        self._scalar_dtype_kwarg = scalar_dtype
+        self._positions_dtype_kwarg = positions_dtype
+        self._field_filters_kwarg = {'compression' : compression,
+                                     'compression_opts' : compression_opts,
+                                     'shuffle' : shuffle,
+                                     'scaleoffset' : scaleoffset}
 
         # set hidden feature shapes and dtype, which are only
         # referenced if needed when trajectories are created. These
@@ -840,15 +2006,19 @@ class WepyHDF5(object):
             self._alt_reps = {}
 
 
+        # the file space settings can only be set when the file is
+        # created
+        file_kwargs = self._h5py_file_kwargs
+        if (self._wepy_mode in ['w', 'w-', 'x']) or \
+           (self._wepy_mode == 'a' and not osp.exists(filename)):
+            file_kwargs.update(self._file_space_kwargs())
+
         # open the file and then run the different constructors based
-        # on the mode
-        with h5py.File(filename, mode=self._h5py_mode,
-                       libver=H5PY_LIBVER, swmr=self._swmr_mode) as h5:
-            self._h5 = h5
+        # on the mode. The file is kept open afterwards so it doesn't
+        # have to be opened again right away
+        self._h5 = self._open_h5py_file(self._h5py_mode, **file_kwargs)
 
-            # set SWMR mode if asked for if we are in write mode also
-            if self._swmr_mode is True and mode in self.WRITE_MODES:
-                self._h5.swmr_mode = swmr_mode
+        try:
 
             # create file mode: 'w' will create a new file or overwrite,
             # 'w-' and 'x' will not overwrite but will create a new file
@@ -875,24 +2045,38 @@ class WepyHDF5(object):
                 if any([kwarg is not None for kwarg in
                         [topology, units, sparse_fields,
                          feature_shapes, feature_dtypes,
-                         n_dims, alt_reps, main_rep_idxs]]):
+                         n_dims, alt_reps, main_rep_idxs,
+                         chunk_bytes, scalar_dtype, positions_dtype]]):
                    warn("Data was given but opening in read-only mode", RuntimeWarning)
 
                 # then run the initialization process
                 self._read_init()
 
-            # flush the buffers
-            self._h5.flush()
+            # set SWMR mode if asked for if we are in write mode
+            # also, only after initializing since no new objects can
+            # be created in the file afterwards
+            self._start_swmr_write()
 
             # set the h5py mode to the value in the actual h5py.File
             # object after creation
             self._h5py_mode = self._h5.mode
 
+        except:
+            self._h5.close()
+            self.closed = True
+            raise
+
         # get rid of the temporary variables
         del self._topology
         del self._units
         del self._n_dims
         del self._n_coords
+        del self._chunk_bytes_kwarg
+        del self._fs_strategy_kwarg
+        del self._fs_page_size_kwarg
+        del self._scalar_dtype_kwarg
+        del self._positions_dtype_kwarg
+        del self._field_filters_kwarg
         del self._field_feature_shapes_kwarg
         del self._field_feature_dtypes_kwarg
         del self._field_feature_shapes
@@ -901,9 +2085,10 @@ class WepyHDF5(object):
         del self._main_rep_idxs
         del self._alt_reps
 
-        # variable to reflect if it is closed or not, should be closed
-        # after initialization
-        self.closed = True
+        # variable to reflect if it is closed or not, the file is open
+        # from the constructor until it is used or closed
+        self.closed = False
+        self._init_handle = True
 
         # end of the constructor
         return None
@@ -915,14 +2100,168 @@ class WepyHDF5(object):
     # context manager methods
 
     def __enter__(self):
-        self.open()
-        # self._h5 = h5py.File(self._filename,
-        #                      libver=H5PY_LIBVER, swmr=self._swmr_mode)
-        # self.closed = False
+
+        # only open the file for the outermost block
+        if self._open_count == 0:
+            self.open()
+
+        self._open_count += 1
+
         return self
 
     def __exit__(self, exc_type, exc_value, exc_tb):
-        self.close()
+
+        self._open_count -= 1
+
+        if self._open_count == 0:
+            self.close()
+
+    @contextmanager
+    def buffered_writes(self, n=16):
+        """Context manager which buffers the frames appended to
+        trajectory datasets in memory and writes them out together.
+
+        Each dataset is then grown with a single resize and written
+        with a single assignment for all of the frames buffered for
+        it, instead of once per extension. Buffered frames are written
+        when any dataset has `n` extensions pending, when `flush_pending`
+        is called, when the file is closed, and when the block exits.
+
+        Reading from a trajectory first writes out the frames buffered
+        for it, so reads always see the same frames as counted by
+        `num_traj_frames`.
+
+        Parameters
+        ----------
+        n : int or None
+            The number of extensions of a dataset to buffer before
+            writing everything out, e.g. the number of cycles. If None
+            only write out at the end of the block.
+
+        """
+
+        # don't reset the buffer for nested blocks
+        if self._pending_writes is not None:
+            yield self
+            return
+
+        self._pending_writes = {}
+        self._pending_flush_n = n
+        try:
+            yield self
+        finally:
+            try:
+                self.flush_pending()
+            finally:
+                self._pending_writes = None
+                self._pending_flush_n = None
+
+    def flush_pending(self):
+        """Write out all frames buffered by `buffered_writes`."""
+
+        if not self._pending_writes:
+            return
+
+        pending_writes = self._pending_writes
+        self._pending_writes = {}
+
+        for path, arrays in pending_writes.items():
+            self._write_frames(self._dataset(path), arrays)
+
+    def _append_frames(self, path, frames):
+        """Append frames to the end of a dataset, or buffer them if
+        writes are being buffered.
+
+        Parameters
+        ----------
+        path : str
+            Full path of the dataset in the file.
+        frames : numpy.array
+            The frames to add along the first dimension.
+
+        """
+
+        if self._pending_writes is None:
+            self._write_frames(self._dataset(path), [frames])
+            return
+
+        # copy so that later changes by the caller don't leak into
+        # the buffer
+        pending = self._pending_writes.setdefault(path, [])
+        pending.append(np.array(frames))
+
+        if self._pending_flush_n is not None and len(pending) >= self._pending_flush_n:
+            self.flush_pending()
+
+    def _flush_pending_traj(self, run_idx, traj_idx):
+        """Write out the frames buffered by `buffered_writes` for the
+        fields of a trajectory, so that they can be read.
+
+        Parameters
+        ----------
+        run_idx : int
+        traj_idx : int
+
+        """
+
+        if not self._pending_writes:
+            return
+
+        traj_prefix = _traj_path(run_idx, traj_idx) + '/'
+
+        for path in [path for path in self._pending_writes
+                     if path.startswith(traj_prefix)]:
+
+            self._write_frames(self._dataset(path), self._pending_writes.pop(path))
+
+    def _pending_n_frames(self, path):
+        """The number of frames buffered for a dataset."""
+
+        if not self._pending_writes:
+            return 0
+
+        return sum(arr.shape[0] for arr in self._pending_writes.get(path, ()))
+
+    @staticmethod
+    def _write_frames(dset, arrays):
+        """Grow a dataset once and write a list of frame arrays to the
+        end of it.
+
+        Parameters
+        ----------
+        dset : h5py.Dataset
+        arrays : list of numpy.array
+
+        """
+
+        if len(arrays) == 1:
+            frames = arrays[0]
+        else:
+            frames = np.concatenate(arrays)
+
+        n_new_frames = frames.shape[0]
+        if n_new_frames == 0:
+            return
+
+        # an empty dataset may have been initialized with zeros for
+        # the feature dimensions so take them from the maxshape
+        shape = dset.shape
+        n_frames = shape[0]
+        if n_frames == 0:
+            feature_dims = dset.maxshape[1:]
+        else:
+            feature_dims = shape[1:]
+
+        dset.resize( (n_frames + n_new_frames, *feature_dims) )
+
+        # whole chunks are written directly, the rest normally
+        direct_start, direct_end = _write_direct_chunks(dset, n_frames, frames)
+
+        if direct_start > 0:
+            dset[n_frames : n_frames + direct_start, ...] = frames[:direct_start]
+
+        if direct_end < n_new_frames:
+            dset[n_frames + direct_end:, ...] = frames[direct_end:]
 
     @property
     def swmr_mode(self):
@@ -932,6 +2271,128 @@ class WepyHDF5(object):
     def swmr_mode(self, val):
         self._swmr_mode = val
 
+    def _check_chunk_cache(self, dset):
+        """Warn once if a chunk of a dataset doesn't fit in the raw data
+        chunk cache.
+
+        Appends to a trajectory rewrite its last chunk over and over,
+        which is only cheap for filtered datasets when that chunk
+        stays in the chunk cache between appends.
+
+        Parameters
+        ----------
+        dset : h5py.Dataset
+
+        """
+
+        if self._chunk_cache_checked:
+            return
+
+        self._chunk_cache_checked = True
+
+        if dset.chunks is None:
+            return
+
+        chunk_nbytes = int(np.prod(dset.chunks)) * dset.dtype.itemsize
+        if chunk_nbytes > self._rdcc_nbytes:
+            warn("The chunks of {} are {} bytes which is larger than the chunk cache "
+                 "of {} bytes, so every append will read and write the last chunk again. "
+                 "Set rdcc_nbytes to at least the size of a chunk.".format(
+                     dset.name, chunk_nbytes, self._rdcc_nbytes),
+                 RuntimeWarning)
+
+    @property
+    def _chunk_cache_kwargs(self):
+        """The raw data chunk cache keyword arguments for h5py.File."""
+        return {'rdcc_nbytes' : self._rdcc_nbytes,
+                'rdcc_nslots' : self._rdcc_nslots,
+                'rdcc_w0' : self._rdcc_w0}
+
+    @property
+    def _h5py_file_kwargs(self):
+        """The chunk cache and driver keyword arguments for opening
+        this file with h5py.File."""
+
+        file_kwargs = self._chunk_cache_kwargs
+
+        if self._driver is not None:
+
+            # the core driver reads the whole file into memory
+            if self._driver == 'core' and osp.exists(self._filename):
+                available_memory = _available_memory()
+                if (available_memory is not None) and \
+                   (osp.getsize(self._filename) > available_memory):
+                    warn("The file {} is larger than the available memory but is being opened "
+                         "with the 'core' driver".format(self._filename), RuntimeWarning)
+
+            file_kwargs['driver'] = self._driver
+            file_kwargs.update(self._driver_kwargs)
+
+        # only supported by newer versions of h5py
+        if (self._page_buf_size is not None) and \
+           (h5py.version.version_tuple >= H5PY_PAGED_VERSION):
+            file_kwargs['page_buf_size'] = self._page_buf_size
+
+        return file_kwargs
+
+    def _open_h5py_file(self, mode, **file_kwargs):
+        """Open the file with h5py.File with the given keyword arguments.
+
+        If the file can't be opened with page buffering, because it
+        was not created with the paged file space strategy, it is
+        opened without it.
+
+        Parameters
+        ----------
+        mode : str
+            h5py file mode.
+
+        Returns
+        -------
+        h5 : h5py.File
+
+        """
+
+        try:
+            return h5py.File(self._filename, mode=mode,
+                             libver=H5PY_LIBVER, swmr=self._swmr_mode,
+                             **file_kwargs)
+        except OSError:
+            if 'page_buf_size' not in file_kwargs:
+                raise
+
+        warn("Could not open {} with page buffering, opening it without".format(
+            self._filename), RuntimeWarning)
+
+        del file_kwargs['page_buf_size']
+
+        return h5py.File(self._filename, mode=mode,
+                         libver=H5PY_LIBVER, swmr=self._swmr_mode,
+                         **file_kwargs)
+
+
+    def _file_space_kwargs(self):
+        """The file space strategy keyword arguments for creating this
+        file with h5py.File."""
+
+        # only supported by newer versions of h5py
+        if (self._fs_strategy_kwarg is None) or \
+           (h5py.version.version_tuple < H5PY_PAGED_VERSION):
+            return {}
+
+        fs_kwargs = {'fs_strategy' : self._fs_strategy_kwarg,
+                     'fs_persist' : True}
+
+        if self._fs_strategy_kwarg == 'page':
+            if self._fs_page_size_kwarg is not None:
+                fs_kwargs['fs_page_size'] = self._fs_page_size_kwarg
+            else:
+                chunk_bytes = self._chunk_bytes_kwarg
+                if chunk_bytes is None:
+                    chunk_bytes = DEFAULT_CHUNK_BYTES
+                fs_kwargs['fs_page_size'] = FS_PAGE_SIZE_CHUNKS * chunk_bytes
+
+        return fs_kwargs
 
     # TODO custom deepcopy to avoid copying the actual HDF5 object
 
@@ -953,9 +2414,21 @@ class WepyHDF5(object):
 
         # initialize the settings group
         settings_grp = self._h5.create_group(SETTINGS)
-
-        # create the topology dataset
-        self._h5.create_dataset(TOPOLOGY, data=self._topology)
+        format_version = self._format_version_kwarg
+        settings_grp.attrs[FORMAT_VERSION_STR] = format_version
+
+        # create the topology dataset. The JSON is stored as
+        # compressed UTF-8 bytes since large topologies are slow to
+        # read back as a single variable length string
+        if format_version < 2:
+            self._h5.create_dataset(TOPOLOGY, data=self._topology,
+                                    track_times=TRACK_TIMES)
+        else:
+            topology_bytes = np.frombuffer(self._topology.encode('utf-8'), dtype=np.uint8)
+            self._h5.create_dataset(TOPOLOGY, data=topology_bytes,
+                                    chunks=(max(1, min(len(topology_bytes), 1 << 20)),),
+                                    compression='gzip', shuffle=True,
+                                    track_times=TRACK_TIMES)
 
         # sparse fields
         if self._sparse_fields is not None:
@@ -963,18 +2436,14 @@ class WepyHDF5(object):
             # make a dataset for the sparse fields allowed.  this requires
             # a 'special' datatype for variable length strings. This is
             # supported by HDF5 but not numpy.
-            vlen_str_dt = h5py.special_dtype(vlen=str)
-
-            # create the dataset with empty values for the length of the
-            # sparse fields given
-            sparse_fields_ds = settings_grp.create_dataset(SPARSE_FIELDS,
-                                                           (len(self._sparse_fields),),
-                                                           dtype=vlen_str_dt,
-                                                           maxshape=(None,))
 
-            # set the flags
-            for i, sparse_field in enumerate(self._sparse_fields):
-                sparse_fields_ds[i] = sparse_field
+            # create the dataset with all of the sparse fields given
+            # in a single write
+            settings_grp.create_dataset(SPARSE_FIELDS,
+                                        data=np.array(self._sparse_fields, dtype=object),
+                                        dtype=VLEN_STR_DTYPE,
+                                        maxshape=(None,),
+                                        track_times=TRACK_TIMES)
 
 
         # field feature shapes and dtypes
@@ -985,16 +2454,45 @@ class WepyHDF5(object):
         self._set_default_init_field_attributes(n_dims=self._n_dims)
 
         # save the number of dimensions and number of atoms in settings
-        settings_grp.create_dataset(N_DIMS_STR, data=np.array(self._n_dims))
-        settings_grp.create_dataset(N_ATOMS, data=np.array(self._n_coords))
+        _create_compact_dataset(settings_grp, N_DIMS_STR, np.array(self._n_dims))
+        _create_compact_dataset(settings_grp, N_ATOMS, np.array(self._n_coords))
+
+        # the target size of trajectory field chunks
+        if self._chunk_bytes_kwarg is None:
+            self._chunk_bytes_kwarg = DEFAULT_CHUNK_BYTES
+        _create_compact_dataset(settings_grp, CHUNK_BYTES,
+                                np.array(self._chunk_bytes_kwarg))
+
+        # the filters for the compressed trajectory fields
+        field_filters = {}
+        if self._field_filters_kwarg['compression'] is not None:
+            for key in ('compression', 'compression_opts', 'shuffle'):
+                field_filters[key] = self._field_filters_kwarg[key]
+
+        # the lossy scale-offset filter goes before the compression
+        if self._field_filters_kwarg['scaleoffset'] is not None:
+            field_filters['scaleoffset'] = self._field_filters_kwarg['scaleoffset']
+
+        _create_compact_dataset(settings_grp, FIELD_FILTERS, json.dumps(field_filters))
 
         # the main rep atom idxs
-        settings_grp.create_dataset(MAIN_REP_IDXS, data=self._main_rep_idxs, dtype=np.int)
+        _create_compact_dataset(settings_grp, MAIN_REP_IDXS,
+                                np.asarray(self._main_rep_idxs, dtype=np.int64))
 
         # alt_reps settings
-        alt_reps_idxs_grp = settings_grp.create_group(ALT_REPS_IDXS)
-        for alt_rep_name, idxs in self._alt_reps.items():
-            alt_reps_idxs_grp.create_dataset(alt_rep_name, data=idxs, dtype=np.int)
+        if format_version < 2:
+            alt_reps_idxs_grp = settings_grp.create_group(ALT_REPS_IDXS)
+            for alt_rep_name, idxs in self._alt_reps.items():
+                alt_reps_idxs_grp.create_dataset(alt_rep_name,
+                                                 data=np.asarray(idxs, dtype=np.int64),
+                                                 track_times=TRACK_TIMES)
+        else:
+            alt_reps_idxs = np.empty((len(self._alt_reps),), dtype=_alt_reps_idxs_dtype())
+            for i, (alt_rep_name, idxs) in enumerate(self._alt_reps.items()):
+                alt_reps_idxs[i] = (alt_rep_name, np.asarray(idxs, dtype=np.int64))
+
+            settings_grp.create_dataset(ALT_REPS_IDXS, data=alt_reps_idxs,
+                                        track_times=TRACK_TIMES)
 
         # if both feature shapes and dtypes were specified overwrite
         # (or initialize if not set by defaults) the defaults
@@ -1006,53 +2504,74 @@ class WepyHDF5(object):
 
         # any sparse field with unspecified shape and dtype must be
         # set to None so that it will be set at runtime
-        for sparse_field in self.sparse_fields:
+        for sparse_field in self._sparse_fields_set:
             if (not sparse_field in self._field_feature_shapes) or \
                (not sparse_field in self._field_feature_dtypes):
                 self._field_feature_shapes[sparse_field] = None
                 self._field_feature_dtypes[sparse_field] = None
 
 
-        # save the field feature shapes and dtypes in the settings group
-        shapes_grp = settings_grp.create_group(FIELD_FEATURE_SHAPES_STR)
-        for field_path, field_shape in self._field_feature_shapes.items():
-            if field_shape is None:
-                # set it as a dimensionless array of NaN
-                field_shape = np.array(np.nan)
+        # save the field feature shapes and dtypes in the settings
+        # group as a dataset for each field in separate groups
+        if format_version < 2:
 
-            shapes_grp.create_dataset(field_path, data=field_shape)
+            shapes_grp = settings_grp.create_group(FIELD_FEATURE_SHAPES_STR)
+            for field_path, field_shape in self._field_feature_shapes.items():
+                if field_shape is None:
+                    # set it as a dimensionless array of NaN
+                    field_shape = np.array(np.nan)
 
-        dtypes_grp = settings_grp.create_group(FIELD_FEATURE_DTYPES_STR)
-        for field_path, field_dtype in self._field_feature_dtypes.items():
-            if field_dtype is None:
-                dt_str = NONE_STR
-            else:
-                # make a json string of the datatype that can be read
-                # in again, we call np.dtype again because there is no
-                # np.float.descr attribute
-                dt_str = json.dumps(np.dtype(field_dtype).descr)
+                shapes_grp.create_dataset(field_path, data=field_shape,
+                                          track_times=TRACK_TIMES)
+
+            dtypes_grp = settings_grp.create_group(FIELD_FEATURE_DTYPES_STR)
+            for field_path, field_dtype in self._field_feature_dtypes.items():
+                dtypes_grp.create_dataset(field_path, data=_field_dtype_str(field_dtype),
+                                          track_times=TRACK_TIMES)
 
-            dtypes_grp.create_dataset(field_path, data=dt_str)
+        # or as a single table with one row per field, so that it is
+        # written (and read back) in one go
+        else:
+            field_paths = list(self._field_feature_shapes.keys())
+            field_paths.extend([field_path for field_path in self._field_feature_dtypes.keys()
+                                if field_path not in self._field_feature_shapes])
 
-        # initialize the units group
-        unit_grp = self._h5.create_group(UNITS)
+            fields_meta = np.array(
+                [(field_path,
+                  _field_shape_str(self._field_feature_shapes.get(field_path)),
+                  _field_dtype_str(self._field_feature_dtypes.get(field_path)))
+                 for field_path in field_paths],
+                dtype=_fields_meta_dtype())
 
-        # if units were not given set them all to None
-        if self._units is None:
-            self._units = {}
-            for field_path in self._field_feature_shapes.keys():
-                self._units[field_path] = None
+            settings_grp.create_dataset(FIELDS_META, data=fields_meta,
+                                        maxshape=(None,),
+                                        track_times=TRACK_TIMES)
 
-        # set the units
-        for field_path, unit_value in self._units.items():
+        self._field_feature_shapes_cache = None
+        self._field_feature_dtypes_cache = None
 
-            # ignore the field if not given
-            if unit_value is None:
-                continue
+        if self._units is None:
+            self._units = {}
 
-            unit_path = '{}/{}'.format(UNITS, field_path)
+        # set the units as a group with a dataset for each field a
+        # unit was given for. These are under a redundant 'units/'
+        # prefix in the group as in older files
+        if format_version < 2:
+            unit_grp = self._h5.create_group(UNITS)
+            for field_path, unit_value in self._units.items():
+                if unit_value is not None:
+                    unit_grp.create_dataset('{}/{}'.format(UNITS, field_path),
+                                            data=unit_value,
+                                            track_times=TRACK_TIMES)
+
+        # or as a table with a row for each of them
+        else:
+            units = np.array([(field_path, unit_value)
+                              for field_path, unit_value in self._units.items()
+                              if unit_value is not None],
+                             dtype=_units_dtype())
 
-            unit_grp.create_dataset(unit_path, data=unit_value)
+            self._h5.create_dataset(UNITS, data=units, track_times=TRACK_TIMES)
 
 
         # create the group for the run data records
@@ -1102,6 +2621,15 @@ class WepyHDF5(object):
         field_feature_shapes = dict(FIELD_FEATURE_SHAPES)
         field_feature_dtypes = dict(FIELD_FEATURE_DTYPES)
 
+        # override the dtype of the scalar fields if asked for
+        if self._scalar_dtype_kwarg is not None:
+            for scalar_field in SCALAR_DTYPE_FIELDS:
+                field_feature_dtypes[scalar_field] = self._scalar_dtype_kwarg
+
+        # and the positions and positions-like fields
+        if self._positions_dtype_kwarg is not None:
+            for poslike_field in (POSITIONS, *POSITIONS_LIKE_FIELDS):
+                field_feature_dtypes[poslike_field] = self._positions_dtype_kwarg
 
         # get the number of coordinates of positions. If there is a
         # main_reps then we have to set the number of atoms to that,
@@ -1160,7 +2688,7 @@ class WepyHDF5(object):
             # split it
             grp_name, field_name = field_path.split('/')
             # get the hdf5 group
-            grp = self.h5['{}/{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx, grp_name)]
+            grp = self._dataset(_traj_field_path(run_idx, traj_idx, grp_name))
         # its simple so just return the root group and the original path
         else:
             grp = self.h5
@@ -1187,8 +2715,11 @@ class WepyHDF5(object):
 
         # otherwise we just create the data
         else:
-            cont_dset = self.settings_grp.create_dataset(CONTINUATIONS, shape=(0,2), dtype=np.int,
-                                    maxshape=(None, 2))
+            cont_dset = self.settings_grp.create_dataset(CONTINUATIONS, shape=(0,2), dtype=np.int64,
+                                    maxshape=(None, 2),
+                                    track_times=TRACK_TIMES)
+
+        self._continuations_cache = None
 
         return cont_dset
 
@@ -1219,6 +2750,13 @@ class WepyHDF5(object):
     def _add_init_walkers(self, init_walkers_grp, init_walkers):
         """Adds the run field group for the initial walkers.
 
+        The walkers are stored like a single frame of a trajectory
+        for every walker, i.e. one dataset for the weights and one for
+        each state field with the walkers along the first
+        dimension. If the walkers don't all have the same fields with
+        the same shapes, or the file has the version 1 layout, each
+        walker gets its own group instead.
+
         Parameters
         ----------
         init_walkers_grp : h5py.Group
@@ -1228,8 +2766,42 @@ class WepyHDF5(object):
 
         """
 
-        # add the initial walkers to the group by essentially making
-        # new trajectories here that will only have one frame
+        # collect the values of the fields that are set (not None)
+        # for each walker
+        walkers_fields = [{field_key : np.asarray(field_value)
+                           for field_key, field_value in walker.state.dict().items()
+                           if field_value is not None}
+                          for walker in init_walkers]
+
+        walkers_field_shapes = [{field_key : value.shape
+                                 for field_key, value in walker_fields.items()}
+                                for walker_fields in walkers_fields]
+
+        packable = (self.format_version >= 2) and \
+                   (len(walkers_field_shapes) > 0) and \
+                   (WEIGHTS not in walkers_field_shapes[0]) and \
+                   all([field_shapes == walkers_field_shapes[0]
+                        for field_shapes in walkers_field_shapes])
+
+        if packable:
+
+            # weights as a feature array for all the walkers
+            weights = np.array([[walker.weight] for walker in init_walkers])
+            init_walkers_grp.create_dataset(WEIGHTS, data=weights, track_times=TRACK_TIMES)
+
+            # then each field with all of the walkers values stacked
+            for field_key in walkers_field_shapes[0].keys():
+                init_walkers_grp.create_dataset(
+                    field_key,
+                    data=np.stack([walker_fields[field_key]
+                                   for walker_fields in walkers_fields]),
+                    track_times=TRACK_TIMES)
+
+            return
+
+        # otherwise add the initial walkers to the group by
+        # essentially making new trajectories here that will only have
+        # one frame
         for walker_idx, walker in enumerate(init_walkers):
             walker_grp = init_walkers_grp.create_group(str(walker_idx))
 
@@ -1239,7 +2811,7 @@ class WepyHDF5(object):
             weights = np.array([[walker.weight]])
 
             # then create the dataset and set it
-            walker_grp.create_dataset(WEIGHTS, data=weights)
+            walker_grp.create_dataset(WEIGHTS, data=weights, track_times=TRACK_TIMES)
 
             # state fields data
             for field_key, field_value in walker.state.dict().items():
@@ -1248,7 +2820,8 @@ class WepyHDF5(object):
                 if field_value is not None:
                     # just create the dataset by making it a feature array
                     # (wrapping it in another list)
-                    walker_grp.create_dataset(field_key, data=np.array([field_value]))
+                    walker_grp.create_dataset(field_key, data=np.array([field_value]),
+                                              track_times=TRACK_TIMES)
 
 
     def _init_run_sporadic_record_grp(self, run_idx, run_record_key, fields):
@@ -1276,8 +2849,10 @@ class WepyHDF5(object):
 
         # initialize the cycles dataset that maps when the records
         # were recorded
-        record_grp.create_dataset(CYCLE_IDXS, (0,), dtype=np.int,
-                                  maxshape=(None,))
+        record_grp.create_dataset(CYCLE_IDXS, (0,), dtype=np.int64,
+                                  maxshape=(None,),
+                                  chunks=_default_chunks((), np.int64, self.chunk_bytes),
+                                  track_times=TRACK_TIMES)
 
         # for each field simply create the dataset
         for field_name, field_shape, field_dtype in fields:
@@ -1354,13 +2929,26 @@ class WepyHDF5(object):
             # this is only allowed to be a single dimension
             # since no real shape was given
             dset = record_grp.create_dataset(field_name, (0,), dtype=vlen_dt,
-                                        maxshape=(None,))
+                                        maxshape=(None,),
+                                        chunks=_default_chunks((), vlen_dt, self.chunk_bytes),
+                                        track_times=TRACK_TIMES)
 
         # its not just make it normally
         else:
+            # scale-offset is only meant for the trajectory fields
+            if run_record_key in COMPRESSED_RECORDS:
+                dset_kwargs = {key : value for key, value in self.field_filters.items()
+                               if key != 'scaleoffset'}
+            else:
+                dset_kwargs = {}
+
             # create the group
             dset = record_grp.create_dataset(field_name, (0, *field_shape), dtype=field_dtype,
-                                      maxshape=(None, *field_shape))
+                                      maxshape=(None, *field_shape),
+                                      chunks=_default_chunks(field_shape, field_dtype,
+                                                             self.chunk_bytes),
+                                      **dset_kwargs,
+                                      track_times=TRACK_TIMES)
 
         return dset
 
@@ -1406,13 +2994,75 @@ class WepyHDF5(object):
 
         # check whether this is a sparse field and create it
         # appropriately
-        if field_path in self.sparse_fields:
+        if field_path in self._sparse_fields_set:
             # it is a sparse field
             self._init_sparse_traj_field(run_idx, traj_idx, field_path, feature_shape, dtype)
         else:
             # it is not a sparse field (AKA simple)
             self._init_contiguous_traj_field(run_idx, traj_idx, field_path, feature_shape, dtype)
 
+    def _traj_chunks(self, run_idx, feature_shape, dtype):
+        """Chunk shape for a dataset of a trajectory in a run.
+
+        If the number of cycles of the run was given when it was
+        created (see `new_run`) chunks never span more frames than
+        that so that no space is allocated for frames that will never
+        be written.
+
+        Parameters
+        ----------
+        run_idx : int
+        feature_shape : tuple of int
+            Shape of the feature vector of the field.
+        dtype : dtype_spec
+            The datatype of the field.
+
+        Returns
+        -------
+        chunks : tuple of int
+
+        """
+
+        chunks = _default_chunks(feature_shape, dtype, self.chunk_bytes)
+
+        run_idx = int(run_idx)
+        if run_idx not in self._run_n_cycles_cache:
+            self._run_n_cycles_cache[run_idx] = self.run(run_idx).attrs.get(RUN_N_CYCLES)
+
+        n_cycles = self._run_n_cycles_cache[run_idx]
+        if n_cycles is not None:
+            chunks = (max(1, min(chunks[0], n_cycles)), *chunks[1:])
+
+        return chunks
+
+    def _traj_field_dset_kwargs(self, run_idx, field_path, feature_shape, dtype):
+        """Keyword arguments for creating the dataset of a trajectory
+        field, i.e. the chunk shape and any compression filters.
+
+        Parameters
+        ----------
+        run_idx : int
+        field_path : str
+            Field name specification.
+        feature_shape : tuple of int
+            Shape of the feature vector of the field.
+        dtype : dtype_spec
+            The datatype of the field.
+
+        Returns
+        -------
+        dset_kwargs : dict of str : value
+
+        """
+
+        dset_kwargs = {'chunks' : self._traj_chunks(run_idx, feature_shape, dtype)}
+
+        if (field_path in COMPRESSED_FIELDS) or \
+           field_path.startswith('{}/'.format(ALT_REPS)):
+            dset_kwargs.update(self.field_filters)
+
+        return dset_kwargs
+
     def _init_contiguous_traj_field(self, run_idx, traj_idx, field_path, shape, dtype):
         """Initialize a contiguous (non-sparse) trajectory field.
 
@@ -1429,12 +3079,14 @@ class WepyHDF5(object):
 
         """
 
-        traj_grp = self._h5['{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx)]
+        traj_grp = self.traj(run_idx, traj_idx)
 
         # create the empty dataset in the correct group, setting
         # maxshape so it can be resized for new feature vectors to be added
         traj_grp.create_dataset(field_path, (0, *[0 for i in shape]), dtype=dtype,
-                           maxshape=(None, *shape))
+                           maxshape=(None, *shape),
+                           **self._traj_field_dset_kwargs(run_idx, field_path, shape, dtype),
+                           track_times=TRACK_TIMES)
 
 
     def _init_sparse_traj_field(self, run_idx, traj_idx, field_path, shape, dtype):
@@ -1453,7 +3105,7 @@ class WepyHDF5(object):
 
         """
 
-        traj_grp = self._h5['{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx)]
+        traj_grp = self.traj(run_idx, traj_idx)
 
         # check to see that neither the shape and dtype are
         # None which indicates it is a runtime defined value and
@@ -1462,23 +3114,107 @@ class WepyHDF5(object):
             # do nothing
             pass
         else:
+            # copy the prepared empty field rather than creating it
+            template_grp = self._sparse_field_template(run_idx, field_path, shape, dtype)
 
-            # only create the group if you are going to add the
-            # datasets so the extend function can know if it has been
-            # properly initialized easier
-            sparse_grp = traj_grp.create_group(field_path)
+            parent_path, _, name = field_path.rpartition('/')
+            if parent_path:
+                parent_grp = traj_grp.require_group(parent_path)
+            else:
+                parent_grp = traj_grp
+
+            self._h5.copy(template_grp, parent_grp, name=name)
+
+    def _create_empty_sparse_field(self, grp, name, run_idx, field_path, shape, dtype):
+        """Create the group and empty datasets of a sparse field.
+
+        Parameters
+        ----------
+        grp : h5py.Group
+            Group to create the field in.
+        name : str
+            Path of the new field group relative to grp.
+        run_idx : int
+            Run the field is for, used to choose the chunking.
+        field_path : str
+            Field name specification.
+        shape : shape_spec
+            Specification for the shape of the feature.
+        dtype : dtype_spec
+            Specification for the dtype of the feature.
+
+        """
+
+        # only create the group if you are going to add the
+        # datasets so the extend function can know if it has been
+        # properly initialized easier
+        sparse_grp = grp.create_group(name)
+
+        # create the dataset for the feature data
+        sparse_grp.create_dataset(DATA, (0, *[0 for i in shape]), dtype=dtype,
+                                  maxshape=(None, *shape),
+                                  **self._traj_field_dset_kwargs(run_idx, field_path, shape, dtype),
+                                  track_times=TRACK_TIMES)
+
+        # create the dataset for the sparse indices
+        sparse_grp.create_dataset(SPARSE_IDXS, (0,), dtype=np.int64, maxshape=(None,),
+                                  chunks=self._traj_chunks(run_idx, (), np.int64),
+                                  track_times=TRACK_TIMES)
+
+    def _sparse_field_template(self, run_idx, field_path, shape, dtype):
+        """Get the empty sparse field group that new trajectories of a
+        run copy, creating it the first time it is asked for.
 
-            # create the dataset for the feature data
-            sparse_grp.create_dataset(DATA, (0, *[0 for i in shape]), dtype=dtype,
-                               maxshape=(None, *shape))
+        Copying an existing group is much faster than creating its
+        datasets and their chunking and filters each time.
 
-            # create the dataset for the sparse indices
-            sparse_grp.create_dataset(SPARSE_IDXS, (0,), dtype=np.int, maxshape=(None,))
+        Parameters
+        ----------
+        run_idx : int
+        field_path : str
+            Field name specification.
+        shape : shape_spec
+            Specification for the shape of the feature.
+        dtype : dtype_spec
+            Specification for the dtype of the feature.
+
+        Returns
+        -------
+        template_grp : h5py.Group
+
+        """
+
+        if self._traj_templates is None:
+            # a unique name for the in-memory file which is never
+            # written to disk
+            self._traj_templates = h5py.File('wepy-traj-templates-{}'.format(id(self)),
+                                             mode='w', driver='core', backing_store=False)
+            self._traj_template_paths = {}
+
+        # templates are kept by everything that goes into creating
+        # the datasets, the run is needed for its chunking
+        key = (int(run_idx), field_path, _field_shape_str(shape), _field_dtype_str(dtype))
+
+        if key not in self._traj_template_paths:
+            template_path = str(len(self._traj_template_paths))
+            self._create_empty_sparse_field(self._traj_templates, template_path,
+                                            run_idx, field_path, shape, dtype)
+            self._traj_template_paths[key] = template_path
 
+        return self._traj_templates[self._traj_template_paths[key]]
 
-    def _init_traj_fields(self, run_idx, traj_idx,
-                          field_paths, field_feature_shapes, field_feature_dtypes):
-        """Initialize a number of fields for a trajectory.
+    def _close_traj_templates(self):
+        """Close the in-memory file of trajectory field templates."""
+
+        if self._traj_templates is not None:
+            self._traj_templates.close()
+            self._traj_templates = None
+            self._traj_template_paths = None
+
+
+    def _init_traj_fields(self, run_idx, traj_idx, field_paths):
+        """Initialize a number of fields for a trajectory with the
+        feature shapes and dtypes from the settings.
 
         Parameters
         ----------
@@ -1486,13 +3222,24 @@ class WepyHDF5(object):
         traj_idx : int
         field_paths : list of str
             List of field names.
-        field_feature_shapes : list of shape_specs
-        field_feature_dtypes : list of dtype_specs
 
         """
-        for i, field_path in enumerate(field_paths):
-            self._init_traj_field(run_idx, traj_idx,
-                                  field_path, field_feature_shapes[i], field_feature_dtypes[i])
+
+        # look up the settings only once for all of the fields
+        sparse_fields = self._sparse_fields_set
+        field_feature_shapes = self._cached_field_feature_shapes
+        field_feature_dtypes = self._cached_field_feature_dtypes
+
+        for field_path in field_paths:
+            feature_shape = field_feature_shapes[field_path]
+            feature_dtype = field_feature_dtypes[field_path]
+
+            if field_path in sparse_fields:
+                self._init_sparse_traj_field(run_idx, traj_idx,
+                                             field_path, feature_shape, feature_dtype)
+            else:
+                self._init_contiguous_traj_field(run_idx, traj_idx,
+                                                 field_path, feature_shape, feature_dtype)
 
     def _add_traj_field_data(self,
                              run_idx,
@@ -1524,7 +3271,14 @@ class WepyHDF5(object):
         """
 
         # get the traj group
-        traj_grp = self._h5['{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx)]
+        traj_grp = self.traj(run_idx, traj_idx)
+
+        # floating point data is stored in the precision set for the
+        # field, e.g. single precision positions
+        field_dtype = self._cached_field_feature_dtypes.get(field_path)
+        if (field_dtype is not None) and \
+           (field_dtype.kind == 'f') and (field_data.dtype.kind == 'f'):
+            field_data = np.asarray(field_data, dtype=field_dtype)
 
         # if it is a sparse dataset we need to add the data and add
         # the idxs in a group
@@ -1538,22 +3292,35 @@ class WepyHDF5(object):
             try:
                 dset = traj_grp.require_dataset(field_path, shape=field_data.shape, dtype=field_data.dtype,
                                          exact=True,
-                                         maxshape=(None, *field_data.shape[1:]))
+                                         maxshape=(None, *field_data.shape[1:]),
+                                         **self._traj_field_dset_kwargs(run_idx, field_path,
+                                                                        field_data.shape[1:],
+                                                                        field_data.dtype),
+                                         track_times=TRACK_TIMES)
             except TypeError:
                 raise TypeError("For changing the contents of a trajectory field it must be the same shape and dtype.")
 
             # if that succeeds then go ahead and set the data to the
-            # dataset (overwriting if it is still there)
-            dset[...] = field_data
+            # dataset (overwriting if it is still there), whole chunks
+            # are written directly
+            _, direct_end = _write_direct_chunks(dset, 0, field_data)
+            if direct_end < field_data.shape[0]:
+                dset[direct_end:, ...] = field_data[direct_end:]
 
         else:
             sparse_grp = traj_grp.create_group(field_path)
             # add the data to this group
             sparse_grp.create_dataset(DATA, data=field_data,
-                                      maxshape=(None, *field_data.shape[1:]))
+                                      maxshape=(None, *field_data.shape[1:]),
+                                      **self._traj_field_dset_kwargs(run_idx, field_path,
+                                                                     field_data.shape[1:],
+                                                                     field_data.dtype),
+                                      track_times=TRACK_TIMES)
             # add the sparse idxs
             sparse_grp.create_dataset(SPARSE_IDXS, data=sparse_idxs,
-                                      maxshape=(None,))
+                                      maxshape=(None,),
+                                      chunks=self._traj_chunks(run_idx, (), np.int64),
+                                      track_times=TRACK_TIMES)
 
     def _extend_contiguous_traj_field(self, run_idx, traj_idx, field_path, field_data):
         """Add multiple new frames worth of data to the end of an existing
@@ -1570,46 +3337,31 @@ class WepyHDF5(object):
 
         """
 
-        traj_grp = self.h5['{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx)]
-        field = traj_grp[field_path]
+        path = _traj_field_path(run_idx, traj_idx, field_path)
+        field = self._dataset(path)
 
         # make sure this is a feature vector
         assert len(field_data.shape) > 1, \
             "field_data must be a feature vector with the same number of dimensions as the number"
 
-        # of datase new frames
-        n_new_frames = field_data.shape[0]
-
         # check the field to make sure it is not empty
-        if all([i == 0 for i in field.shape]):
+        shape = field.shape
+        if shape[0] == 0:
 
             # check the feature shape against the maxshape which gives
             # the feature dimensions for an empty dataset
             assert field_data.shape[1:] == field.maxshape[1:], \
                 "field feature dimensions must be the same, i.e. all but the first dimension"
 
-            # if it is empty resize it to make an array the size of
-            # the new field_data with the maxshape for the feature
-            # dimensions
-            feature_dims = field.maxshape[1:]
-            field.resize( (n_new_frames, *feature_dims) )
-
-            # set the new data to this
-            field[0:, ...] = field_data
-
         else:
             # make sure the new data has the right dimensions against
             # the shape it already has
-            assert field_data.shape[1:] == field.shape[1:], \
+            assert field_data.shape[1:] == shape[1:], \
                 "field feature dimensions must be the same, i.e. all but the first dimension"
 
-
-            # append to the dataset on the first dimension, keeping the
-            # others the same, these must be feature vectors and therefore
-            # must exist
-            field.resize( (field.shape[0] + n_new_frames, *field.shape[1:]) )
-            # add the new data
-            field[-n_new_frames:, ...] = field_data
+        # append to the dataset on the first dimension, keeping the
+        # others the same
+        self._append_frames(path, field_data)
 
     def _extend_sparse_traj_field(self, run_idx, traj_idx, field_path, values, sparse_idxs):
         """Add multiple new frames worth of data to the end of an existing
@@ -1628,17 +3380,14 @@ class WepyHDF5(object):
 
         """
 
-        field = self.h5['{}/{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx, field_path)]
-
-        field_data = field[DATA]
-        field_sparse_idxs = field[SPARSE_IDXS]
+        full_path = _traj_field_path(run_idx, traj_idx, field_path)
 
-        # number of new frames
-        n_new_frames = values.shape[0]
-
-        # if this sparse_field has been initialized empty we need to resize
-        if all([i == 0 for i in field_data.shape]):
+        field_data = self._dataset('{}/{}'.format(full_path, DATA))
 
+        # if this sparse_field has been initialized empty check
+        # against the maxshape
+        shape = field_data.shape
+        if shape[0] == 0:
 
             # check the feature shape against the maxshape which gives
             # the feature dimensions for an empty dataset
@@ -1646,33 +3395,15 @@ class WepyHDF5(object):
                 "input value features have shape {}, expected {}".format(
                     values.shape[1:], field_data.maxshape[1:])
 
-            # if it is empty resize it to make an array the size of
-            # the new values with the maxshape for the feature
-            # dimensions
-            feature_dims = field_data.maxshape[1:]
-            field_data.resize( (n_new_frames, *feature_dims) )
-
-            # set the new data to this
-            field_data[0:, ...] = values
-
         else:
 
             # make sure the new data has the right dimensions
-            assert values.shape[1:] == field_data.shape[1:], \
+            assert values.shape[1:] == shape[1:], \
                 "field feature dimensions must be the same, i.e. all but the first dimension"
 
-            # append to the dataset on the first dimension, keeping the
-            # others the same, these must be feature vectors and therefore
-            # must exist
-            field_data.resize( (field_data.shape[0] + n_new_frames, *field_data.shape[1:]) )
-            # add the new data
-            field_data[-n_new_frames:, ...] = values
-
-        # add the sparse idxs in the same way
-        field_sparse_idxs.resize( (field_sparse_idxs.shape[0] + n_new_frames,
-                                   *field_sparse_idxs.shape[1:]) )
-        # add the new data
-        field_sparse_idxs[-n_new_frames:, ...] = sparse_idxs
+        # append the values and the sparse idxs on the first dimension
+        self._append_frames('{}/{}'.format(full_path, DATA), values)
+        self._append_frames('{}/{}'.format(full_path, SPARSE_IDXS), np.asarray(sparse_idxs))
 
     def _add_sparse_field_flag(self, field_path):
         """Register a trajectory field as sparse in the header settings.
@@ -1684,14 +3415,18 @@ class WepyHDF5(object):
 
         """
 
-        sparse_fields_ds = self._h5['{}/{}'.format(SETTINGS, SPARSE_FIELDS)]
-
         # make sure it isn't already in the sparse_fields
-        if field_path in sparse_fields_ds[:]:
+        if field_path in self._sparse_fields_set:
             warn("sparse field {} already a sparse field, ignoring".format(field_path))
+            return
 
-        sparse_fields_ds.resize( (sparse_fields_ds.shape[0] + 1,) )
-        sparse_fields_ds[sparse_fields_ds.shape[0] - 1] = field_path
+        sparse_fields_ds = self._h5['{}/{}'.format(SETTINGS, SPARSE_FIELDS)]
+
+        n_sparse_fields = sparse_fields_ds.shape[0]
+        sparse_fields_ds.resize( (n_sparse_fields + 1,) )
+        sparse_fields_ds[n_sparse_fields] = field_path
+
+        self._sparse_fields_set_cache = self._sparse_fields_set | {field_path}
 
     def _add_field_feature_shape(self, field_path, field_feature_shape):
         """Add the shape to the header settings for a trajectory field.
@@ -1704,8 +3439,14 @@ class WepyHDF5(object):
             The shape spec to serialize as a dataset.
 
         """
-        shapes_grp = self._h5['{}/{}'.format(SETTINGS, FIELD_FEATURE_SHAPES_STR)]
-        shapes_grp.create_dataset(field_path, data=np.array(field_feature_shape))
+        if FIELDS_META in self.settings_grp:
+            self._set_fields_meta_value(field_path, 'shape',
+                                        _field_shape_str(field_feature_shape))
+        else:
+            shapes_grp = self._h5['{}/{}'.format(SETTINGS, FIELD_FEATURE_SHAPES_STR)]
+            _create_compact_dataset(shapes_grp, field_path, np.array(field_feature_shape))
+
+        self._field_feature_shapes_cache = None
 
     def _add_field_feature_dtype(self, field_path, field_feature_dtype):
         """Add the data type to the header settings for a trajectory field.
@@ -1718,9 +3459,51 @@ class WepyHDF5(object):
             The dtype spec to serialize as a dataset.
 
         """
-        feature_dtype_str = json.dumps(field_feature_dtype.descr)
-        dtypes_grp = self._h5['{}/{}'.format(SETTINGS, FIELD_FEATURE_DTYPES_STR)]
-        dtypes_grp.create_dataset(field_path, data=feature_dtype_str)
+        feature_dtype_str = _field_dtype_str(field_feature_dtype)
+
+        if FIELDS_META in self.settings_grp:
+            self._set_fields_meta_value(field_path, 'dtype', feature_dtype_str)
+        else:
+            dtypes_grp = self._h5['{}/{}'.format(SETTINGS, FIELD_FEATURE_DTYPES_STR)]
+            _create_compact_dataset(dtypes_grp, field_path, feature_dtype_str)
+
+        self._field_feature_dtypes_cache = None
+
+    def _set_fields_meta_value(self, field_path, column, value_str):
+        """Set a value in the row of the fields metadata table for a
+        trajectory field, adding the row if it doesn't exist yet.
+
+        Parameters
+        ----------
+        field_path : str
+            The name of the trajectory field you want to set for.
+        column : str
+            Either 'shape' or 'dtype'.
+        value_str : str
+            The serialized value to set.
+
+        """
+
+        meta_dset = self.settings_grp[FIELDS_META]
+
+        field_paths = list(meta_dset['path'])
+
+        if field_path in field_paths:
+            row_idx = field_paths.index(field_path)
+            row = meta_dset[row_idx:row_idx + 1]
+
+        # add a row with unspecified values if it is a new field
+        else:
+            row_idx = meta_dset.shape[0]
+            meta_dset.resize( (row_idx + 1,) )
+            row = np.array([(field_path, NONE_STR, NONE_STR)], dtype=meta_dset.dtype)
+
+        row[column] = value_str
+        meta_dset[row_idx:row_idx + 1] = row
+
+        # a new row adds both a shape and a dtype
+        self._field_feature_shapes_cache = None
+        self._field_feature_dtypes_cache = None
 
 
     def _set_field_feature_shape(self, field_path, field_feature_shape):
@@ -1739,10 +3522,13 @@ class WepyHDF5(object):
             # check that the shape was previously saved as "None" as we
             # won't overwrite anything else
             if self.field_feature_shapes[field_path] is None:
-                full_path = '{}/{}/{}'.format(SETTINGS, FIELD_FEATURE_SHAPES_STR, field_path)
-                # we have to delete the old data and set new data
-                del self.h5[full_path]
-                self.h5.create_dataset(full_path, data=field_feature_shape)
+
+                if FIELDS_META in self.settings_grp:
+                    self._set_fields_meta_value(field_path, 'shape',
+                                                _field_shape_str(field_feature_shape))
+                else:
+                    full_path = '{}/{}/{}'.format(SETTINGS, FIELD_FEATURE_SHAPES_STR, field_path)
+                    self._replace_settings_value(full_path, np.array(field_feature_shape))
             else:
                 raise AttributeError(
                     "Cannot overwrite feature shape for {} with {} because it is {} not {}".format(
@@ -1752,6 +3538,42 @@ class WepyHDF5(object):
         else:
             self._add_field_feature_shape(field_path, field_feature_shape)
 
+    def _replace_settings_value(self, full_path, value):
+        """Replace the value of a settings dataset.
+
+        The value is overwritten in place when it fits the existing
+        dataset, since deleting a dataset leaves its space unused in
+        the file until it is repacked.
+
+        Parameters
+        ----------
+        full_path : str
+            Path to the settings dataset in the file.
+        value : arraylike or str
+            The new value.
+
+        """
+
+        dset = self.h5[full_path]
+
+        if isinstance(value, str):
+            fits = h5py.check_dtype(vlen=dset.dtype) in (str, bytes)
+        else:
+            value = np.asarray(value)
+            fits = (dset.shape == value.shape and
+                    np.can_cast(value.dtype, dset.dtype, casting='same_kind'))
+
+        if fits:
+            dset[()] = value
+
+        # we have to delete the old data and set new data
+        else:
+            del self.h5[full_path]
+            _create_compact_dataset(self.h5, full_path, value)
+
+        self._field_feature_shapes_cache = None
+        self._field_feature_dtypes_cache = None
+
     def _set_field_feature_dtype(self, field_path, field_feature_dtype):
         """Add the trajectory field dtype to header settings or set the value.
 
@@ -1763,16 +3585,18 @@ class WepyHDF5(object):
             The dtype spec to serialize as a dataset.
 
         """
-        feature_dtype_str = json.dumps(field_feature_dtype.descr)
+        feature_dtype_str = _field_dtype_str(field_feature_dtype)
         # check if the field_feature_dtype is already set
         if field_path in self.field_feature_dtypes:
             # check that the dtype was previously saved as "None" as we
             # won't overwrite anything else
             if self.field_feature_dtypes[field_path] is None:
-                full_path = '{}/{}/{}'.format(SETTINGS, FIELD_FEATURE_DTYPES_STR, field_path)
-                # we have to delete the old data and set new data
-                del self.h5[full_path]
-                self.h5.create_dataset(full_path, data=feature_dtype_str)
+
+                if FIELDS_META in self.settings_grp:
+                    self._set_fields_meta_value(field_path, 'dtype', feature_dtype_str)
+                else:
+                    full_path = '{}/{}/{}'.format(SETTINGS, FIELD_FEATURE_DTYPES_STR, field_path)
+                    self._replace_settings_value(full_path, feature_dtype_str)
             else:
                 raise AttributeError(
                     "Cannot overwrite feature dtype for {} with {} because it is {} not ".format(
@@ -1798,19 +3622,15 @@ class WepyHDF5(object):
         field_name : str
             Name of the field in the record group to add to.
         field_data : arraylike
-            The data to add to the field.
+            The data to add to the field, one row per record. For
+            variable length fields this can be a list of the rows.
 
         """
 
-        records_grp = self.h5['{}/{}/{}'.format(RUNS, run_idx, run_record_key)]
-        field = records_grp[field_name]
-
-        # make sure this is a feature vector
-        assert len(field_data.shape) > 1, \
-            "field_data must be a feature vector with the same number of dimensions as the number"
+        field = self._dataset(_run_path(run_idx, '{}/{}'.format(run_record_key, field_name)))
 
         # of datase new frames
-        n_new_frames = field_data.shape[0]
+        n_new_frames = len(field_data)
 
         # check whether it is a variable length record, by getting the
         # record dataset dtype and using the checker to see if it is
@@ -1820,58 +3640,40 @@ class WepyHDF5(object):
             # if it is we have to treat it differently, since it
             # cannot be multidimensional
 
-            # if the dataset has no data in it we need to reshape it
-            if all([i == 0 for i in field.shape]):
-                # initialize this array
-                # if it is empty resize it to make an array the size of
-                # the new field_data with the maxshape for the feature
-                # dimensions
-                field.resize( (n_new_frames,) )
-
-                # set the new data to this
-                for i, row in enumerate(field_data):
-                    field[i] = row
-
-            # otherwise just add the data
-            else:
-
-                # resize the array but it is only of rank because
-                # of variable length data
-                field.resize( (field.shape[0] + n_new_frames, ) )
-
-                # add each row to the newly made space
-                for i, row in enumerate(field_data):
-                    field[(field.shape[0] - 1) + i] = row
+            # gather the rows into an array of objects so they are
+            # all written in one call, assigning each element so rows
+            # of equal length aren't broadcast into a 2D array
+            vlen_dtype = h5py.check_dtype(vlen=field.dtype)
+            rows = np.empty((n_new_frames,), dtype=field.dtype)
+            for i, row in enumerate(field_data):
+                rows[i] = np.asarray(row, dtype=vlen_dtype)
+
+            # resize the array, it is only of rank 1 because of the
+            # variable length data, and write the rows to the new
+            # space directly since slice assignment would broadcast
+            # them as well
+            n_frames = field.shape[0]
+            field.resize( (n_frames + n_new_frames, ) )
+            field.write_direct(rows, dest_sel=np.s_[n_frames:n_frames + n_new_frames])
 
         # if it is not variable length we don't have to treat it
         # differently
         else:
 
-            # if this is empty we need to reshape the dataset to accomodate data
-            if all([i == 0 for i in field.shape]):
+            # make sure this is a feature vector
+            assert len(field_data.shape) > 1, \
+                "field_data must be a feature vector with the same number of dimensions as the number"
 
-                # check the feature shape against the maxshape which gives
-                # the feature dimensions for an empty dataset
+            # if this is empty check the feature shape against the
+            # maxshape which gives the feature dimensions for an empty
+            # dataset
+            if field.shape[0] == 0:
                 assert field_data.shape[1:] == field.maxshape[1:], \
                     "field feature dimensions must be the same, i.e. all but the first dimension"
 
-                # if it is empty resize it to make an array the size of
-                # the new field_data with the maxshape for the feature
-                # dimensions
-                feature_dims = field.maxshape[1:]
-                field.resize( (n_new_frames, *feature_dims) )
-
-                # set the new data to this
-                field[0:, ...] = field_data
-
-            # otherwise just add the data
-            else:
-                # append to the dataset on the first dimension, keeping the
-                # others the same, these must be feature vectors and therefore
-                # must exist
-                field.resize( (field.shape[0] + n_new_frames, *field.shape[1:]) )
-                # add the new data
-                field[-n_new_frames:, ...] = field_data
+            # append to the dataset on the first dimension, keeping the
+            # others the same, with a single resize and write
+            self._write_frames(field, [field_data])
 
 
     def _run_record_namedtuple(self, run_record_key):
@@ -1930,34 +3732,135 @@ class WepyHDF5(object):
 
         """
 
-        # get the field dataset
         rec_grp = self.records_grp(run_idx, run_record_key)
-        dset = rec_grp[record_field]
+        values = self._record_field_table_values([rec_grp], run_record_key, record_field)
 
-        # if it is variable length or if it has more than one element
-        # cast all elements to tuples
-        if h5py.check_dtype(vlen=dset.dtype) is not None:
-            rec_dset = [tuple(value) for value in dset[:]]
+        return self._table_column_from_values(values)
+
+    def _record_field_table_values(self, rec_grps, run_record_key, record_field):
+        """Read all of the values of a record field that will be made
+        into a table column.
+
+        The values of the runs are read directly into their place in
+        a single preallocated array.
+
+        Parameters
+        ----------
+        rec_grps : list of h5py.Group
+            The record groups of the runs, as from `records_grp`, in
+            the order their values are put together.
+        run_record_key : str
+            Name of the record group
+        record_field : str
+            Name of the field of the record group
+
+        Returns
+        -------
+        values : numpy.ndarray
+            The values of the field, variable length fields are an
+            object array.
+
+        Raises
+        ------
+
+        TypeError
+            If the field feature vector shape rank is greater than 1.
+
+        """
+
+        # get the field datasets
+        dsets = [rec_grp[record_field] for rec_grp in rec_grps]
+
+        if len(dsets) == 0:
+            return np.empty((0, 1))
+
+        # variable length values are objects which can't be read into
+        # place so they are read for each run
+        if h5py.check_dtype(vlen=dsets[0].dtype) is not None:
+            return np.concatenate([dset[()] for dset in dsets])
 
         # if it is not variable length make sure it is not more than a
         # 1D feature vector
-        elif len(dset.shape) > 2:
+        if len(dsets[0].shape) > 2:
             raise TypeError(
                 "cannot convert fields with feature vectors more than 1 dimension,"
                 " was given {} for {}/{}".format(
-                    dset.shape[1:], run_record_key, record_field))
+                    dsets[0].shape[1:], run_record_key, record_field))
+
+        n_values = sum(dset.shape[0] for dset in dsets)
+        values = np.empty((n_values, *dsets[0].shape[1:]), dtype=dsets[0].dtype)
+
+        start = 0
+        for dset in dsets:
+            stop = start + dset.shape[0]
+            if stop > start:
+                dset.read_direct(values, dest_sel=np.s_[start:stop])
+            start = stop
+
+        return values
+
+    @staticmethod
+    def _table_column_from_values(values):
+        """Convert the values of a record field to a table column.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values as read by `_record_field_table_values`.
+
+        Returns
+        -------
+        column : list
+            Table-ified values
+
+        """
+
+        # if it is variable length or if it has more than one element
+        # cast all elements to tuples
+        if values.dtype == object:
+            column = [tuple(value) for value in values]
 
         # if it is only a rank 1 feature vector and it has more than
         # one element make a tuple out of it
-        elif dset.shape[1] > 1:
-            rec_dset = [tuple(value) for value in dset[:]]
+        elif values.shape[1] > 1:
+            column = list(map(tuple, values.tolist()))
 
         # otherwise just get the single value instead of keeping it as
         # a single valued feature vector
         else:
-            rec_dset = [value[0] for value in dset[:]]
+            column = values[:, 0].tolist()
+
+        return column
+
+    @classmethod
+    def _dataframe_column_from_values(cls, values):
+        """Convert the values of a record field to a DataFrame column.
+
+        Single valued numeric fields are kept as arrays, of the same
+        types pandas would give their values as python objects, the
+        rest are table-ified as for records.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values as read by `_record_field_table_values`.
+
+        Returns
+        -------
+        column : numpy.ndarray or list
 
-        return rec_dset
+        """
+
+        if (values.dtype != object) and (values.shape[1] == 1):
+
+            if values.dtype.kind in 'iu':
+                return values[:, 0].astype(np.int64)
+            elif values.dtype.kind == 'f':
+                return values[:, 0].astype(np.float64)
+            elif values.dtype.kind == 'b':
+                return values[:, 0].astype(bool)
+
+        return cls._table_column_from_values(values)
 
     def _convert_record_fields_to_table_columns(self, run_idx, run_record_key):
         """Convert record group data to truncated namedtuple records.
@@ -1981,10 +3884,12 @@ class WepyHDF5(object):
 
         """
 
+        rec_grp = self.records_grp(run_idx, run_record_key)
+
         fields = {}
         for record_field in self.record_fields[run_record_key]:
-            fields[record_field] = self._convert_record_field_to_table_column(
-                                           run_idx, run_record_key, record_field)
+            fields[record_field] = self._table_column_from_values(
+                self._record_field_table_values([rec_grp], run_record_key, record_field))
 
         return fields
 
@@ -2007,25 +3912,16 @@ class WepyHDF5(object):
         """
         Record = self._run_record_namedtuple(run_record_key)
 
-        # for each record we make a tuple and yield it
-        records = []
-        for record_idx in range(len(cycle_idxs)):
-
-            # make a record for this cycle
-            record_d = {CYCLE_IDX : cycle_idxs[record_idx]}
-            for record_field, column in fields.items():
-                datum = column[record_idx]
-                record_d[record_field] = datum
-
-            record = Record(*(record_d[key] for key in Record._fields))
+        # get the columns in the order of the record fields and make a
+        # record from each row of them
+        columns = [cycle_idxs if key == CYCLE_IDX else fields[key]
+                   for key in Record._fields]
 
-            records.append(record)
+        return [Record._make(row) for row in zip(*columns)]
 
-        return records
-
-    def _run_records_sporadic(self, run_idxs, run_record_key):
-        """Generate records for a sporadic record group for a multi-run
-        contig.
+    def _run_record_columns_sporadic(self, run_idxs, run_record_key):
+        """Read the columns of the records of a sporadic record group for
+        a multi-run contig.
 
         If multiple run indices are given assumes that these are a
         contig (e.g. the second run index is a continuation of the
@@ -2047,60 +3943,53 @@ class WepyHDF5(object):
 
         Returns
         -------
-        records : list of namedtuple objects
+        cycle_idxs : numpy.ndarray of int
+            The contig cycle index of each record.
+        field_values : dict of str : numpy.ndarray
+            The values of each record field, as read by
+            `_record_field_table_values`.
 
         """
 
-        # we loop over the run_idxs in the contig and get the fields
-        # and cycle idxs for the whole contig
-        fields = None
-        cycle_idxs = np.array([], dtype=int)
+        record_fields = self.record_fields[run_record_key]
+
+        rec_grps = [self.records_grp(run_idx, run_record_key) for run_idx in run_idxs]
+
+        # the number of records in each run and where they go in the
+        # columns for the whole contig
+        run_n_records = [rec_grp[CYCLE_IDXS].shape[0] for rec_grp in rec_grps]
+        run_offsets = np.concatenate(([0], np.cumsum(run_n_records, dtype=int)))
+
+        # read the cycle idxs of the runs into place
+        cycle_idxs = np.empty(run_offsets[-1], dtype=int)
+
         # keep a cumulative total of the runs cycle idxs
         prev_run_cycle_total = 0
-        for run_idx in run_idxs:
+        for run_idx, rec_grp, start, stop in zip(run_idxs, rec_grps,
+                                                 run_offsets[:-1], run_offsets[1:]):
 
-            # get all the value columns from the datasets, and convert
-            # them to something amenable to a table
-            run_fields = self._convert_record_fields_to_table_columns(run_idx, run_record_key)
-
-            # we need to concatenate each field to the end of the
-            # field in the master dictionary, first we need to
-            # initialize it if it isn't already made
-            if fields is None:
-                # if it isn't initialized we just set it as this first
-                # run fields dictionary
-                fields = run_fields
-            else:
-                # if it is already initialized we need to go through
-                # each field and concatenate
-                for field_name, field_data in run_fields.items():
-                    # just add it to the list of fields that will be concatenated later
-                    fields[field_name].extend(field_data)
-
-            # get the cycle idxs for this run
-            rec_grp = self.records_grp(run_idx, run_record_key)
-            run_cycle_idxs = rec_grp[CYCLE_IDXS][:]
+            if stop > start:
+                rec_grp[CYCLE_IDXS].read_direct(cycle_idxs, dest_sel=np.s_[start:stop])
 
             # add the total number of cycles that came before this run
             # to each of the cycle idxs to get the cycle_idxs in terms
             # of the full contig
-            run_contig_cycle_idxs = run_cycle_idxs + prev_run_cycle_total
-
-            # add these cycle indices to the records for the whole contig
-            cycle_idxs = np.hstack( (cycle_idxs, run_contig_cycle_idxs) )
+            cycle_idxs[start:stop] += prev_run_cycle_total
 
             # add the total number of cycle_idxs from this run to the
             # running total
             prev_run_cycle_total += self.num_run_cycles(run_idx)
 
-        # then make the records from the fields
-        records = self._make_records(run_record_key, cycle_idxs, fields)
+        # get all the values of each field for the whole contig
+        field_values = {record_field : self._record_field_table_values(
+                            rec_grps, run_record_key, record_field)
+                        for record_field in record_fields}
 
-        return records
+        return cycle_idxs, field_values
 
-    def _run_records_continual(self, run_idxs, run_record_key):
-        """Generate records for a continual record group for a multi-run
-        contig.
+    def _run_record_columns_continual(self, run_idxs, run_record_key):
+        """Read the columns of the records of a continual record group
+        for a multi-run contig.
 
         If multiple run indices are given assumes that these are a
         contig (e.g. the second run index is a continuation of the
@@ -2122,60 +4011,78 @@ class WepyHDF5(object):
 
         Returns
         -------
-        records : list of namedtuple objects
+        cycle_idxs : numpy.ndarray of int
+            The contig cycle index of each record.
+        field_values : dict of str : numpy.ndarray
+            The values of each record field, as read by
+            `_record_field_table_values`.
 
         """
 
-        cycle_idxs = np.array([], dtype=int)
-        fields = None
-        prev_run_cycle_total = 0
-        for run_idx in run_idxs:
-            # get all the value columns from the datasets, and convert
-            # them to something amenable to a table
-            run_fields = self._convert_record_fields_to_table_columns(run_idx, run_record_key)
-
-            # we need to concatenate each field to the end of the
-            # field in the master dictionary, first we need to
-            # initialize it if it isn't already made
-            if fields is None:
-                # if it isn't initialized we just set it as this first
-                # run fields dictionary
-                fields = run_fields
-            else:
-                # if it is already initialized we need to go through
-                # each field and concatenate
-                for field_name, field_data in run_fields.items():
-                    # just add it to the list of fields that will be concatenated later
-                    fields[field_name].extend(field_data)
+        # get one of the fields (if any to iterate over)
+        record_fields = self.record_fields[run_record_key]
+        main_record_field = record_fields[0]
 
-            # get one of the fields (if any to iterate over)
-            record_fields = self.record_fields[run_record_key]
-            main_record_field = record_fields[0]
+        rec_grps = [self.records_grp(run_idx, run_record_key) for run_idx in run_idxs]
 
-            # make the cycle idxs from that
-            run_rec_grp = self.records_grp(run_idx, run_record_key)
-            run_cycle_idxs = np.array(range(run_rec_grp[main_record_field].shape[0]))
+        # the number of records in each run, from the main field, and
+        # where they go in the columns for the whole contig
+        run_n_records = [rec_grp[main_record_field].shape[0] for rec_grp in rec_grps]
+        run_offsets = np.concatenate(([0], np.cumsum(run_n_records, dtype=int)))
 
-            # add the total number of cycles that came before this run
-            # to each of the cycle idxs to get the cycle_idxs in terms
-            # of the full contig
-            run_contig_cycle_idxs = run_cycle_idxs + prev_run_cycle_total
+        cycle_idxs = np.empty(run_offsets[-1], dtype=int)
+
+        prev_run_cycle_total = 0
+        for run_idx, start, stop in zip(run_idxs, run_offsets[:-1], run_offsets[1:]):
 
-            # add these cycle indices to the records for the whole contig
-            cycle_idxs = np.hstack( (cycle_idxs, run_contig_cycle_idxs) )
+            # there is a record for every cycle, add the total number
+            # of cycles that came before this run to get the
+            # cycle_idxs in terms of the full contig
+            cycle_idxs[start:stop] = np.arange(prev_run_cycle_total,
+                                               prev_run_cycle_total + (stop - start))
 
             # add the total number of cycle_idxs from this run to the
             # running total
             prev_run_cycle_total += self.num_run_cycles(run_idx)
 
+        # get all the values of each field for the whole contig
+        field_values = {record_field : self._record_field_table_values(
+                            rec_grps, run_record_key, record_field)
+                        for record_field in record_fields}
+
+        return cycle_idxs, field_values
+
+    def _run_contig_record_columns(self, run_idxs, run_record_key):
+        """Read the columns of the records of a record group for a
+        multi-run contig.
+
+        Parameters
+        ----------
+        run_idxs : list of int
+            The indices of the runs in the order they are in the contig
+        run_record_key : str
+            Name of the record group
+
+        Returns
+        -------
+        cycle_idxs : numpy.ndarray of int
+            The contig cycle index of each record.
+        field_values : dict of str : numpy.ndarray
+            The values of each record field, as read by
+            `_record_field_table_values`.
 
-        # then make the records from the fields
-        records = self._make_records(run_record_key, cycle_idxs, fields)
+        """
 
-        return records
+        # if the group is sporadic the cycle idxs are read from the
+        # file, otherwise there is a record for every cycle
+        if self._is_sporadic_records(run_record_key):
+            return self._run_record_columns_sporadic(run_idxs, run_record_key)
+        else:
+            return self._run_record_columns_continual(run_idxs, run_record_key)
 
 
-    def _get_contiguous_traj_field(self, run_idx, traj_idx, field_path, frames=None):
+    def _get_contiguous_traj_field(self, run_idx, traj_idx, field_path, frames=None,
+                                   out=None):
         """Access actual data for a trajectory field.
 
         Parameters
@@ -2186,24 +4093,38 @@ class WepyHDF5(object):
             Trajectory field name to access
         frames : list of int, optional
             The indices of the frames to return if you don't want all of them.
+        out : numpy.ndarray, optional
+            Array of the shape of the whole field to read it into,
+            only if frames is None.
 
         Returns
         -------
         field_data : arraylike
             The data requested for the field.
 
+        Raises
+        ------
+        ValueError
+            If `out` is given along with `frames`.
+
         """
 
-        full_path = '{}/{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx, field_path)
+        if (out is not None) and (frames is not None):
+            raise ValueError("out can only be given when all frames are read")
+
+        self._flush_pending_traj(run_idx, traj_idx)
+
+        full_path = _traj_field_path(run_idx, traj_idx, field_path)
 
         if frames is None:
-            field = self._h5[full_path][:]
+            field = _read_whole(self._dataset(full_path), out=out)
         else:
-            field = self._h5[full_path][list(frames)]
+            field = _read_frames_bulk(self._dataset(full_path), frames)
 
         return field
 
-    def _get_sparse_traj_field(self, run_idx, traj_idx, field_path, frames=None, masked=True):
+    def _get_sparse_traj_field(self, run_idx, traj_idx, field_path, frames=None, masked=True,
+                               lazy=False, out=None):
         """Access actual data for a trajectory field.
 
         Parameters
@@ -2220,61 +4141,88 @@ class WepyHDF5(object):
             If True returns the array data as numpy masked array, and
             only the available values if False.
 
+        lazy : bool
+            If True returns the available values along with their
+            frame indices as a SparseField, ignoring `masked`.
+
+        out : numpy.ndarray, optional
+            Array of the shape of the available values to read them
+            into, only if frames is None and the values are not
+            masked.
+
         Returns
         -------
-        field_data : arraylike
+        field_data : arraylike or SparseField
             The data requested for the field.
 
+        Raises
+        ------
+        ValueError
+            If `out` is given along with `frames` or for masked values.
+
         """
 
-        traj_path = '{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx)
-        traj_grp = self.h5[traj_path]
-        field = traj_grp[field_path]
+        if (out is not None) and \
+           ((frames is not None) or (masked and not lazy)):
+            raise ValueError(
+                "out can only be given when all frames are read unmasked or lazily")
+
+        self._flush_pending_traj(run_idx, traj_idx)
+
+        field = self._dataset(_traj_field_path(run_idx, traj_idx, field_path))
 
-        n_frames = traj_grp[POSITIONS].shape[0]
+        n_frames = self._dataset(_traj_field_path(run_idx, traj_idx, POSITIONS)).shape[0]
 
         if frames is None:
-            data = field[DATA][:]
+
+            if lazy or not masked:
+                data = _read_whole(field[DATA], out=out)
+            else:
+                data = field[DATA][:]
+
+            if lazy:
+                data = SparseField(data, field[SPARSE_IDXS][:], n_frames)
 
             # if it is to be masked make the masked array
-            if masked:
+            elif masked:
                 sparse_idxs = field[SPARSE_IDXS][:]
 
-                filled_data = np.full( (n_frames, *data.shape[1:]), np.nan)
-                filled_data[sparse_idxs] = data
-
-                mask = np.full( (n_frames, *data.shape[1:]), True)
-                mask[sparse_idxs] = False
+                present = np.zeros(n_frames, dtype=bool)
+                present[sparse_idxs] = True
 
-                data = np.ma.masked_array(filled_data, mask=mask)
+                data = _masked_frames(data, present)
 
         else:
 
+            frames = np.asarray(frames, dtype=int)
+
             # get the sparse idxs and the frames to slice from the
             # data
             sparse_idxs = field[SPARSE_IDXS][:]
 
-            # we get a boolean array of the rows of the data table
-            # that we are to slice from
-            sparse_frame_idxs = np.argwhere(np.isin(sparse_idxs, frames))
+            # the sparse idxs are increasing so the row in the data
+            # table for each frame is found by a binary search, and
+            # the frame has data if the idx at that row is the frame
+            data_idxs = np.searchsorted(sparse_idxs, frames)
 
-            data = field[DATA][list(sparse_frame_idxs)]
+            frames_present = np.zeros(len(frames), dtype=bool)
+            in_bounds = data_idxs < len(sparse_idxs)
+            frames_present[in_bounds] = sparse_idxs[data_idxs[in_bounds]] == frames[in_bounds]
 
-            # if it is to be masked make the masked array
-            if masked:
-                # the empty arrays the size of the number of requested frames
-                filled_data = np.full( (len(frames), *field[DATA].shape[1:]), np.nan)
-                mask = np.full( (len(frames), *field[DATA].shape[1:]), True )
+            # the rows of the frames which have data
+            data_idxs = data_idxs[frames_present]
 
-                # take the data which exists and is part of the frames
-                # selection, and put it into the filled data where it is
-                # supposed to be
-                filled_data[np.isin(frames, sparse_idxs)] = data
+            data_dset = field[DATA]
 
-                # unmask the present values
-                mask[np.isin(frames, sparse_idxs)] = False
+            data = _read_frames_bulk(data_dset, data_idxs)
 
-                data = np.ma.masked_array(filled_data, mask=mask)
+            if lazy:
+                data = SparseField(data, frames[frames_present], n_frames)
+
+            # if it is to be masked make the masked array, the size of
+            # the number of requested frames
+            elif masked:
+                data = _masked_frames(data, frames_present)
 
         return data
 
@@ -2324,51 +4272,25 @@ class WepyHDF5(object):
                 "The number of trajectories in data, {}, is different than the number"\
                 "of trajectories in the run, {}.".format(len(data), self.num_run_trajs(run_idx))
 
-            # for each trajectory check that the data is compliant
-            for traj_idx, traj_data in enumerate(data):
-
-                if not force:
-                    # check that the number of frames is not larger than that for the run
-                    if traj_data.shape[0] > self.num_run_cycles(run_idx):
-                        raise ValueError("The number of frames in data for traj {} , {},"
-                                          "is larger than the number of frames"
-                                          "for this run, {}.".format(
-                                                  traj_idx, data.shape[1], self.num_run_cycles(run_idx)))
-
-
-                # if the number of frames given is the same or less than
-                # the number of frames in the run
-                elif (traj_data.shape[0] <= self.num_run_cycles(run_idx)):
+        n_run_cycles = self.num_run_cycles(run_idx)
 
-                    # if sparse idxs were given we check to see there is
-                    # the right number of them
-                    #  and that they match the number of frames given
-                    if data.shape[0] != len(sparse_idxs[traj_idx]):
+        # check each trajectory's data is compliant and add it in the
+        # same pass
+        for traj_idx, (idx_tup, traj_data) in enumerate(
+                zip(self.run_traj_idx_tuples([run_idx]), data)):
 
-                        raise ValueError("The number of frames provided for traj {}, {},"
-                                          "was less than the total number of frames, {},"
-                                          "but an incorrect number of sparse idxs were supplied, {}."\
-                                         .format(traj_idx, traj_data.shape[0],
-                                            self.num_run_cycles(run_idx), len(sparse_idxs[traj_idx])))
+            # check that the number of frames is not larger than that for the run
+            if not force and traj_data.shape[0] > n_run_cycles:
+                raise ValueError("The number of frames in data for traj {} , {},"
+                                  "is larger than the number of frames"
+                                  "for this run, {}.".format(
+                                          traj_idx, traj_data.shape[0], n_run_cycles))
 
-
-                    # if there were strictly fewer frames given and the
-                    # sparse idxs were not given we need to raise an error
-                    elif (traj_data.shape[0] < self.num_run_cycles(run_idx)):
-
-                        raise ValueError("The number of frames provided for traj {}, {},"
-                                          "was less than the total number of frames, {},"
-                                          "but sparse_idxs were not supplied.".format(
-                                                  traj_idx, traj_data.shape[0],
-                                                  self.num_run_cycles(run_idx)))
-
-        # add it to each traj
-        for i, idx_tup in enumerate(self.run_traj_idx_tuples([run_idx])):
             if sparse_idxs is None:
-                self._add_traj_field_data(*idx_tup, field_path, data[i])
+                self._add_traj_field_data(*idx_tup, field_path, traj_data)
             else:
-                self._add_traj_field_data(*idx_tup, field_path, data[i],
-                                          sparse_idxs=sparse_idxs[i])
+                self._add_traj_field_data(*idx_tup, field_path, traj_data,
+                                          sparse_idxs=sparse_idxs[traj_idx])
 
     def _add_field(self, field_path, data, sparse_idxs=None,
                    force=False):
@@ -2421,22 +4343,74 @@ class WepyHDF5(object):
         if mode is None:
             mode = self.mode
 
+        # if the file is still open from the constructor we use that
+        # handle if we can, otherwise it is reopened in the new mode
+        if self._init_handle:
+            self._init_handle = False
+
+            if self._h5_mode_compatible(mode):
+                self._set_modes(mode)
+                return
+            else:
+                self.close()
+
         if self.closed:
 
             self.set_mode(mode)
 
-            self._h5 = h5py.File(self._filename, mode,
-                                 libver=H5PY_LIBVER, swmr=self.swmr_mode)
+            self._h5 = self._open_h5py_file(mode, **self._h5py_file_kwargs)
+            self._clear_h5_cache()
             self.closed = False
+
+            # the swmr flag for h5py.File only applies to reading
+            self._start_swmr_write()
         else:
             raise IOError("This file is already open")
 
     def close(self):
         """Close the underlying HDF5 file. """
         if not self.closed:
-            self._h5.flush()
+            # write out our own buffered frames, closing the file
+            # writes out all of its buffers so there is no need to
+            # flush it first
+            self.flush_pending()
             self._h5.close()
+            self._clear_h5_cache()
+            self._close_traj_templates()
             self.closed = True
+            self._init_handle = False
+
+    def _start_swmr_write(self):
+        """Switch the open file to SWMR writing if SWMR mode is on and it
+        was opened for writing."""
+
+        if self._swmr_mode is True and \
+           self._h5.mode != 'r' and \
+           not self._h5.swmr_mode:
+            self._h5.swmr_mode = True
+
+    def _h5_mode_compatible(self, mode):
+        """Whether the currently open h5py.File can be used for a mode,
+        i.e. it is only writable if the mode is a write mode.
+
+        Parameters
+        ----------
+        mode : str
+
+        Returns
+        -------
+        compatible : bool
+
+        """
+
+        return (mode in self.WRITE_MODES) == (self._h5.mode != 'r')
+
+    def _set_modes(self, mode):
+        """Set the wepy and h5py modes without any checks on whether the
+        file is open."""
+
+        self._h5py_mode = mode
+        self._wepy_mode = mode
 
     @property
     def mode(self):
@@ -2451,6 +4425,15 @@ class WepyHDF5(object):
     def set_mode(self, mode):
         """Set the mode for opening the file with."""
 
+        # if the file is only open from the constructor the handle is
+        # kept if it can be used in the new mode
+        if self._init_handle:
+            if self._h5_mode_compatible(mode):
+                self._set_modes(mode)
+                return
+            else:
+                self.close()
+
         if not self.closed:
             raise AttributeError("Cannot set the mode while the file is open.")
 
@@ -2481,6 +4464,46 @@ class WepyHDF5(object):
         """The underlying h5py.File object."""
         return self._h5
 
+    def _dataset(self, path):
+        """Get an object (usually a dataset) from the open file by its
+        full path, reusing the handle from earlier calls.
+
+        Handles are dropped when the file is closed. Objects removed
+        from the file by other means than this class should be dropped
+        with `_clear_h5_cache`.
+
+        Parameters
+        ----------
+        path : str
+            Full path of the object in the file.
+
+        Returns
+        -------
+        obj : h5py.Dataset or h5py.Group
+
+        """
+
+        try:
+            return self._h5_cache[path]
+        except KeyError:
+            obj = self._h5[path]
+            self._h5_cache[path] = obj
+            return obj
+
+    def _clear_h5_cache(self):
+        """Drop all of the cached object handles and values read from
+        the file."""
+        self._h5_cache = {}
+        self._sparse_fields_set_cache = None
+        self._record_fields_cache = None
+        self._field_feature_shapes_cache = None
+        self._field_feature_dtypes_cache = None
+        self._continuations_cache = None
+        self._n_runs_cache = None
+        self._run_n_trajs_cache = {}
+        self._run_n_cycles_cache = {}
+        self._mdtraj_topology_cache = {}
+
     ### h5py object access
 
     def run(self, run_idx):
@@ -2495,7 +4518,7 @@ class WepyHDF5(object):
         run_group : h5py.Group
 
         """
-        return self._h5['{}/{}'.format(RUNS, int(run_idx))]
+        return self._dataset(_run_path(run_idx))
 
     def traj(self, run_idx, traj_idx):
         """Get an h5py.Group trajectory group.
@@ -2510,7 +4533,7 @@ class WepyHDF5(object):
         traj_group : h5py.Group
 
         """
-        return self._h5['{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx)]
+        return self._dataset(_traj_path(run_idx, traj_idx))
 
     def run_trajs(self, run_idx):
         """Get the trajectories group for a run.
@@ -2524,16 +4547,16 @@ class WepyHDF5(object):
         trajectories_grp : h5py.Group
 
         """
-        return self._h5['{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES)]
+        return self._dataset(_run_path(run_idx, TRAJECTORIES))
 
     @property
     def runs(self):
         """The runs group."""
-        return self.h5[RUNS]
+        return self._dataset(RUNS)
 
     def run_grp(self, run_idx):
         """A group for a single run."""
-        return self.runs["{}".format(run_idx)]
+        return self.run(run_idx)
 
     def run_start_snapshot_hash(self, run_idx):
         """Hash identifier for the starting snapshot of a run from
@@ -2573,9 +4596,15 @@ class WepyHDF5(object):
     @property
     def settings_grp(self):
         """The header settings group."""
-        settings_grp = self.h5[SETTINGS]
+        settings_grp = self._dataset(SETTINGS)
         return settings_grp
 
+    @property
+    def format_version(self):
+        """The format version of the layout of the file, 1 for files
+        without one."""
+        return int(self.settings_grp.attrs.get(FORMAT_VERSION_STR, 1))
+
     def decision_grp(self, run_idx):
         """Get the decision enumeration group for a run.
 
@@ -2590,6 +4619,24 @@ class WepyHDF5(object):
         """
         return self.run(run_idx)[DECISION]
 
+    def _init_walkers_packed(self, run_idx):
+        """Whether the initial walkers of a run are stored in a single
+        dataset for each field, rather than a group for each walker as
+        in older files.
+
+        Parameters
+        ----------
+        run_idx : int
+
+        Returns
+        -------
+        packed : bool
+
+        """
+
+        weights = self.init_walkers_grp(run_idx).get(WEIGHTS)
+        return isinstance(weights, h5py.Dataset)
+
     def init_walkers_grp(self, run_idx):
         """Get the group for the initial walkers for a run.
 
@@ -2620,8 +4667,7 @@ class WepyHDF5(object):
         run_record_group : h5py.Group
 
         """
-        path = '{}/{}/{}'.format(RUNS, run_idx, run_record_key)
-        return self.h5[path]
+        return self._dataset(_run_path(run_idx, run_record_key))
 
     def resampling_grp(self, run_idx):
         """Get this record group for a run.
@@ -2856,18 +4902,85 @@ class WepyHDF5(object):
             Mapping of record group name to alist of the record group fields.
         """
 
-        record_fields_grp = self.settings_grp[RECORD_FIELDS]
+        # they are only changed by this object so they are read from
+        # the file once each time it is opened
+        if self._record_fields_cache is None:
+
+            record_fields_grp = self.settings_grp[RECORD_FIELDS]
+
+            # read each dataset whole rather than element by element
+            self._record_fields_cache = {group_name : list(dset[()])
+                                         for group_name, dset in record_fields_grp.items()}
+
+        return {group_name : list(fields)
+                for group_name, fields in self._record_fields_cache.items()}
+
+    @property
+    def sparse_fields(self):
+        """The trajectory fields that are sparse."""
+        return self.h5['{}/{}'.format(SETTINGS, SPARSE_FIELDS)][:]
+
+    @property
+    def _sparse_fields_set(self):
+        """The trajectory fields that are sparse as a set, read from the
+        file once each time it is opened."""
+
+        if self._sparse_fields_set_cache is None:
+            self._sparse_fields_set_cache = frozenset(self.sparse_fields)
+
+        return self._sparse_fields_set_cache
+
+    @property
+    def chunk_bytes(self):
+        """The target size in bytes of the chunks of trajectory field
+        datasets."""
+
+        chunk_bytes_path = '{}/{}'.format(SETTINGS, CHUNK_BYTES)
+
+        # files made before this setting existed use the default
+        if chunk_bytes_path in self.h5:
+            return int(self.h5[chunk_bytes_path][()])
+        else:
+            return DEFAULT_CHUNK_BYTES
+
+    @property
+    def field_filters(self):
+        """The HDF5 filter keyword arguments (compression, shuffle and
+        scale-offset) used for the compressed trajectory fields."""
+
+        field_filters_path = '{}/{}'.format(SETTINGS, FIELD_FILTERS)
+
+        # files made before this setting existed are not compressed
+        if field_filters_path in self.h5:
+            return json.loads(self.h5[field_filters_path][()])
+        else:
+            return {}
+
+    @property
+    def units(self):
+        """Mapping of the trajectory field names to the string specs of
+        their units, for the fields units were given for."""
 
-        record_fields_dict = {}
-        for group_name, dset in record_fields_grp.items():
-            record_fields_dict[group_name] = list(dset)
+        units = self.h5[UNITS]
 
-        return record_fields_dict
+        # older files have a group with a dataset for each field
+        if isinstance(units, h5py.Group):
 
-    @property
-    def sparse_fields(self):
-        """The trajectory fields that are sparse."""
-        return self.h5['{}/{}'.format(SETTINGS, SPARSE_FIELDS)][:]
+            units_dict = {}
+            def add_unit(name, obj):
+                if isinstance(obj, h5py.Dataset):
+                    # these were saved under a redundant 'units/' prefix
+                    if name.startswith('{}/'.format(UNITS)):
+                        name = name[len(UNITS) + 1:]
+                    units_dict[name] = obj[()]
+
+            units.visititems(add_unit)
+
+            return units_dict
+
+        units = units[:]
+        return {field_path : unit_value
+                for field_path, unit_value in zip(units['path'], units['unit'])}
 
     @property
     def main_rep_idxs(self):
@@ -2883,15 +4996,27 @@ class WepyHDF5(object):
         """Mapping of the names of the alt reps to the indices of the atoms
         from the topology that they include in their datasets."""
 
-        idxs_grp = self.h5['{}/{}'.format(SETTINGS, ALT_REPS_IDXS)]
-        return {name : ds[:] for name, ds in idxs_grp.items()}
+        alt_reps_idxs = self.h5['{}/{}'.format(SETTINGS, ALT_REPS_IDXS)]
+
+        # older files have a group with a dataset for each alt rep
+        if isinstance(alt_reps_idxs, h5py.Group):
+            return {name : ds[:] for name, ds in alt_reps_idxs.items()}
+
+        alt_reps_idxs = alt_reps_idxs[:]
+        return {name : idxs
+                for name, idxs in zip(alt_reps_idxs['name'], alt_reps_idxs['idxs'])}
 
     @property
     def alt_reps(self):
         """Names of the alt reps."""
 
-        idxs_grp = self.h5['{}/{}'.format(SETTINGS, ALT_REPS_IDXS)]
-        return {name for name in idxs_grp.keys()}
+        alt_reps_idxs = self.h5['{}/{}'.format(SETTINGS, ALT_REPS_IDXS)]
+
+        # older files have a group with a dataset for each alt rep
+        if isinstance(alt_reps_idxs, h5py.Group):
+            return {name for name in alt_reps_idxs.keys()}
+
+        return {name for name in alt_reps_idxs['name']}
 
 
     @property
@@ -2899,6 +5024,30 @@ class WepyHDF5(object):
         """Mapping of the names of the trajectory fields to their feature
         vector shapes."""
 
+        return dict(self._cached_field_feature_shapes)
+
+    @property
+    def _cached_field_feature_shapes(self):
+        """The cached feature vector shapes of the trajectory fields,
+        which must not be modified."""
+
+        # read from the file once each time it is opened
+        if self._field_feature_shapes_cache is None:
+            self._field_feature_shapes_cache = self._read_field_feature_shapes()
+
+        return self._field_feature_shapes_cache
+
+    def _read_field_feature_shapes(self):
+        """Read the feature vector shapes of the trajectory fields from
+        the file."""
+
+        if FIELDS_META in self.settings_grp:
+            fields_meta = self.settings_grp[FIELDS_META][:]
+            return {field_path : _field_shape_from_str(shape_str)
+                    for field_path, shape_str
+                    in zip(fields_meta['path'], fields_meta['shape'])}
+
+        # otherwise read them from the older per-field datasets
         shapes_grp = self.h5['{}/{}'.format(SETTINGS, FIELD_FEATURE_SHAPES_STR)]
 
         field_paths = _iter_field_paths(shapes_grp)
@@ -2918,6 +5067,30 @@ class WepyHDF5(object):
         """Mapping of the names of the trajectory fields to their feature
         vector numpy dtypes."""
 
+        return dict(self._cached_field_feature_dtypes)
+
+    @property
+    def _cached_field_feature_dtypes(self):
+        """The cached feature vector dtypes of the trajectory fields,
+        which must not be modified."""
+
+        # read from the file once each time it is opened
+        if self._field_feature_dtypes_cache is None:
+            self._field_feature_dtypes_cache = self._read_field_feature_dtypes()
+
+        return self._field_feature_dtypes_cache
+
+    def _read_field_feature_dtypes(self):
+        """Read the feature vector dtypes of the trajectory fields from
+        the file."""
+
+        if FIELDS_META in self.settings_grp:
+            fields_meta = self.settings_grp[FIELDS_META][:]
+            return {field_path : _field_dtype_from_str(dtype_str)
+                    for field_path, dtype_str
+                    in zip(fields_meta['path'], fields_meta['dtype'])}
+
+        # otherwise read them from the older per-field datasets
         dtypes_grp = self.h5['{}/{}'.format(SETTINGS, FIELD_FEATURE_DTYPES_STR)]
 
         field_paths = _iter_field_paths(dtypes_grp)
@@ -2926,20 +5099,20 @@ class WepyHDF5(object):
         for field_path in field_paths:
             dtype_str = dtypes_grp[field_path][()]
             # if there is 'None' flag for the dtype then return None
-            if dtype_str == NONE_STR:
-                dtypes[field_path] = None
-            else:
-                dtype_obj = json.loads(dtype_str)
-                dtype_obj = [tuple(d) for d in dtype_obj]
-                dtype = np.dtype(dtype_obj)
-                dtypes[field_path] = dtype
+            dtypes[field_path] = _field_dtype_from_str(dtype_str)
 
         return dtypes
 
     @property
     def continuations(self):
         """The continuation relationships in this file."""
-        return self.settings_grp[CONTINUATIONS][:]
+
+        # read from the file once each time it is opened and then kept
+        # up to date when continuations are added
+        if self._continuations_cache is None:
+            self._continuations_cache = self.settings_grp[CONTINUATIONS][:]
+
+        return self._continuations_cache.copy()
 
     @property
     def metadata(self):
@@ -2965,6 +5138,13 @@ class WepyHDF5(object):
         """
 
         enum_grp = self.decision_grp(run_idx)
+
+        enum_dset = enum_grp.get(DECISION_ENUM)
+        if isinstance(enum_dset, h5py.Dataset):
+            values = enum_dset[()]
+            return {decision_name : values[decision_name]
+                    for decision_name in values.dtype.names}
+
         enum = {}
         for decision_name, dset in enum_grp.items():
             enum[decision_name] = dset[()]
@@ -2988,13 +5168,8 @@ class WepyHDF5(object):
         WepyHDF5.decision_enum : for the reverse mapping
 
         """
-        enum_grp = self.decision_grp(run_idx)
-        rev_enum = {}
-        for decision_name, dset in enum_grp.items():
-            value = dset[()]
-            rev_enum[value] = decision_name
-
-        return rev_enum
+        return {value : decision_name
+                for decision_name, value in self.decision_enum(run_idx).items()}
 
     ### Topology
 
@@ -3057,7 +5232,14 @@ class WepyHDF5(object):
             The JSON topology string for the full representation.
 
         """
-        return self._h5[TOPOLOGY][()]
+
+        topology_dset = self._h5[TOPOLOGY]
+
+        # older files store the topology as a scalar string
+        if topology_dset.shape == ():
+            return topology_dset[()]
+        else:
+            return topology_dset[:].tobytes().decode('utf-8')
 
 
     def get_mdtraj_topology(self, alt_rep=POSITIONS):
@@ -3077,13 +5259,21 @@ class WepyHDF5(object):
 
         Returns
         -------
-        topology : str
-            The JSON topology string for the full representation.
+        topology : mdtraj.Topology
+            The topology for the representation. The same object is
+            returned for each call so it should not be modified.
 
         """
 
-        json_top = self.get_topology(alt_rep=alt_rep)
-        return json_to_mdtraj_topology(json_top)
+        # the topology can't change so it is only built once for
+        # each representation each time the file is opened
+        try:
+            return self._mdtraj_topology_cache[alt_rep]
+        except KeyError:
+            json_top = self.get_topology(alt_rep=alt_rep)
+            topology = json_to_mdtraj_topology(json_top)
+            self._mdtraj_topology_cache[alt_rep] = topology
+            return topology
 
     ## Initial walkers
 
@@ -3116,18 +5306,38 @@ class WepyHDF5(object):
         if walker_idxs is None:
             walker_idxs = range(self.num_init_walkers(run_idx))
 
-        init_walker_fields = {field : [] for field in fields}
+        # the walkers are frames of the field datasets
+        if self._init_walkers_packed(run_idx):
+            init_walkers_grp = self.init_walkers_grp(run_idx)
+            return {field : _read_frames_bulk(init_walkers_grp[field], walker_idxs)
+                    for field in fields}
+
+        # older files have a group for each walker
+        walker_grps = [self.init_walkers_grp(run_idx)[str(walker_idx)]
+                       for walker_idx in walker_idxs]
+
+        init_walker_fields = {}
+        for field in fields:
+
+            field_values = None
+            for walker_i, walker_grp in enumerate(walker_grps):
+                dset = walker_grp[field]
+
+                # make the array for all of the walkers once we know
+                # the shape and dtype of the field
+                if field_values is None:
+                    field_values = np.empty((len(walker_grps), *dset.shape[1:]),
+                                            dtype=dset.dtype)
 
-        # for each walker go through and add the selected fields
-        for walker_idx in walker_idxs:
-            init_walker_grp = self.init_walkers_grp(run_idx)[str(walker_idx)]
-            for field in fields:
                 # we remove the first dimension because we just want
                 # them as a single frame
-                init_walker_fields[field].append(init_walker_grp[field][:][0])
+                field_values[walker_i] = dset[0]
 
-        # convert the field values to arrays
-        init_walker_fields = {field : np.array(val) for field, val in init_walker_fields.items()}
+            # no walkers have no values
+            if field_values is None:
+                field_values = np.array([])
+
+            init_walker_fields[field] = field_values
 
         return init_walker_fields
 
@@ -3180,22 +5390,28 @@ class WepyHDF5(object):
     @property
     def num_atoms(self):
         """The number of atoms in the full topology representation."""
-        return self.h5['{}/{}'.format(SETTINGS, N_ATOMS)][()]
+        return self._dataset('{}/{}'.format(SETTINGS, N_ATOMS))[()]
 
     @property
     def num_dims(self):
         """The number of spatial dimensions in the positions and alt_reps trajectory fields."""
-        return self.h5['{}/{}'.format(SETTINGS, N_DIMS_STR)][()]
+        return self._dataset('{}/{}'.format(SETTINGS, N_DIMS_STR))[()]
 
     @property
     def num_runs(self):
         """The number of runs in the file."""
-        return len(self._h5[RUNS])
+
+        # runs are only added by this object so this is counted once
+        # and then kept up to date
+        if self._n_runs_cache is None:
+            self._n_runs_cache = len(self._h5[RUNS])
+
+        return self._n_runs_cache
 
     @property
     def num_trajs(self):
         """The total number of trajectories in the entire file."""
-        return len(list(self.run_traj_idx_tuples()))
+        return sum(self.num_run_trajs(run_idx) for run_idx in self.run_idxs)
 
     def num_init_walkers(self, run_idx):
         """The number of initial walkers for a run.
@@ -3210,6 +5426,9 @@ class WepyHDF5(object):
 
         """
 
+        if self._init_walkers_packed(run_idx):
+            return self.init_walkers_grp(run_idx)[WEIGHTS].shape[0]
+
         return len(self.init_walkers_grp(run_idx))
 
     def num_walkers(self, run_idx, cycle_idx):
@@ -3248,7 +5467,15 @@ class WepyHDF5(object):
         n_trajs : int
 
         """
-        return len(self._h5['{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES)])
+        run_idx = int(run_idx)
+
+        # trajectories are only added by this object so they are
+        # counted once and then kept up to date
+        if run_idx not in self._run_n_trajs_cache:
+            self._run_n_trajs_cache[run_idx] = len(
+                self._h5[_run_path(run_idx, TRAJECTORIES)])
+
+        return self._run_n_trajs_cache[run_idx]
 
     def num_run_cycles(self, run_idx):
         """The number of cycles in a run.
@@ -3277,12 +5504,13 @@ class WepyHDF5(object):
         n_frames : int
 
         """
-        return self.traj(run_idx, traj_idx)[POSITIONS].shape[0]
+        path = _traj_field_path(run_idx, traj_idx, POSITIONS)
+        return self._dataset(path).shape[0] + self._pending_n_frames(path)
 
     @property
     def run_idxs(self):
         """The indices of the runs in the file."""
-        return list(range(len(self._h5[RUNS])))
+        return list(range(self.num_runs))
 
     def run_traj_idxs(self, run_idx):
         """The indices of trajectories in a run.
@@ -3296,7 +5524,7 @@ class WepyHDF5(object):
         traj_idxs : list of int
 
         """
-        return list(range(len(self._h5['{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES)])))
+        return list(range(self.num_run_trajs(run_idx)))
 
     def run_traj_idx_tuples(self, runs=None):
         """Get identifier tuples (run_idx, traj_idx) for all trajectories in
@@ -3314,16 +5542,14 @@ class WepyHDF5(object):
             of (run_idx, traj_idx).
 
         """
-        tups = []
         if runs is None:
             run_idxs = self.run_idxs
         else:
             run_idxs = runs
-        for run_idx in run_idxs:
-            for traj_idx in self.run_traj_idxs(run_idx):
-                tups.append((run_idx, traj_idx))
 
-        return tups
+        return [(run_idx, traj_idx)
+                for run_idx in run_idxs
+                for traj_idx in range(self.num_run_trajs(run_idx))]
 
     def get_traj_field_cycle_idxs(self, run_idx, traj_idx, field_path):
         """Returns the cycle indices for a sparse trajectory field.
@@ -3341,17 +5567,19 @@ class WepyHDF5(object):
 
         """
 
-        traj_path = '{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx)
+        traj_path = _traj_path(run_idx, traj_idx)
 
-        if not field_path in self._h5[traj_path]:
+        if not field_path in self._dataset(traj_path):
             raise KeyError("key for field {} not found".format(field_path))
 
         # if the field is not sparse just return the cycle indices for
         # that run
-        if field_path not in self.sparse_fields:
-            cycle_idxs = np.array(range(self.num_run_cycles(run_idx)))
+        if field_path not in self._sparse_fields_set:
+            cycle_idxs = np.arange(self.num_run_cycles(run_idx))
         else:
-            cycle_idxs = self._h5[traj_path][field_path][SPARSE_IDXS][:]
+            self._flush_pending_traj(run_idx, traj_idx)
+            cycle_idxs = self._dataset('{}/{}'.format(
+                _traj_field_path(run_idx, traj_idx, field_path), SPARSE_IDXS))[:]
 
         return cycle_idxs
 
@@ -3399,21 +5627,12 @@ class WepyHDF5(object):
         is_contig : bool
 
         """
-        run_idx_continuations = [np.array([run_idxs[idx+1], run_idxs[idx]])
-                            for idx in range(len(run_idxs)-1)]
-        #gets the contigs array
-        continuations = self.settings_grp[CONTINUATIONS][:]
+        #gets the contigs array as a set of (continuation, base) pairs
+        continuations = set(map(tuple, self.continuations.tolist()))
 
         # checks if sub contigs are in contigs list or not.
-        for run_continuous in run_idx_continuations:
-            contig = False
-            for continuous in continuations:
-                if np.array_equal(run_continuous, continuous):
-                    contig = True
-            if not contig:
-                return False
-
-        return True
+        return all((run_idxs[idx+1], run_idxs[idx]) in continuations
+                   for idx in range(len(run_idxs)-1))
 
     def clone(self, path, mode='x'):
         """Clone the header information of this file into another file.
@@ -3445,7 +5664,8 @@ class WepyHDF5(object):
         assert mode in ['w', 'w-', 'x'], "must be opened in a file creation mode"
 
         # we manually construct an HDF5 and copy the groups over
-        new_h5 = h5py.File(path, mode=mode, libver=H5PY_LIBVER)
+        new_h5 = h5py.File(path, mode=mode, libver=H5PY_LIBVER,
+                           **self._chunk_cache_kwargs)
 
         new_h5.require_group(RUNS)
 
@@ -3461,7 +5681,11 @@ class WepyHDF5(object):
         # now make a WepyHDF5 object in "expert_mode" which means it
         # is just empy and we construct it manually, "surgically" as I
         # like to call it
-        new_wepy_h5 = WepyHDF5(path, expert_mode=True)
+        new_wepy_h5 = WepyHDF5(path, expert_mode=True,
+                               driver=self._driver,
+                               driver_kwargs=self._driver_kwargs,
+                               page_buf_size=self._page_buf_size,
+                               **self._chunk_cache_kwargs)
 
         # perform the surgery:
 
@@ -3518,6 +5742,7 @@ class WepyHDF5(object):
 
         # set the local run as the external link to the other run
         self._h5['{}/{}'.format(RUNS, here_run_idx)] = ext_run_link
+        self._n_runs_cache = None
 
         # run the initialization routines for adding a run
         self._add_run_init(here_run_idx, continue_run=continue_run)
@@ -3550,30 +5775,33 @@ class WepyHDF5(object):
             The new run idxs from the linking file.
         """
 
-        wepy_h5 = WepyHDF5(wepy_h5_path, mode='r')
+        # the other file is kept open while linking so that following
+        # each external link reuses it instead of opening and closing
+        # the file again. Linking writes to the runs in the other file
+        # and HDF5 opens them with the same access as this file, so it
+        # must be open in the same way.
+        wepy_h5 = WepyHDF5(wepy_h5_path, mode=self._h5.mode,
+                           **self._chunk_cache_kwargs)
         with wepy_h5:
             ext_run_idxs = wepy_h5.run_idxs
             continuations = wepy_h5.continuations
 
-        # add the runs
-        new_run_idxs = []
-        for ext_run_idx in ext_run_idxs:
+            # add the runs
+            new_run_idxs = []
+            for ext_run_idx in ext_run_idxs:
 
-            # link the next run, and get its new run index
-            new_run_idx = self.link_run(wepy_h5_path, ext_run_idx)
+                # link the next run, and get its new run index
+                new_run_idx = self.link_run(wepy_h5_path, ext_run_idx)
 
-            # save that run idx
-            new_run_idxs.append(new_run_idx)
+                # save that run idx
+                new_run_idxs.append(new_run_idx)
 
         # copy the continuations over translating the run idxs,
-        # for each continuation in the other files continuations
-        for continuation in continuations:
-
-            # translate each run index from the external file
-            # continuations to the run idxs they were just assigned in
-            # this file
-            self.add_continuation(new_run_idxs[continuation[0]],
-                                  new_run_idxs[continuation[1]])
+        # each run index from the external file continuations is
+        # translated to the run idx it was just assigned in this file
+        self.add_continuations([(new_run_idxs[continuation[0]],
+                                 new_run_idxs[continuation[1]])
+                                for continuation in continuations])
 
         return new_run_idxs
 
@@ -3615,8 +5843,9 @@ class WepyHDF5(object):
         # do the copying
 
         # open the other file and get the runs in it and the
-        # continuations it has
-        wepy_h5 = WepyHDF5(filepath, mode='r')
+        # continuations it has, the run is read through the same size
+        # of chunk cache as this file has
+        wepy_h5 = WepyHDF5(filepath, mode='r', **self._chunk_cache_kwargs)
 
 
 
@@ -3687,7 +5916,7 @@ class WepyHDF5(object):
 
         # open the other file and get the runs in it and the
         # continuations it has
-        wepy_h5 = WepyHDF5(wepy_h5_path, mode='r')
+        wepy_h5 = WepyHDF5(wepy_h5_path, mode='r', **self._chunk_cache_kwargs)
         with wepy_h5:
             # the run idx in the external file
             ext_run_idxs = wepy_h5.run_idxs
@@ -3713,14 +5942,11 @@ class WepyHDF5(object):
             was_closed = True
 
         # copy the continuations over translating the run idxs,
-        # for each continuation in the other files continuations
-        for continuation in continuations:
-
-            # translate each run index from the external file
-            # continuations to the run idxs they were just assigned in
-            # this file
-            self.add_continuation(new_run_idxs[continuation[0]],
-                                  new_run_idxs[continuation[1]])
+        # each run index from the external file continuations is
+        # translated to the run idx it was just assigned in this file
+        self.add_continuations([(new_run_idxs[continuation[0]],
+                                 new_run_idxs[continuation[1]])
+                                for continuation in continuations])
 
         if was_closed:
             self.close()
@@ -3742,12 +5968,20 @@ class WepyHDF5(object):
 
         """
 
+        # the runs are added after the ones already in this file
+        start_run_idx = self.next_run_idx()
+
         with other_h5 as h5:
-            for run_idx in h5.run_idxs:
+            for i, run_idx in enumerate(h5.run_idxs):
                 # the other run group handle
                 other_run = h5.run(run_idx)
-                # copy this run to this file in the next run_idx group
-                self.h5.copy(other_run, '{}/{}'.format(RUNS, self.next_run_idx()))
+                # copy this run to this file in the next run_idx group,
+                # references and links are copied as they are
+                self.h5.copy(other_run, _run_path(start_run_idx + i),
+                             expand_soft=False, expand_external=False,
+                             expand_refs=False)
+
+        self._n_runs_cache = None
 
 
     ### initialization and data generation
@@ -3789,17 +6023,17 @@ class WepyHDF5(object):
         # make a dataset for the sparse fields allowed.  this requires
         # a 'special' datatype for variable length strings. This is
         # supported by HDF5 but not numpy.
-        vlen_str_dt = h5py.special_dtype(vlen=str)
 
-        # create the dataset with the strings of the fields which are records
-        record_group_fields_ds = record_fields_grp.create_dataset(run_record_key,
-                                                             (len(record_fields),),
-                                                                  dtype=vlen_str_dt,
-                                                                  maxshape=(None,))
+        # create the dataset with the strings of the fields which are
+        # records, these are never added to so it is not resizable
+        # and can be stored contiguously, all of the strings are
+        # written at once
+        record_fields_grp.create_dataset(run_record_key,
+                                         data=np.array(list(record_fields), dtype=object),
+                                         dtype=VLEN_STR_DTYPE,
+                                         track_times=TRACK_TIMES)
 
-        # set the flags
-        for i, record_field in enumerate(record_fields):
-            record_group_fields_ds[i] = record_field
+        self._record_fields_cache = None
 
     def init_resampling_record_fields(self, resampler):
         """Initialize the record fields for this record group.
@@ -3868,11 +6102,39 @@ class WepyHDF5(object):
 
         """
 
+        self.add_continuations([(continuation_run, base_run)])
+
+    def add_continuations(self, continuations):
+        """Add a batch of continuations between runs.
+
+        The continuations dataset is resized and written once for all
+        of them.
+
+        Parameters
+        ----------
+        continuations : iterable of (int, int)
+            Pairs of the run index of the continuing run and the run
+            index of the run being continued.
+
+        """
+
+        new_continuations = np.asarray(list(continuations), dtype=int).reshape((-1, 2))
+        n_new = new_continuations.shape[0]
+
+        if n_new == 0:
+            return
+
         continuations_dset = self.settings_grp[CONTINUATIONS]
-        continuations_dset.resize((continuations_dset.shape[0] + 1, continuations_dset.shape[1],))
-        continuations_dset[continuations_dset.shape[0] - 1] = np.array([continuation_run, base_run])
+        n_old = continuations_dset.shape[0]
+        continuations_dset.resize((n_old + n_new, continuations_dset.shape[1],))
+        continuations_dset[n_old:n_old + n_new] = new_continuations
 
-    def new_run(self, init_walkers, continue_run=None, **kwargs):
+        if self._continuations_cache is not None:
+            self._continuations_cache = np.concatenate(
+                [self._continuations_cache,
+                 new_continuations.astype(self._continuations_cache.dtype)])
+
+    def new_run(self, init_walkers, continue_run=None, n_cycles=None, **kwargs):
         """Initialize a new run.
 
         Parameters
@@ -3881,6 +6143,12 @@ class WepyHDF5(object):
             The walkers that will be the start of this run.
         continue_run : int, optional
             If this run is a continuation of another set which one it is continuing.
+        n_cycles : int, optional
+            The number of cycles the run is expected to have. Used to
+            size the chunks of the trajectory datasets so that short
+            runs don't allocate space for frames they never write. It
+            is saved in the run metadata. The run can still be
+            extended past this.
 
         kwargs : dict
             Metadata to set for the run.
@@ -3902,7 +6170,9 @@ class WepyHDF5(object):
         new_run_idx = self.next_run_idx()
 
         # create a new group named the next integer in the counter
-        run_grp = self._h5.create_group('{}/{}'.format(RUNS, new_run_idx))
+        run_grp = self._h5.create_group(_run_path(new_run_idx))
+        self._h5_cache[_run_path(new_run_idx)] = run_grp
+        self._n_runs_cache = None
 
 
         # set the initial walkers group
@@ -3912,11 +6182,17 @@ class WepyHDF5(object):
 
         # initialize the walkers group
         traj_grp = run_grp.create_group(TRAJECTORIES)
+        self._h5_cache[_run_path(new_run_idx, TRAJECTORIES)] = traj_grp
 
 
         # run the initialization routines for adding a run
         self._add_run_init(new_run_idx, continue_run=continue_run)
 
+        # save the expected number of cycles so it is used for
+        # chunking whenever the run is extended
+        if n_cycles is not None:
+            run_grp.attrs[RUN_N_CYCLES] = int(n_cycles)
+
 
         # add metadata if given
         for key, val in kwargs.items():
@@ -4107,8 +6383,25 @@ class WepyHDF5(object):
         """
 
         decision_grp = self.run(run_idx).create_group(DECISION)
-        for name, value in decision_enum_dict.items():
-            decision_grp.create_dataset(name, data=value)
+
+        if not decision_enum_dict:
+            return
+
+        # a dataset for each value in the version 1 layout
+        if self.format_version < 2:
+            for decision_name, value in decision_enum_dict.items():
+                decision_grp.create_dataset(decision_name, data=value,
+                                            track_times=TRACK_TIMES)
+            return
+
+        # all of the values go in the fields of a single compound
+        # value so there is only one object to create
+        names = list(decision_enum_dict.keys())
+        values = [np.asarray(value) for value in decision_enum_dict.values()]
+        enum_dtype = np.dtype([(name, value.dtype) for name, value in zip(names, values)])
+        enum_arr = np.array(tuple(values), dtype=enum_dtype)
+
+        _create_compact_dataset(decision_grp, DECISION_ENUM, enum_arr)
 
 
     def init_run_fields_resampler(self, run_idx, fields):
@@ -4262,15 +6555,31 @@ class WepyHDF5(object):
 
         # positions are mandatory
         assert POSITIONS in traj_data, "positions must be given to create a trajectory"
-        assert isinstance(traj_data[POSITIONS], np.ndarray)
 
-        n_frames = traj_data[POSITIONS].shape[0]
+        # arrays are used as they are without copying
+        positions = np.asarray(traj_data[POSITIONS])
+        if positions is not traj_data[POSITIONS]:
+            traj_data = dict(traj_data)
+            traj_data[POSITIONS] = positions
+
+        n_frames = positions.shape[0]
+
+        # check to make sure the positions are the right shape before
+        # anything is written
+        n_atoms = self.num_atoms
+        n_dims = self.num_dims
+        assert positions.shape[1] == n_atoms, \
+            "positions given have different number of atoms: {}, should be {}".format(
+                positions.shape[1], n_atoms)
+        assert positions.shape[2] == n_dims, \
+            "positions given have different number of dims: {}, should be {}".format(
+                positions.shape[2], n_dims)
 
         # if weights are None then we assume they are 1.0
         if weights is None:
             weights = np.ones((n_frames, 1), dtype=float)
         else:
-            assert isinstance(weights, np.ndarray), "weights must be a numpy.ndarray"
+            weights = np.asarray(weights)
             assert weights.shape[0] == n_frames,\
                 "weights and the number of frames must be the same length"
 
@@ -4278,8 +6587,10 @@ class WepyHDF5(object):
         traj_idx = self.next_run_traj_idx(run_idx)
         # make a group for this trajectory, with the current traj_idx
         # for this run
-        traj_grp = self._h5.create_group(
-                        '{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx))
+        traj_path = _traj_path(run_idx, traj_idx)
+        traj_grp = self._h5.create_group(traj_path)
+        self._h5_cache[traj_path] = traj_grp
+        self._run_n_trajs_cache.pop(int(run_idx), None)
 
         # add the run_idx as metadata
         traj_grp.attrs[RUN_IDX] = run_idx
@@ -4294,23 +6605,16 @@ class WepyHDF5(object):
             else:
                 warn("run_idx and traj_idx are used by wepy and cannot be set", RuntimeWarning)
 
-
-        # check to make sure the positions are the right shape
-        assert traj_data[POSITIONS].shape[1] == self.num_atoms, \
-            "positions given have different number of atoms: {}, should be {}".format(
-                traj_data[POSITIONS].shape[1], self.num_atoms)
-        assert traj_data[POSITIONS].shape[2] == self.num_dims, \
-            "positions given have different number of dims: {}, should be {}".format(
-                traj_data[POSITIONS].shape[2], self.num_dims)
-
         # add datasets to the traj group
 
         # weights
         traj_grp.create_dataset(WEIGHTS, data=weights, dtype=WEIGHT_DTYPE,
-                                maxshape=(None, *WEIGHT_SHAPE))
+                                maxshape=(None, *WEIGHT_SHAPE),
+                                chunks=self._traj_chunks(run_idx, WEIGHT_SHAPE, WEIGHT_DTYPE),
+                                track_times=TRACK_TIMES)
         # positions
 
-        positions_shape = traj_data[POSITIONS].shape
+        positions_shape = positions.shape
 
         # add the rest of the traj_data
         for field_path, field_data in traj_data.items():
@@ -4322,8 +6626,8 @@ class WepyHDF5(object):
             # we still need to initialize it as a sparse field so it
             # can be extended properly so we make sparse_idxs to match
             # the full length of this initial trajectory data
-            elif field_path in self.sparse_fields:
-                field_sparse_idxs = np.arange(positions_shape[0])
+            elif field_path in self._sparse_fields_set:
+                field_sparse_idxs = np.arange(positions_shape[0], dtype=np.int64)
             # otherwise it is not a sparse field so we just pass in None
             else:
                 field_sparse_idxs = None
@@ -4333,15 +6637,10 @@ class WepyHDF5(object):
 
         ## initialize empty sparse fields
         # get the sparse field datasets that haven't been initialized
-        traj_init_fields = list(sparse_idxs.keys()) + list(traj_data.keys())
-        uninit_sparse_fields = set(self.sparse_fields).difference(traj_init_fields)
-        # the shapes
-        uninit_sparse_shapes = [self.field_feature_shapes[field] for field in uninit_sparse_fields]
-        # the dtypes
-        uninit_sparse_dtypes = [self.field_feature_dtypes[field] for field in uninit_sparse_fields]
+        uninit_sparse_fields = self._sparse_fields_set.difference(sparse_idxs.keys(),
+                                                                  traj_data.keys())
         # initialize the sparse fields in the hdf5
-        self._init_traj_fields(run_idx, traj_idx,
-                               uninit_sparse_fields, uninit_sparse_shapes, uninit_sparse_dtypes)
+        self._init_traj_fields(run_idx, traj_idx, uninit_sparse_fields)
 
         return traj_grp
 
@@ -4373,10 +6672,10 @@ class WepyHDF5(object):
 
         # calculate the new sparse idxs for sparse fields that may be
         # being added
-        sparse_idxs = np.array(range(n_frames, n_frames + n_new_frames))
+        sparse_idxs = np.arange(n_frames, n_frames + n_new_frames, dtype=np.int64)
 
         # get the trajectory group
-        traj_grp = self._h5['{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx)]
+        traj_grp = self.traj(run_idx, traj_idx)
 
         ## weights
 
@@ -4384,22 +6683,18 @@ class WepyHDF5(object):
         if weights is None:
             weights = np.ones((n_new_frames, 1), dtype=float)
         else:
-            assert isinstance(weights, np.ndarray), "weights must be a numpy.ndarray"
+            weights = np.asarray(weights)
             assert weights.shape[0] == n_new_frames,\
                 "weights and the number of frames must be the same length"
 
         # add the weights
-        weights_ds = traj_grp[WEIGHTS]
-
-        # append to the dataset on the first dimension, keeping the
-        # others the same, if they exist
-        if len(weights_ds.shape) > 1:
-            weights_ds.resize( (weights_ds.shape[0] + n_new_frames, *weights_ds.shape[1:]) )
-        else:
-            weights_ds.resize( (weights_ds.shape[0] + n_new_frames, ) )
+        weights_path = _traj_field_path(run_idx, traj_idx, WEIGHTS)
+        self._append_frames(weights_path, weights)
 
-        # add the new data
-        weights_ds[-n_new_frames:, ...] = weights
+        # the positions have the largest chunks of the trajectory
+        if not self._chunk_cache_checked:
+            self._check_chunk_cache(self._dataset(
+                _traj_field_path(run_idx, traj_idx, POSITIONS)))
 
 
         # add the other fields
@@ -4422,9 +6717,9 @@ class WepyHDF5(object):
                     feature_dtype = field_data.dtype
 
                     # not specified as sparse_field, no settings
-                    if (not field_path in self.field_feature_shapes) and \
-                         (not field_path in self.field_feature_dtypes) and \
-                         not field_path in self.sparse_fields:
+                    if (not field_path in self._cached_field_feature_shapes) and \
+                         (not field_path in self._cached_field_feature_dtypes) and \
+                         not field_path in self._sparse_fields_set:
                         # only save if it is an observable
                         is_observable = False
                         if '/' in field_path:
@@ -4443,9 +6738,9 @@ class WepyHDF5(object):
                                 "it is being ignored because it is not an observable.".format(field_path))
 
                     # specified as sparse_field but no settings given
-                    elif (self.field_feature_shapes[field_path] is None and
-                       self.field_feature_dtypes[field_path] is None) and \
-                       field_path in self.sparse_fields:
+                    elif (self._cached_field_feature_shapes[field_path] is None and
+                       self._cached_field_feature_dtypes[field_path] is None) and \
+                       field_path in self._sparse_fields_set:
                         # set the feature shape and dtype since these
                         # should be 0 in the settings
                         self._set_field_feature_shape(field_path, feature_shape)
@@ -4456,7 +6751,7 @@ class WepyHDF5(object):
                     self._init_traj_field(run_idx, traj_idx, field_path, feature_shape, feature_dtype)
 
             # extend it either as a sparse field or a contiguous field
-            if field_path in self.sparse_fields:
+            if field_path in self._sparse_fields_set:
                 self._extend_sparse_traj_field(run_idx, traj_idx, field_path, field_data, sparse_idxs)
             else:
                 self._extend_contiguous_traj_field(run_idx, traj_idx, field_path, field_data)
@@ -4576,11 +6871,27 @@ class WepyHDF5(object):
             # add an array of the cycle idx for each record
             record_cycle_idxs_ds[n_existing_records:] = np.full((n_new_records,), cycle_idx)
 
-        # then add all the data for the field
+        # gather the values of each field over all of the records so
+        # each field dataset is extended once
+        field_values = {}
         for record_dict in fields_data:
             for field_name, field_data in record_dict.items():
-                self._extend_run_record_data_field(run_idx, run_record_key,
-                                                   field_name, np.array([field_data]))
+                field_values.setdefault(field_name, []).append(field_data)
+
+        for field_name, values in field_values.items():
+
+            field_dtype = self._dataset(_run_path(run_idx, '{}/{}'.format(
+                run_record_key, field_name))).dtype
+
+            # variable length rows can't be stacked into one array,
+            # otherwise they are stacked in the type they are stored as
+            if h5py.check_dtype(vlen=field_dtype) is not None:
+                field_data = [np.asarray(value) for value in values]
+            else:
+                field_data = np.asarray(values, dtype=field_dtype)
+
+            self._extend_run_record_data_field(run_idx, run_record_key,
+                                               field_name, field_data)
 
     ### Analysis Routines
 
@@ -4637,14 +6948,14 @@ class WepyHDF5(object):
         if len(record_fields) == 0:
             return []
 
-        # get the iterator for the record idxs, if the group is
-        # sporadic then we just use the cycle idxs
-        if self._is_sporadic_records(run_record_key):
-            records = self._run_records_sporadic(run_idxs, run_record_key)
-        else:
-            records = self._run_records_continual(run_idxs, run_record_key)
+        cycle_idxs, field_values = self._run_contig_record_columns(run_idxs, run_record_key)
 
-        return records
+        # convert the values to something amenable to a table and
+        # make the records from them
+        fields = {record_field : self._table_column_from_values(values)
+                  for record_field, values in field_values.items()}
+
+        return self._make_records(run_record_key, cycle_idxs, fields)
 
     def run_records_dataframe(self, run_idx, run_record_key):
         """Get the records for a record group for a single run in the form of
@@ -4660,8 +6971,7 @@ class WepyHDF5(object):
         -------
         record_df : pandas.DataFrame
         """
-        records = self.run_records(run_idx, run_record_key)
-        return pd.DataFrame(records)
+        return self.run_contig_records_dataframe([run_idx], run_record_key)
 
     def run_contig_records_dataframe(self, run_idxs, run_record_key):
         """Get the records for a record group for a contig of runs in the form
@@ -4680,8 +6990,22 @@ class WepyHDF5(object):
         records_df : pandas.DataFrame
 
         """
-        records = self.run_contig_records(run_idxs, run_record_key)
-        return pd.DataFrame(records)
+
+        # if there are no fields there are no records
+        record_fields = self.record_fields[run_record_key]
+        if len(record_fields) == 0:
+            return pd.DataFrame([])
+
+        cycle_idxs, field_values = self._run_contig_record_columns(run_idxs, run_record_key)
+
+        # the columns are made directly from the arrays read so that
+        # pandas doesn't have to infer the types from each record
+        columns = {CYCLE_IDX : cycle_idxs}
+        for record_field in record_fields:
+            columns[record_field] = self._dataframe_column_from_values(
+                field_values[record_field])
+
+        return pd.DataFrame(columns, columns=[CYCLE_IDX] + record_fields)
 
     # application level specific methods for each main group
 
@@ -4725,7 +7049,7 @@ class WepyHDF5(object):
 
         """
 
-        return pd.DataFrame(self.resampling_records(run_idxs))
+        return self.run_contig_records_dataframe(run_idxs, RESAMPLING)
 
     # resampler records
     def resampler_records(self, run_idxs):
@@ -4767,7 +7091,7 @@ class WepyHDF5(object):
 
         """
 
-        return pd.DataFrame(self.resampler_records(run_idxs))
+        return self.run_contig_records_dataframe(run_idxs, RESAMPLER)
 
     # warping
     def warping_records(self, run_idxs):
@@ -4809,7 +7133,7 @@ class WepyHDF5(object):
 
         """
 
-        return pd.DataFrame(self.warping_records(run_idxs))
+        return self.run_contig_records_dataframe(run_idxs, WARPING)
 
     # boundary conditions
     def bc_records(self, run_idxs):
@@ -4851,7 +7175,7 @@ class WepyHDF5(object):
 
         """
 
-        return pd.DataFrame(self.bc_records(run_idxs))
+        return self.run_contig_records_dataframe(run_idxs, BC)
 
     # progress
     def progress_records(self, run_idxs):
@@ -4893,7 +7217,7 @@ class WepyHDF5(object):
 
         """
 
-        return pd.DataFrame(self.progress_records(run_idxs))
+        return self.run_contig_records_dataframe(run_idxs, PROGRESS)
 
 
     def run_resampling_panel(self, run_idx):
@@ -4963,6 +7287,41 @@ class WepyHDF5(object):
 
         self._add_run_field(run_idx, obs_path, data, sparse_idxs=sparse_idxs)
 
+    def append_run_observable(self, run_idx, observable_name, data):
+        """Append frames to a trajectory sub-field in the compound field
+        "observables" for each trajectory of a run, creating it on the
+        first call.
+
+        This is for observables computed as a run goes, e.g. every
+        cycle. The frames are appended the same way as by
+        `extend_traj` so each dataset is only grown once per call and
+        the appends can be buffered with `buffered_writes`.
+
+        Parameters
+        ----------
+        run_idx : int
+        observable_name : str
+            What to name the observable subfield.
+        data : arraylike of shape (n_trajs, n_new_frames, feature_vector_shape[0], ...)
+            The new frames for each of the trajectories of the run.
+
+        """
+
+        obs_path = '{}/{}'.format(OBSERVABLES, observable_name)
+
+        assert len(data) == self.num_run_trajs(run_idx),\
+            "The number of trajectories in data, {}, is different than the number"\
+            "of trajectories in the run, {}.".format(len(data), self.num_run_trajs(run_idx))
+
+        for idx_tup, traj_data in zip(self.run_traj_idx_tuples([run_idx]), data):
+
+            traj_data = np.asarray(traj_data)
+
+            if obs_path in self._dataset(_traj_path(*idx_tup)):
+                self._extend_contiguous_traj_field(*idx_tup, obs_path, traj_data)
+            else:
+                self._add_traj_field_data(*idx_tup, obs_path, traj_data)
+
     def add_traj_observable(self, observable_name, data, sparse_idxs=None):
         """Add a trajectory sub-field in the compound field "observables" for
         an entire file, on a trajectory basis.
@@ -5041,10 +7400,83 @@ class WepyHDF5(object):
             sparse_idxs=sparse_idxs,
         )
 
+    def retune_chunks(self, field_path, chunk_shape):
+        """Rewrite a trajectory field in every trajectory with a new
+        chunk shape, e.g. single frame chunks for files mostly read a
+        few frames at a time.
+
+        The data and filters of the field are unchanged. The space of
+        the old datasets is not reclaimed until the file is repacked
+        (e.g. with h5repack).
+
+        Parameters
+        ----------
+        field_path : str
+            Name of the trajectory field.
+        chunk_shape : tuple of int
+            The new chunk shape, the number of frames followed by the
+            feature dimensions.
+
+        """
+
+        assert self.mode in self.WRITE_MODES, "File must be in a write mode"
+
+        chunk_shape = tuple(int(dim) for dim in chunk_shape)
+
+        # the old datasets are read so they need everything written
+        self.flush_pending()
+
+        # copy in blocks of whole new chunks
+        block_frames = chunk_shape[0] * max(1, MAX_CHUNK_FRAMES // chunk_shape[0])
+
+        for run_idx, traj_idx in self.run_traj_idx_tuples():
+
+            if not field_path in self._dataset(_traj_path(run_idx, traj_idx)):
+                continue
+
+            path = _traj_field_path(run_idx, traj_idx, field_path)
+            if field_path in self._sparse_fields_set:
+                path = '{}/{}'.format(path, DATA)
+
+            old_dset = self.h5[path]
+            parent_grp = old_dset.parent
+            dset_name = old_dset.name.split('/')[-1]
+            new_name = '{}_rechunked'.format(dset_name)
+
+            new_dset = parent_grp.create_dataset(new_name, old_dset.shape,
+                                                 dtype=old_dset.dtype,
+                                                 maxshape=old_dset.maxshape,
+                                                 chunks=chunk_shape,
+                                                 compression=old_dset.compression,
+                                                 compression_opts=old_dset.compression_opts,
+                                                 shuffle=old_dset.shuffle,
+                                                 scaleoffset=old_dset.scaleoffset,
+                                                 track_times=TRACK_TIMES)
+
+            n_frames = old_dset.shape[0]
+            for block_start in range(0, n_frames, block_frames):
+                block = old_dset[block_start : block_start + block_frames]
+
+                direct_start, direct_end = _write_direct_chunks(new_dset, block_start, block)
+
+                if direct_start > 0:
+                    new_dset[block_start : block_start + direct_start] = block[:direct_start]
+
+                if direct_end < block.shape[0]:
+                    new_dset[block_start + direct_end : block_start + block.shape[0]] = \
+                                                                    block[direct_end:]
+
+            del parent_grp[dset_name]
+            parent_grp.move(new_name, dset_name)
+
+        # the cached handles are to the old datasets
+        self._clear_h5_cache()
+
     def compute_observable(self, func, fields, args,
                            map_func=map,
                            traj_sel=None,
-                           save_to_hdf5=None, idxs=False, return_results=True):
+                           save_to_hdf5=None, idxs=False, return_results=True,
+                           n_workers=None):
         """Compute an observable on the trajectory data according to a
         function. Optionally save that data in the observables data group for
         the trajectory.
@@ -5087,6 +7519,11 @@ class WepyHDF5(object):
             using the 'save_to_hdf5' option, be sure to use this or
             results will be lost.
 
+        n_workers : int, optional
+            If given compute the observable over a pool of this many
+            processes instead of with `map_func`, see
+            `WepyHDF5.traj_fields_map`.
+
         Returns
         -------
 
@@ -5119,7 +7556,8 @@ class WepyHDF5(object):
         # map over the trajectories and apply the function and save
         # the results
         for result in self.traj_fields_map(func, fields, args,
-                                           map_func=map_func, traj_sel=traj_sel, idxs=True):
+                                           map_func=map_func, traj_sel=traj_sel, idxs=True,
+                                           n_workers=n_workers):
 
             idx_tup, obs_features = result
 
@@ -5156,7 +7594,8 @@ class WepyHDF5(object):
                 return results
     ## Trajectory Getters
 
-    def get_traj_field(self, run_idx, traj_idx, field_path, frames=None, masked=True):
+    def get_traj_field(self, run_idx, traj_idx, field_path, frames=None, masked=True,
+                       lazy=False, out=None):
         """Returns a numpy array for the given trajectory field.
 
         You can control how sparse fields are returned using the
@@ -5172,35 +7611,122 @@ class WepyHDF5(object):
         field_path : str
             Name of the trajectory field to get
 
-        frames : None or list of int
+        frames : None or list of int or arraylike of bool
             If not None, a list of the frame indices of the trajectory
-            to return values for.
+            to return values for, or a boolean mask over the frames
+            of the trajectory.
 
         masked : bool
             If true will return sparse field values as masked arrays,
             otherwise just returns the compacted data.
 
+        lazy : bool
+            If true will return sparse field values as a SparseField
+            of the compacted data and its frame indices, without
+            making a full size array. Has no effect for contiguous
+            fields.
+
+        out : numpy.ndarray, optional
+            If given the field data is read into this array instead of
+            a new one, e.g. to reuse a buffer over many
+            trajectories. It must match the shape of the data, and can
+            only be given when all frames are read, and for sparse
+            fields only if they aren't masked.
+
         Returns
         -------
-        field_data : arraylike
+        field_data : arraylike or SparseField
             The data for the trajectory field.
 
-        """
+        Raises
+        ------
+        ValueError
+            If `out` is given when it can't be read into.
 
-        traj_path = '{}/{}/{}/{}'.format(RUNS, run_idx, TRAJECTORIES, traj_idx)
+        """
 
-        # if the field doesn't exist return None
-        if not field_path in self._h5[traj_path]:
+        # check the field exists by getting its handle, which is
+        # cached so only the first read of a field looks it up in the
+        # file
+        try:
+            self._dataset(_traj_field_path(run_idx, traj_idx, field_path))
+        except KeyError:
             raise KeyError("key for field {} not found".format(field_path))
-            # return None
+
+        # a mask is read as the frames it selects, which are then
+        # read in runs of consecutive frames
+        if frames is not None:
+            frames = np.asarray(frames)
+            if frames.dtype == bool:
+                frames = np.flatnonzero(frames)
 
         # get the field depending on whether it is sparse or not
-        if field_path in self.sparse_fields:
+        if field_path in self._sparse_fields_set:
             return self._get_sparse_traj_field(run_idx, traj_idx, field_path,
-                                               frames=frames, masked=masked)
+                                               frames=frames, masked=masked, lazy=lazy,
+                                               out=out)
         else:
             return self._get_contiguous_traj_field(run_idx, traj_idx, field_path,
-                                                   frames=frames)
+                                                   frames=frames, out=out)
+
+    def iter_traj_field_chunks(self, run_idx, traj_idx, field_path):
+        """Generator over the data of a trajectory field in blocks of
+        frames aligned with how the dataset is chunked on disk.
+
+        Each block is read with a single slice covering whole chunks
+        so that no chunk is decompressed more than once.
+
+        Parameters
+        ----------
+        run_idx : int
+        traj_idx : int
+        field_path : str
+            Name of the trajectory field to iterate over.
+
+        Yields
+        ------
+        frame_idxs : arraylike of int
+            The frame (cycle) indices of the block, for sparse fields
+            these are the cycles that have values.
+
+        field_data : arraylike
+            The data for the frames of the block.
+
+        """
+
+        traj_path = _traj_path(run_idx, traj_idx)
+
+        if not field_path in self._dataset(traj_path):
+            raise KeyError("key for field {} not found".format(field_path))
+
+        self._flush_pending_traj(run_idx, traj_idx)
+
+        field = self._dataset(_traj_field_path(run_idx, traj_idx, field_path))
+
+        if field_path in self._sparse_fields_set:
+            dset = field[DATA]
+            sparse_idxs = field[SPARSE_IDXS]
+        else:
+            dset = field
+            sparse_idxs = None
+
+        n_frames = dset.shape[0]
+
+        # contiguous datasets are read in blocks of the default size
+        if dset.chunks is None:
+            block_size = MAX_CHUNK_FRAMES
+        else:
+            block_size = dset.chunks[0]
+
+        for start in range(0, n_frames, block_size):
+            stop = min(start + block_size, n_frames)
+
+            if sparse_idxs is None:
+                frame_idxs = np.arange(start, stop)
+            else:
+                frame_idxs = sparse_idxs[start:stop]
+
+            yield frame_idxs, dset[start:stop]
 
     def get_trace_fields(self,
                          frame_tups,
@@ -5292,22 +7818,53 @@ class WepyHDF5(object):
 
         else:
 
-            frame_fields = {field : [] for field in fields}
-            for run_idx, traj_idx, cycle_idx in frame_tups:
-                for field in fields:
-                    frame_field = self.get_traj_field(
-                        run_idx,
-                        traj_idx,
-                        field,
-                        frames=[cycle_idx],
-                    )
-                    # the first dimension doesn't matter here since we
-                    # only get one frame at a time.
-                    frame_fields[field].append(frame_field[0])
-
-            # combine all the parts of each field into single arrays
+            # group the frames by trajectory so that each field of a
+            # trajectory is read only once, remembering where each
+            # frame goes in the trace
+            trace_arr = np.asarray(frame_tups, dtype=np.int64).reshape((-1, 3))
+
+            traj_keys, trace_traj_idxs = np.unique(trace_arr[:, :2], axis=0,
+                                                   return_inverse=True)
+            trace_traj_idxs = trace_traj_idxs.reshape(-1)
+
+            # the trace indices grouped by trajectory, keeping their
+            # order within each trajectory
+            trace_order = np.argsort(trace_traj_idxs, kind='stable')
+            traj_bounds = np.concatenate(([0], np.cumsum(np.bincount(trace_traj_idxs,
+                                                                     minlength=len(traj_keys)))))
+
+            traj_frames = {}
+            traj_trace_idxs = {}
+            for traj_i, (run_idx, traj_idx) in enumerate(traj_keys):
+                trace_idxs = trace_order[traj_bounds[traj_i] : traj_bounds[traj_i + 1]]
+
+                traj_key = (int(run_idx), int(traj_idx))
+                traj_frames[traj_key] = trace_arr[trace_idxs, 2]
+                traj_trace_idxs[traj_key] = trace_idxs
+
+            frame_fields = {}
             for field in fields:
-                frame_fields[field] = np.array(frame_fields[field])
+
+                field_values = None
+                for traj_key, frames in traj_frames.items():
+                    run_idx, traj_idx = traj_key
+
+                    traj_values = self.get_traj_field(run_idx, traj_idx, field,
+                                                      frames=frames)
+
+                    # make the array for the whole trace once we know
+                    # the shape and dtype of the field
+                    if field_values is None:
+                        field_values = np.empty((len(frame_tups), *traj_values.shape[1:]),
+                                                dtype=traj_values.dtype)
+
+                    field_values[traj_trace_idxs[traj_key]] = traj_values
+
+                # an empty trace has no values
+                if field_values is None:
+                    field_values = np.array([])
+
+                frame_fields[field] = field_values
 
         return frame_fields
 
@@ -5333,26 +7890,41 @@ class WepyHDF5(object):
             for the trace.
 
         """
-        frame_fields = {field : [] for field in fields}
-        for traj_idx, cycle_idx in frame_tups:
-            for field in fields:
+        return self.get_trace_fields([(run_idx, traj_idx, cycle_idx)
+                                      for traj_idx, cycle_idx in frame_tups],
+                                     fields)
 
+    def get_cycle_trace_fields(self, run_idx, cycle_idx, fields):
+        """Get trajectory field data for all of the walkers of a run at a
+        single cycle, e.g. the weights of every walker at cycle k.
 
+        Each trajectory is read with a single selection from its
+        cached dataset handle.
 
+        Parameters
+        ----------
+        run_idx : int
 
-                frame_field = self.get_traj_field(run_idx, traj_idx, field, frames=[cycle_idx])
-                # the first dimension doesn't matter here since we
-                # only get one frame at a time.
-                frame_fields[field].append(frame_field[0])
+        cycle_idx : int
 
-        # combine all the parts of each field into single arrays
-        for field in fields:
-            frame_fields[field] = np.array(frame_fields[field])
+        fields : list of str
+            The names of the fields to get for each walker.
 
-        return frame_fields
+        Returns
+        -------
+        cycle_fields : dict of str : arraylike
+                             of shape (n_trajs, field_feature_shape[0],...)
+            Mapping of the field names to the array of feature vectors
+            for each trajectory in the order of the trajectory indices.
+
+        """
+        return self.get_run_trace_fields(run_idx,
+                                         [(traj_idx, cycle_idx)
+                                          for traj_idx in self.run_traj_idxs(run_idx)],
+                                         fields)
 
 
-    def get_contig_trace_fields(self, contig_trace, fields):
+    def get_contig_trace_fields(self, contig_trace, fields, mpi_comm=None):
         """Get field data for all trajectories of a contig for the frames
         specified by the contig trace.
 
@@ -5365,6 +7937,13 @@ class WepyHDF5(object):
         fields : list of str
             The names of the fields to get for each cycle.
 
+        mpi_comm : MPI communicator, optional
+            If given (e.g. an mpi4py communicator) the trajectories are
+            split between the ranks, which each read their own, and
+            the values are gathered on every rank. Every rank must
+            call this with the same arguments and have the file open,
+            e.g. read-only or with the 'mpio' driver.
+
         Returns
         -------
         contig_fields : dict of str : arraylike
@@ -5376,15 +7955,26 @@ class WepyHDF5(object):
 
         # to be efficient we want to group our grabbing of fields by run
 
-        # so we group them by run
-        runs_frames = defaultdict(list)
-        # and we get the runs in the order to fetch them
-        run_idxs = []
-        for run_idx, cycle_idx in contig_trace:
-            runs_frames[run_idx].append(cycle_idx)
+        # so we group them by run, keeping the order of the cycles
+        # within each run
+        trace_arr = np.asarray(contig_trace, dtype=np.int64).reshape((-1, 2))
+
+        trace_runs, run_first_idxs, trace_run_idxs = np.unique(trace_arr[:, 0],
+                                                               return_index=True,
+                                                               return_inverse=True)
+
+        trace_order = np.argsort(trace_run_idxs, kind='stable')
+        run_bounds = np.concatenate(([0], np.cumsum(np.bincount(trace_run_idxs,
+                                                                minlength=len(trace_runs)))))
 
-            if not run_idx in run_idxs:
-                run_idxs.append(run_idx)
+        # and we get the runs in the order to fetch them, which is
+        # the order they first appear in
+        run_idxs = []
+        runs_frames = {}
+        for run_i in np.argsort(run_first_idxs):
+            run_idx = int(trace_runs[run_i])
+            run_idxs.append(run_idx)
+            runs_frames[run_idx] = trace_arr[trace_order[run_bounds[run_i] : run_bounds[run_i + 1]], 1]
 
 
         # (there must be the same number of trajectories in each run)
@@ -5392,42 +7982,81 @@ class WepyHDF5(object):
         assert all([True if n_trajs_test == self.num_run_trajs(run_idx) else False
                     for run_idx in run_idxs])
 
+        # every trajectory of a run is read at the same cycles, so the
+        # cycles are put in increasing order without repeats once for
+        # each run and the values put back in the trace order after
+        runs_read_frames = {}
+        runs_frame_order = {}
+        for run_idx in run_idxs:
+            read_frames, frame_order = np.unique(runs_frames[run_idx], return_inverse=True)
+            runs_read_frames[run_idx] = read_frames
+            runs_frame_order[run_idx] = frame_order
+
+        # the cycles of each run come one after the other in the
+        # values, in the order the runs are fetched
+        n_contig_cycles = sum(len(runs_frames[run_idx]) for run_idx in run_idxs)
+        run_offsets = dict(zip(run_idxs,
+                               np.cumsum([0] + [len(runs_frames[run_idx])
+                                                for run_idx in run_idxs[:-1]])))
+
+        if mpi_comm is not None:
+            mpi_rank = mpi_comm.Get_rank()
+            mpi_size = mpi_comm.Get_size()
+
         # then using this we go run by run and get all the
-        # trajectories
+        # trajectories, putting their values straight into the array
+        # for the field with the cycles as the first dimension and
+        # the trajectories as the second
         field_values = {}
         for field in fields:
 
-            # we gather trajectories in "bundles" (think sticks
-            # strapped together) and each bundle represents a run, we
-            # will concatenate the ends of the bundles together to get
-            # the full array at the end
-            bundles = []
+            field_log = None
+
+            # when the reads are split between MPI ranks the values
+            # read by this rank are sent to the others with where they
+            # go in the array
+            rank_parts = []
+
+            pair_i = -1
             for run_idx in run_idxs:
 
-                run_bundle = []
-                for traj_idx in self.run_traj_idxs(run_idx):
+                run_cycles = slice(run_offsets[run_idx],
+                                   run_offsets[run_idx] + len(runs_frames[run_idx]))
+
+                for traj_i, traj_idx in enumerate(self.run_traj_idxs(run_idx)):
+
+                    pair_i += 1
+                    if (mpi_comm is not None) and \
+                       (pair_i % mpi_size != mpi_rank):
+                        continue
 
                     # get the values for this (field, run, trajectory)
                     traj_field_vals = self.get_traj_field(run_idx, traj_idx, field,
-                                                          frames=runs_frames[run_idx],
+                                                          frames=runs_read_frames[run_idx],
                                                           masked=True)
+                    traj_field_vals = traj_field_vals[runs_frame_order[run_idx]]
+
+                    if mpi_comm is not None:
+                        rank_parts.append((run_cycles, traj_i, np.asarray(traj_field_vals)))
+                        continue
+
+                    if field_log is None:
+                        field_log = np.empty((n_contig_cycles, n_trajs_test,
+                                              *traj_field_vals.shape[1:]),
+                                             dtype=traj_field_vals.dtype)
+
+                    field_log[run_cycles, traj_i] = traj_field_vals
 
-                    run_bundle.append(traj_field_vals)
+            if mpi_comm is not None:
+                for parts in mpi_comm.allgather(rank_parts):
+                    for run_cycles, traj_i, traj_field_vals in parts:
 
-                # convert this "bundle" of trajectory values (think
-                # sticks side by side) into an array
-                run_bundle = np.array(run_bundle)
-                bundles.append(run_bundle)
+                        if field_log is None:
+                            field_log = np.empty((n_contig_cycles, n_trajs_test,
+                                                  *traj_field_vals.shape[1:]),
+                                                 dtype=traj_field_vals.dtype)
 
-            # stick the bundles together end to end to make the value
-            # for this field , the first dimension currently is the
-            # trajectory_index, but we want to make the cycles the
-            # first dimension. So we stack them along that axis then
-            # transpose the first two axes (not the rest of them which
-            # should stay the same). Pardon the log terminology, but I
-            # don't know a name for a bunch of bundles taped together.
-            field_log = np.hstack(tuple(bundles))
-            field_log = np.swapaxes(field_log, 0, 1)
+                        field_log[run_cycles, traj_i] = traj_field_vals
 
             field_values[field] = field_log
 
@@ -5477,7 +8106,7 @@ class WepyHDF5(object):
 
             for field in fields:
                 try:
-                    dset = traj[field][:]
+                    dset = self.get_traj_field(run_idx, traj_idx, field)
                 except KeyError:
                     warn("field \"{}\" not found in \"{}\"".format(field, traj.name), RuntimeWarning)
                     dset = None
@@ -5490,7 +8119,7 @@ class WepyHDF5(object):
                 yield dsets
 
     def traj_fields_map(self, func, fields, args,
-                        map_func=map, idxs=False, traj_sel=None):
+                        map_func=map, idxs=False, traj_sel=None, n_workers=None):
         """Function for mapping work onto field of trajectories.
 
         Parameters
@@ -5522,6 +8151,16 @@ class WepyHDF5(object):
             If True will return the trajectory identifier tuple
             (run_idx, traj_idx) along with other return values.
 
+        n_workers : int, optional
+            If given `map_func` is ignored and the function is mapped
+            over a pool of this many processes. If the file is opened
+            read-only each process opens it and reads the trajectories
+            it works on itself, otherwise they are read here and sent
+            to the processes one at a time. The processes are started
+            with TRAJ_FIELDS_MAP_START_METHOD, so the function and
+            arguments must be picklable and the function importable
+            by them.
+
         Returns
         -------
         traj_id_tuples : list of tuple of int, if 'idxs' option is True
@@ -5532,18 +8171,28 @@ class WepyHDF5(object):
 
         """
 
-        # check the args and kwargs to see if they need expanded for
-        # mapping inputs
-        #first go through each run and get the number of cycles
-        n_cycles = 0
-        for run_idx in self.run_idxs:
-            n_cycles += self.num_run_cycles(run_idx)
+        if traj_sel is None:
+            traj_sel = self.run_traj_idx_tuples()
+
+        if n_workers is not None:
+            mp_ctx = mp.get_context(TRAJ_FIELDS_MAP_START_METHOD)
 
-        mapped_args = []
-        for arg in args:
-            # make a generator out of it to map as inputs
-            mapped_arg = (arg for i in range(n_cycles))
-            mapped_args.append(mapped_arg)
+        # the file can't be opened by other processes while it is
+        # open for writing, since HDF5 locks it
+        if (n_workers is not None) and (self.mode == 'r'):
+
+            worker_func = partial(_traj_fields_worker, func, fields)
+
+            with mp_ctx.Pool(n_workers,
+                             initializer=_init_traj_fields_worker,
+                             initargs=(self.filename, self._chunk_cache_kwargs)) as pool:
+                results = pool.starmap(worker_func,
+                                       zip(traj_sel, *(it.repeat(arg) for arg in args)))
+
+            if idxs:
+                return zip(traj_sel, results)
+            else:
+                return results
 
         # make a generator for the arguments to pass to the function
         # from the mapper, for the extra arguments we just have an
@@ -5551,11 +8200,18 @@ class WepyHDF5(object):
         map_args = (self.iter_trajs_fields(fields, traj_sel=traj_sel, idxs=False),
                     *(it.repeat(arg) for arg in args))
 
-        results = map_func(func, *map_args)
+        if n_workers is not None:
+
+            # stream the trajectories to the workers one at a time
+            # instead of reading them all up front
+            with mp_ctx.Pool(n_workers) as pool:
+                results = list(pool.imap(partial(_apply_traj_fields_func, func),
+                                         zip(*map_args),
+                                         chunksize=1))
+        else:
+            results = map_func(func, *map_args)
 
         if idxs:
-            if traj_sel is None:
-                traj_sel = self.run_traj_idx_tuples()
             return zip(traj_sel, results)
         else:
             return results
@@ -5605,8 +8261,10 @@ class WepyHDF5(object):
         topology = self.get_mdtraj_topology(alt_rep=rep_key)
 
 
-        # get the frames if they are not given
-        if frames is None:
+        # get the frames if they are not given, a contiguous
+        # representation has all of them so every field is just read
+        # whole
+        if (frames is None) and (rep_path in self._sparse_fields_set):
             frames = self.get_traj_field_cycle_idxs(run_idx, traj_idx, rep_path)
 
 
@@ -5816,7 +8474,8 @@ class WepyHDF5(object):
 
 
         # we manually construct an HDF5 wrapper and copy the groups over
-        new_h5 = h5py.File(target_file_path, mode=mode, libver=H5PY_LIBVER)
+        new_h5 = h5py.File(target_file_path, mode=mode, libver=H5PY_LIBVER,
+                           **self._chunk_cache_kwargs)
 
         # flush the datasets buffers
         self.h5.flush()
@@ -5856,12 +8515,9 @@ class WepyHDF5(object):
                 for field_name in _iter_field_paths(run_grp[traj_id]):
                     field_path = "{}/{}".format(traj_id, field_name)
 
-                    data = self.get_traj_field(run_idx, traj_idx, field_name,
-                                               frames=slice_frames)
-
                     # if it is a sparse field we need to create the
                     # dataset differently
-                    if field_name in self.sparse_fields:
+                    if field_name in self._sparse_fields_set:
 
                         # create a group for the field
                         new_field_grp = new_traj_grp.require_group(field_name)
@@ -5870,22 +8526,23 @@ class WepyHDF5(object):
                         # dataset that are between the slice
                         cycle_idxs = self.traj(run_idx, traj_idx)[field_name]['_sparse_idxs'][:]
 
-                        sparse_idx_idxs = np.argwhere(np.logical_and(
-                            cycle_idxs[:] >= run_slice[0], cycle_idxs[:] < run_slice[1]
-                        )).flatten().tolist()
+                        # the cycle idxs are increasing so the ones
+                        # in the slice are a single run of rows
+                        sparse_start, sparse_stop = np.searchsorted(cycle_idxs, run_slice)
 
                         # the cycle idxs there is data for
-                        sliced_cycle_idxs = cycle_idxs[sparse_idx_idxs]
+                        sliced_cycle_idxs = cycle_idxs[sparse_start:sparse_stop]
 
                         # get the data for these cycles
-                        field_data = data[sliced_cycle_idxs]
+                        field_data_dset = traj_grp[field_name]['data']
+                        field_data = field_data_dset[sparse_start:sparse_stop]
 
                         # get the information on compression,
                         # chunking, and filters and use it when we set
                         # the new data
-                        field_data_dset = traj_grp[field_name]['data']
                         data_dset_kwargs = {
                             'chunks' : field_data_dset.chunks,
+                            'maxshape' : field_data_dset.maxshape,
                             'compression' : field_data_dset.compression,
                             'compression_opts' : field_data_dset.compression_opts,
                             'shuffle' : field_data_dset.shuffle,
@@ -5896,6 +8553,7 @@ class WepyHDF5(object):
                         field_idxs_dset = traj_grp[field_name]['_sparse_idxs']
                         idxs_dset_kwargs = {
                             'chunks' : field_idxs_dset.chunks,
+                            'maxshape' : field_idxs_dset.maxshape,
                             'compression' : field_idxs_dset.compression,
                             'compression_opts' : field_idxs_dset.compression_opts,
                             'shuffle' : field_idxs_dset.shuffle,
@@ -5905,13 +8563,18 @@ class WepyHDF5(object):
                         # then create the datasets
                         new_field_grp.create_dataset('_sparse_idxs',
                                                      data=sliced_cycle_idxs,
-                                                     **idxs_dset_kwargs)
+                                                     **idxs_dset_kwargs,
+                                                     track_times=TRACK_TIMES)
                         new_field_grp.create_dataset('data',
                                                      data=field_data,
-                                                     **data_dset_kwargs)
+                                                     **data_dset_kwargs,
+                                                     track_times=TRACK_TIMES)
 
                     else:
 
+                        data = self.get_traj_field(run_idx, traj_idx, field_name,
+                                                   frames=slice_frames)
+
                         # get the information on compression,
                         # chunking, and filters and use it when we set
                         # the new data
@@ -5936,7 +8599,8 @@ class WepyHDF5(object):
                         # subpaths for compound fields if necessary
                         dset = new_traj_grp.require_dataset(field_name,
                                                             data.shape, data.dtype,
-                                                            **dset_kwargs)
+                                                            **dset_kwargs,
+                                                            track_times=TRACK_TIMES)
 
                         # then set the data depending on whether it is
                         # sparse or not
@@ -5969,24 +8633,24 @@ class WepyHDF5(object):
                     }
 
                     # get the indices of the records we are interested in
-                    record_idxs = np.argwhere(np.logical_and(
-                        cycle_idxs >= run_slice[0], cycle_idxs < run_slice[1]
-                    )).flatten().tolist()
+                    in_slice = (cycle_idxs >= run_slice[0]) & (cycle_idxs < run_slice[1])
+                    record_idxs = np.flatnonzero(in_slice)
 
                     # set the cycle indices in the new run group
                     new_recgrp_cycle_idxs_path = '{}/{}/_cycle_idxs'.format(target_grp_path,
                                                                             rec_grp_name)
-                    cycle_data = cycle_idxs[record_idxs]
+                    cycle_data = cycle_idxs[in_slice]
 
                     cycle_dset = new_h5.require_dataset(new_recgrp_cycle_idxs_path,
                                                         cycle_data.shape, cycle_data.dtype,
-                                                        **idxs_dset_kwargs)
+                                                        **idxs_dset_kwargs,
+                                                        track_times=TRACK_TIMES)
                     cycle_dset[:] = cycle_data
 
                 # if contiguous just set the record indices as the
                 # range between the slice
                 else:
-                    record_idxs = list(range(run_slice[0], run_slice[1]))
+                    record_idxs = np.arange(run_slice[0], run_slice[1])
 
                 # then for each rec_field slice those and set them in the new file
                 for rec_field in rec_fields:
@@ -6026,12 +8690,22 @@ class WepyHDF5(object):
 
                     new_field_dset = new_h5.require_dataset(new_recfield_grp_path,
                                                             shape, dtype,
-                                                            **field_dset_kwargs)
+                                                            **field_dset_kwargs,
+                                                            track_times=TRACK_TIMES)
 
                     # if there aren't records just don't do anything,
                     # and if there are get them and add them
                     if len(record_idxs) > 0:
-                        rec_data = field_dset[record_idxs]
+
+                        # read the records as runs of consecutive
+                        # rows rather than row by row
+                        if vlen_type is not None:
+                            run_starts, run_lengths = _frame_runs(record_idxs)
+                            rec_data = np.concatenate(
+                                [field_dset[run_start : run_start + run_length]
+                                 for run_start, run_length in zip(run_starts, run_lengths)])
+                        else:
+                            rec_data = _read_frames_bulk(field_dset, record_idxs)
 
                         # if it is a variable length data type we have
                         # to do it 1 by 1
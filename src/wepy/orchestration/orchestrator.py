@@ -1054,6 +1054,11 @@ class Orchestrator():
                 if (cycle_idx % checkpoint_freq == 0):
                     logging.debug("Checkpoint is required for this cycle")
 
+                    # the reporters must have all of the cycles the
+                    # checkpoint covers
+                    logging.debug("Flushing the reports")
+                    sim_manager.flush_reports()
+
                     # make the checkpoint snapshot
                     logging.debug("Generating the simulation snapshot")
                     checkpoint_snapshot = SimSnapshot(walkers, SimApparatus(filters))
@@ -8,6 +8,7 @@ import logging
 from datetime import datetime
 import time
 from copy import copy
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
@@ -18,6 +19,26 @@ import logging
 
 from wepy.reporter.reporter import ProgressiveFileReporter
 
+@lru_cache(maxsize=None)
+def compiled_template(template_str):
+    """Get the compiled jinja2 Template for a template string.
+
+    Templates are compiled once and cached, since compiling them is
+    much more expensive than rendering and dashboards are rendered
+    every cycle.
+
+    Parameters
+    ----------
+    template_str : str
+
+    Returns
+    -------
+    template : jinja2.Template
+
+    """
+
+    return Template(template_str)
+
 class DashboardReporter(ProgressiveFileReporter):
     """A text based report of the status of a wepy simulation.
 
@@ -264,7 +285,7 @@ Worker Avg. Segment Times:
             'walker_cycle_summary_table' : walker_summary_tbl_str,
         }
 
-        sim_section_str = Template(self.SIMULATION_SECTION_TEMPLATE).render(
+        sim_section_str = compiled_template(self.SIMULATION_SECTION_TEMPLATE).render(
             **sim_section_d
         )
 
@@ -315,7 +336,7 @@ Worker Avg. Segment Times:
             'avg_resampling_time' : self.avg_resampling_time,
         }
 
-        performance_section_str = Template(self.PERFORMANCE_SECTION_TEMPLATE).render(
+        performance_section_str = compiled_template(self.PERFORMANCE_SECTION_TEMPLATE).render(
             **performance_section_d
         )
 
@@ -326,6 +347,25 @@ Worker Avg. Segment Times:
         # update the values that update each call to report
         self.update_values(**kwargs)
 
+        self.write_report(**kwargs)
+
+    def report_batch(self, reports):
+
+        # nothing to update or write for an empty batch
+        if not reports:
+            return
+
+        # the dashboard only shows the latest values so we only need
+        # to render and write it once for the whole batch
+        for report in reports:
+            self.update_values(**report)
+
+        self.write_report(**reports[-1])
+
+    def write_report(self, **kwargs):
+        """Render the dashboard from the current values and write it to
+        the file."""
+
         # the two sections that are always there
         sim_section_str = self.gen_sim_section(**kwargs)
         performance_section_str = self.gen_performance_section(**kwargs)
@@ -351,7 +391,7 @@ Worker Avg. Segment Times:
             bc_section_str = None
 
         # render the whole template
-        report_str = Template(self.DASHBOARD_TEMPLATE).render(
+        report_str = compiled_template(self.DASHBOARD_TEMPLATE).render(
             simulation=sim_section_str,
             resampler=resampler_section_str,
             boundary_condition=bc_section_str,
@@ -400,7 +440,7 @@ Resampler: {{ name }}
 
         section_kwargs = self.gen_fields(**kwargs)
 
-        section_str = Template(self.RESAMPLER_SECTION_TEMPLATE).render(
+        section_str = compiled_template(self.RESAMPLER_SECTION_TEMPLATE).render(
             **section_kwargs
         )
 
@@ -443,7 +483,7 @@ Runner: {{ name }}
         section_kwargs = self.gen_fields(**kwargs)
 
 
-        section_str = Template(self.RUNNER_SECTION_TEMPLATE).render(
+        section_str = compiled_template(self.RUNNER_SECTION_TEMPLATE).render(
             **section_kwargs
         )
 
@@ -478,6 +518,20 @@ Cumulative Boundary Crossed Weight: {{ total_crossed_weight }}
         'discontinuous',
     )
 
+    WARP_RECORD_DTYPE = np.dtype([
+        ('cycle_idx', np.int64),
+        ('walker_idx', np.int64),
+        ('weight', np.float64),
+        ('target_idx', np.int64),
+        ('discontinuous', np.bool_),
+    ])
+    """Structured dtype the warping log is kept in, with a field for
+    each of the WARP_RECORD_COLNAMES."""
+
+    WARP_RECORDS_INIT_CAPACITY = 64
+    """Number of warp records space is initially allocated for, it is
+    doubled whenever it runs out."""
+
 
     def __init__(self, bc=None,
                  discontinuities=None,
@@ -502,50 +556,91 @@ Cumulative Boundary Crossed Weight: {{ total_crossed_weight }}
                 "If the bc is not given must give parameter: discontinuities"
             self.bc_discontinuities = discontinuities
 
-        self.warp_records = []
+        # the warping log is kept in a preallocated structured array
+        # instead of a list of tuples since it grows for the whole
+        # simulation, only the first _n_warp_records rows are valid
+        self._warp_records = np.zeros((self.WARP_RECORDS_INIT_CAPACITY,),
+                                      dtype=self.WARP_RECORD_DTYPE)
+        self._n_warp_records = 0
+
         self.total_n_walker_segments = 0
         self.total_crossings = 0
         self.total_crossed_weight = 0.
 
+    @property
+    def warp_records(self):
+        """The warping log records collected so far (structured array
+        of WARP_RECORD_DTYPE)."""
+
+        return self._warp_records[:self._n_warp_records]
+
+    def _add_warp_records(self, records):
+        """Append rows to the warping log, growing the preallocated
+        array if they don't fit.
+
+        Parameters
+        ----------
+        records : numpy.ndarray of WARP_RECORD_DTYPE
+
+        """
+
+        n_records = self._n_warp_records + len(records)
+
+        if n_records > self._warp_records.shape[0]:
+
+            capacity = max(n_records, 2 * self._warp_records.shape[0])
+            new_warp_records = np.zeros((capacity,), dtype=self.WARP_RECORD_DTYPE)
+            new_warp_records[:self._n_warp_records] = self.warp_records
+            self._warp_records = new_warp_records
+
+        self._warp_records[self._n_warp_records:n_records] = records
+        self._n_warp_records = n_records
+
     def update_values(self, **kwargs):
 
         # keep track of exactly how many walker segments are run, this
         # is useful for rate calculations via Hill's relation.
         self.total_n_walker_segments += len(kwargs['new_walkers'])
 
+        warp_data = kwargs['warp_data']
+
+        if len(warp_data) == 0:
+            return
+
         # just create the bare warp records, since we know no more
         # domain knowledge, feel free to override and add more data to
         # this table
-        for warp_record in kwargs['warp_data']:
+        records = np.zeros((len(warp_data),), dtype=self.WARP_RECORD_DTYPE)
 
-            # the cycle
-            cycle_idx = kwargs['cycle_idx']
+        # the cycle
+        records['cycle_idx'] = kwargs['cycle_idx']
 
-            # the individual values from the warp record
-            weight = warp_record['weight'][0]
-            walker_idx = warp_record['walker_idx'][0]
-            target_idx = warp_record['target_idx'][0]
+        # the individual values from the warp records
+        records['weight'] = [warp_record['weight'][0] for warp_record in warp_data]
+        records['walker_idx'] = [warp_record['walker_idx'][0] for warp_record in warp_data]
+        records['target_idx'] = [warp_record['target_idx'][0] for warp_record in warp_data]
 
-            # determine if it was discontinuous
+        # determine if they were discontinuous
 
-            # all targets are discontinuous
-            if self.bc_discontinuities is Ellipsis:
-                discont = True
-            # none of them are discontinuous
-            elif self.bc_discontinuities is None:
-                discont = False
-            # then it is a list of the discontinuous targets
-            else:
-                discont = True if target_idx in self.bc_discontinuities else False
+        # all targets are discontinuous
+        if self.bc_discontinuities is Ellipsis:
+            records['discontinuous'] = True
+        # none of them are discontinuous
+        elif self.bc_discontinuities is None:
+            records['discontinuous'] = False
+        # then it is a list of the discontinuous targets
+        else:
+            records['discontinuous'] = np.isin(records['target_idx'],
+                                               list(self.bc_discontinuities))
 
-            record = (cycle_idx, walker_idx, weight, target_idx, discont)
-            self.warp_records.append(record)
+        self._add_warp_records(records)
 
 
     def gen_fields(self, **kwargs):
 
         # make the table for the collected warping records
-        warp_table_df = pd.DataFrame(self.warp_records, columns=self.WARP_RECORD_COLNAMES)
+        warp_table_df = pd.DataFrame(self.warp_records,
+                                     columns=self.WARP_RECORD_COLNAMES)
         warp_table_str = tabulate(warp_table_df,
                                   headers=warp_table_df.columns,
                                   tablefmt='orgtbl')
@@ -564,7 +659,7 @@ Cumulative Boundary Crossed Weight: {{ total_crossed_weight }}
 
         section_kwargs = self.gen_fields(**kwargs)
 
-        section_str = Template(self.BC_SECTION_TEMPLATE).render(
+        section_str = compiled_template(self.BC_SECTION_TEMPLATE).render(
             **section_kwargs
         )
 
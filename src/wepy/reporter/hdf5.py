@@ -344,6 +344,7 @@ class WepyHDF5Reporter(FileReporter):
 
     def init(self, continue_run=None,
              init_walkers=None,
+             n_cycles=None,
              **kwargs):
 
         # do the inherited stuff
@@ -413,7 +414,11 @@ class WepyHDF5Reporter(FileReporter):
             # initialize it as such
 
             # initialize a new run
-            run_grp = self.wepy_h5.new_run(filtered_init_walkers, continue_run=continue_run)
+            # the number of cycles sizes the chunks of the trajectory
+            # datasets for short runs
+            run_grp = self.wepy_h5.new_run(filtered_init_walkers,
+                                           continue_run=continue_run,
+                                           n_cycles=n_cycles)
             self.wepy_run_idx = run_grp.attrs['run_idx']
 
             # initialize the run record groups using their fields
@@ -472,11 +477,9 @@ class WepyHDF5Reporter(FileReporter):
         n_walkers = len(new_walkers)
 
         # determine which fields to save. If there were none specified
-        # save all of them
-        if self.save_fields is None:
-            save_fields = list(new_walkers[0].state.dict().keys())
-        else:
-            save_fields = self.save_fields
+        # save all of them, which we don't need to make a whole state
+        # dictionary to find out
+        save_fields = self.save_fields
 
         with self.wepy_h5:
 
@@ -495,7 +498,7 @@ class WepyHDF5Reporter(FileReporter):
                 for field_path in list(walker_data.keys()):
 
                     # save the field if it is in the list of save_fields
-                    if field_path not in save_fields:
+                    if save_fields is not None and field_path not in save_fields:
                         walker_data.pop(field_path)
                         continue
 
@@ -585,6 +588,15 @@ class WepyHDF5Reporter(FileReporter):
 
         super().report(**kwargs)
 
+    def report_batch(self, reports):
+
+        # keep the file open for all of the cycles and write out the
+        # trajectory frames for them together
+        with self.wepy_h5:
+            with self.wepy_h5.buffered_writes(n=None):
+
+                super().report_batch(reports)
+
 
     # sporadic
     def _report_warping(self, cycle_idx, warping_data):
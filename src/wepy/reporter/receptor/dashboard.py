@@ -1,7 +1,6 @@
 from pint import UnitRegistry
-from jinja2 import Template
 
-from wepy.reporter.dashboard import BCDashboardSection
+from wepy.reporter.dashboard import BCDashboardSection, compiled_template
 
 # initialize the unit registry
 units = UnitRegistry()
@@ -104,7 +103,7 @@ Cutoff Distance: {{ cutoff_distance }}
 
         fields = super().gen_fields(**kwargs)
 
-        parameters_str = Template(self.RECEPTOR_PARAMETERS).render(
+        parameters_str = compiled_template(self.RECEPTOR_PARAMETERS).render(
             cutoff_distance=self.cutoff_distance,
         )
 
@@ -143,7 +142,7 @@ Cutoff RMSD: {{ cutoff_rmsd }}
 
         fields = super().gen_fields(**kwargs)
 
-        parameters_str = Template(self.RECEPTOR_PARAMETERS).render(
+        parameters_str = compiled_template(self.RECEPTOR_PARAMETERS).render(
             cutoff_rmsd=self.cutoff_rmsd,
         )
 
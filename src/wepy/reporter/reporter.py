@@ -73,6 +73,10 @@ class Reporter(object):
             The index of the run that is being continued within this
             same file.
 
+        n_cycles : int or None
+            The number of cycles the simulation will run for, if known
+            in advance.
+
         """
         method_name = 'init'
         assert not hasattr(super(), method_name), \
@@ -142,6 +146,27 @@ class Reporter(object):
         assert not hasattr(super(), method_name), \
             "Superclass with method {} is masked".format(method_name)
 
+    def report_batch(self, reports):
+        """Report on the data from several consecutive cycles at once.
+
+        The sim_manager calls this instead of `report` when it is
+        collecting reports for multiple cycles. Reporters can override
+        this to amortize the cost of their I/O over the cycles.
+
+        The base class method calls `report` for each cycle.
+
+        Parameters
+        ----------
+
+        reports : list of dict of str : value
+            The key word arguments that would be passed to `report`
+            for each cycle, in cycle order.
+
+        """
+
+        for report in reports:
+            self.report(**report)
+
     def cleanup(self, **kwargs):
         """Teardown routines for the reporter at the end of the simulation.
 
@@ -79,11 +79,14 @@ class CloneMergeResampler(Resampler):
 
         """
 
-        # determine resampling actions
-        walker_actions = [self.decision.record(
+        # make and check the default record once and give each walker
+        # a copy of it targeting itself
+        default_record = self.decision.record(
                                 enum_value=self.decision.default_decision().value,
-                                target_idxs=(i,))
-                    for i in range(n_walkers)]
+                                target_idxs=(0,))
+
+        walker_actions = [dict(default_record, target_idxs=(i,))
+                          for i in range(n_walkers)]
 
         return walker_actions
 
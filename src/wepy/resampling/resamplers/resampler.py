@@ -88,7 +88,7 @@ class Resampler():
     CYCLE_SHAPES = ((1,), (1,),)
     """Data shapes of the cycle fields."""
 
-    CYCLE_DTYPES = (np.int, np.int,)
+    CYCLE_DTYPES = (np.int64, np.int64,)
     """Data types of the cycle fields """
 
     CYCLE_RECORD_FIELDS = ('step_idx', 'walker_idx',)
@@ -659,9 +659,11 @@ class NoResampler(Resampler):
             resampling.
 
         """
-        # determine resampling actions
-        walker_actions = [self.decision.record(
+        # make and check the default record once and give each walker
+        # a copy of it
+        default_record = self.decision.record(
                               enum_value=self.decision.default_decision().value)
-                    for i in range(n_walkers)]
+
+        walker_actions = [dict(default_record) for i in range(n_walkers)]
 
         return walker_actions
@@ -93,7 +93,7 @@ class REVOResampler(CloneMergeResampler):
     # fields for resampler data
     RESAMPLING_FIELDS = CloneMergeResampler.RESAMPLING_FIELDS
     RESAMPLING_SHAPES = CloneMergeResampler.RESAMPLING_SHAPES #+ (Ellipsis,)
-    RESAMPLING_DTYPES = CloneMergeResampler.RESAMPLING_DTYPES #+ (np.int,)
+    RESAMPLING_DTYPES = CloneMergeResampler.RESAMPLING_DTYPES #+ (np.int64,)
 
 
     # fields that can be used for a table like representation
@@ -105,7 +105,7 @@ class REVOResampler(CloneMergeResampler):
     RESAMPLER_SHAPES = CloneMergeResampler.RESAMPLER_SHAPES + \
                        ((1,), Ellipsis, (1,), Ellipsis, Ellipsis)
     RESAMPLER_DTYPES = CloneMergeResampler.RESAMPLER_DTYPES + \
-                       (np.int, np.float, np.float, np.int, None)
+                       (np.int64, np.float64, np.float64, np.int64, None)
 
     # fields that can be used for a table like representation
     RESAMPLER_RECORD_FIELDS = CloneMergeResampler.RESAMPLER_RECORD_FIELDS + \
@@ -259,6 +259,45 @@ class REVOResampler(CloneMergeResampler):
 
         return novelty
 
+    def _novelties(self, walker_weights, num_walker_copies):
+        """Calculates the novelty function values for all walkers.
+
+        Vectorized version of `_novelty`.
+
+        Parameters
+        ----------
+
+        walker_weights : arraylike of float
+            The weights of the walkers.
+
+        num_walker_copies : arraylike of int
+            The number of copies of each walker.
+
+        Returns
+        -------
+        novelties : arraylike of shape (num_walkers)
+            The novelty values for each walker.
+
+        """
+
+        walker_weights = np.asarray(walker_weights, dtype=np.float64)
+        num_walker_copies = np.asarray(num_walker_copies, dtype=np.float64)
+
+        novelties = np.zeros(walker_weights.shape[0])
+
+        # only walkers that exist and have weight are novel
+        valid = (walker_weights > 0) & (num_walker_copies > 0)
+
+        if self.weights:
+            novelties[valid] = np.log(walker_weights[valid] / num_walker_copies[valid]) \
+                               - self.lpmin
+        else:
+            novelties[valid] = 1
+
+        novelties[novelties < 0] = 0
+
+        return novelties
+
     def _calcvariation(self, walker_weights, num_walker_copies, distance_matrix):
         """Calculates the variation value.
 
@@ -291,31 +330,28 @@ class REVOResampler(CloneMergeResampler):
 
 
         # set the novelty values
-        walker_novelties = np.array([self._novelty(walker_weights[i], num_walker_copies[i])
-                               for i in range(num_walkers)])
-
-
-        # the value to be optimized
-        variation = 0
-
-        # the walker variation values (Vi values)
-        walker_variations = np.zeros(num_walkers)
+        walker_novelties = self._novelties(walker_weights, num_walker_copies)
 
 
-        # calculate the variation and walker variation values
-        for i in range(num_walkers - 1):
+        num_walker_copies = np.asarray(num_walker_copies, dtype=np.float64)
 
-            if num_walker_copies[i] > 0:
-                for j in range(i+1, num_walkers):
+        # the partial variations for each pair of walkers
+        partial_variations = (np.asarray(distance_matrix, dtype=np.float64)
+                              / self.char_dist) ** self.dist_exponent \
+                              * np.outer(walker_novelties, walker_novelties)
 
-                    if num_walker_copies[j] > 0:
+        # only pairs of distinct walkers that both exist contribute
+        exists = num_walker_copies > 0
+        partial_variations[~exists, :] = 0.
+        partial_variations[:, ~exists] = 0.
+        np.fill_diagonal(partial_variations, 0.)
 
-                        partial_variation = ((distance_matrix[i][j] / self.char_dist) ** self.dist_exponent) \
-                        * walker_novelties[i] * walker_novelties[j]
+        # the walker variation values (Vi values)
+        walker_variations = partial_variations @ num_walker_copies
 
-                        variation += partial_variation * num_walker_copies[i] * num_walker_copies[j]
-                        walker_variations[i] += partial_variation * num_walker_copies[j]
-                        walker_variations[j] += partial_variation * num_walker_copies[i]
+        # the value to be optimized, each pair is counted once
+        variation = np.triu(partial_variations
+                            * np.outer(num_walker_copies, num_walker_copies)).sum()
 
         return variation, walker_variations
 
@@ -363,7 +399,7 @@ class REVOResampler(CloneMergeResampler):
         variations.append(variation)
 
         # maximize the variance through cloning and merging
-        logging.info("Starting variance optimization: {}".format(variation))
+        logging.info("Starting variance optimization: %s", variation)
 
         productive = True
         while productive:
@@ -446,7 +482,7 @@ class REVOResampler(CloneMergeResampler):
                 if new_variation > variation:
                     variations.append(new_variation)
 
-                    logging.info("Variance move to {} accepted".format(new_variation))
+                    logging.info("Variance move to %s accepted", new_variation)
 
                     productive = True
                     variation = new_variation
@@ -495,7 +531,7 @@ class REVOResampler(CloneMergeResampler):
                                                                           distance_matrix)
                     variations.append(new_variation)
 
-                    logging.info("variance after selection: {}".format(new_variation))
+                    logging.info("variance after selection: %s", new_variation)
 
                 # if not productive
                 else:
@@ -583,8 +619,10 @@ class REVOResampler(CloneMergeResampler):
         # calculate distance matrix
         distance_matrix, images = self._all_to_all_distance(walkers)
 
-        logging.info("distance_matrix")
-        logging.info("\n{}".format(str(np.array(distance_matrix))))
+        # only make the string of the whole matrix if it will be logged
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info("distance_matrix")
+            logging.info("\n{}".format(str(np.array(distance_matrix))))
 
         # determine cloning and merging actions to be performed, by
         # maximizing the variation, i.e. the Decider
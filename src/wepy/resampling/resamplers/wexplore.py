@@ -2222,7 +2222,7 @@ class WExploreResampler(CloneMergeResampler):
     # fields for resampling data
     RESAMPLING_FIELDS = CloneMergeResampler.RESAMPLING_FIELDS + ('region_assignment',)
     RESAMPLING_SHAPES = CloneMergeResampler.RESAMPLING_SHAPES + (Ellipsis,)
-    RESAMPLING_DTYPES = CloneMergeResampler.RESAMPLING_DTYPES + (np.int,)
+    RESAMPLING_DTYPES = CloneMergeResampler.RESAMPLING_DTYPES + (np.int64,)
 
     # fields that can be used for a table like representation
     RESAMPLING_RECORD_FIELDS = CloneMergeResampler.RESAMPLING_RECORD_FIELDS + ('region_assignment',)
@@ -2238,7 +2238,7 @@ class WExploreResampler(CloneMergeResampler):
     RESAMPLER_SHAPES = CloneMergeResampler.RESAMPLER_SHAPES + \
                        ((1,), (1,), Ellipsis, Ellipsis)
     RESAMPLER_DTYPES = CloneMergeResampler.RESAMPLER_DTYPES + \
-                       (np.int, np.float, np.int, None)
+                       (np.int64, np.float64, np.int64, None)
 
     # fields that can be used for a table like representation
     RESAMPLER_RECORD_FIELDS = CloneMergeResampler.RESAMPLER_RECORD_FIELDS + \
@@ -2419,13 +2419,13 @@ class WExploreResampler(CloneMergeResampler):
         merge_groups, walkers_num_clones = \
                         self.region_tree.balance_tree(delta_walkers=delta_walkers)
 
-        logging.info("merge_groups\n{}".format(merge_groups))
-        logging.info("Walker number of clones\n{}".format(walkers_num_clones))
-        logging.info("Walker assignments\n{}".format(self.region_tree.walker_assignments))
-        logging.info("Walker weights\n{}".format(self.region_tree.walker_weights))
+        logging.info("merge_groups\n%s", merge_groups)
+        logging.info("Walker number of clones\n%s", walkers_num_clones)
+        logging.info("Walker assignments\n%s", self.region_tree.walker_assignments)
+        logging.info("Walker weights\n%s", self.region_tree.walker_weights)
 
         # check to make sure we have selected appropriate walkers to clone
-        logging.info("images_assignments\n{}".format(self.region_tree.regions))
+        logging.info("images_assignments\n%s", self.region_tree.regions)
 
         # take the specs for cloning and merging and generate the
         # actual resampling actions (instructions) for each walker,
@@ -46,12 +46,14 @@ import numpy as np
 
 import sys
 import time
+import itertools as it
 from copy import deepcopy
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from eliot import start_action, log_call
 
-from wepy.work_mapper.mapper import Mapper
+from wepy.work_mapper.mapper import Mapper, PoolMapper
 
 class Manager(object):
     """The class that coordinates wepy simulations.
@@ -112,6 +114,8 @@ class Manager(object):
                  boundary_conditions = None,
                  reporters = None,
                  sim_monitor = None,
+                 async_reporting = False,
+                 report_batch_size = 1,
     ):
         """Constructor for Manager.
 
@@ -124,9 +128,11 @@ class Manager(object):
         runner : object implementing the Runner interface
             The runner to be used for propagating sampling segments of walkers.
 
-        work_mapper : object implementing the WorkMapper interface
+        work_mapper : object implementing the WorkMapper interface, optional
             The object that will be used to perform a set of runner
-            segments in a cycle.
+            segments in a cycle. If not given the serial Mapper is
+            used, unless more than one worker is requested at `init`
+            in which case a PoolMapper is used.
 
         resampler : object implementing the Resampler interface
             The resampler to be used in the simulation
@@ -141,6 +147,19 @@ class Manager(object):
             An object implementing SimMonitor interface for providing
             monitoring metrics of a simulation.
 
+        async_reporting : bool, optional
+            If True reporters are run in a background thread so that
+            their I/O overlaps with the next cycle. Reports are run in
+            order and all are finished before the reporters are
+            cleaned up. Components must not modify walkers in place
+            when this is used.
+
+        report_batch_size : int, optional
+            The number of cycles of reports to collect before passing
+            them to the reporters together with `report_batch`. Any
+            remaining reports are passed on `flush_reports` and
+            `cleanup`.
+
         Warnings
         --------
 
@@ -175,6 +194,9 @@ class Manager(object):
         else:
             self.reporters = reporters
 
+        # if no work mapper is given we may choose a parallel one at
+        # runtime depending on the number of workers
+        self._default_work_mapper = work_mapper is None
         if work_mapper is None:
             self.work_mapper = Mapper()
         else:
@@ -188,6 +210,16 @@ class Manager(object):
         # break it and no one cares about this anyhow
         self._last_report = None
 
+        # the thread reports are run in when reporting asynchronously,
+        # started at runtime in init
+        self.async_reporting = async_reporting
+        self._report_executor = None
+        self._report_futures = []
+
+        # reports waiting to be passed to the reporters in a batch
+        self.report_batch_size = report_batch_size
+        self._report_buffer = []
+
     @log_call(
         include_args=[
             'segment_length',
@@ -222,17 +254,20 @@ class Manager(object):
         logging.info("Starting segment")
 
         try:
-            new_walkers = list(self.work_mapper.map(
+            new_walkers = self.work_mapper.map(
                 # args, which must be supported by the map function
                 walkers,
-                (segment_length for i in range(num_walkers)),
+                it.repeat(segment_length, num_walkers),
 
                 # kwargs which are optionally recognized by the map function
-                cycle_idx=(cycle_idx for i in range(num_walkers)),
-                walker_idx=(walker_idx for walker_idx in range(num_walkers)),
-            )
+                cycle_idx=it.repeat(cycle_idx, num_walkers),
+                walker_idx=range(num_walkers),
             )
 
+            # the mappers return lists already, don't copy them again
+            if not isinstance(new_walkers, list):
+                new_walkers = list(new_walkers)
+
         except Exception as exception:
 
             # get the errors from the work mapper error queue
@@ -384,7 +419,7 @@ class Manager(object):
         end = time.time()
         runner_postcycle_time = end - start
 
-        logging.info("End cycle {}".format(cycle_idx))
+        logging.info("End cycle %s", cycle_idx)
 
         # boundary conditions should be optional;
 
@@ -412,7 +447,7 @@ class Manager(object):
             progress_data = bc_results[3]
 
             if len(warp_data) > 0:
-                logging.info("Returned warp record in cycle {}".format(cycle_idx))
+                logging.info("Returned warp record in cycle %s", cycle_idx)
 
 
         # resample walkers
@@ -444,13 +479,14 @@ class Manager(object):
 
         if hasattr(self.work_mapper, 'worker_segment_times'):
 
-            seg_times = deepcopy(self.work_mapper.worker_segment_times)
+            # the times are floats so copying the lists is enough
+            seg_times = {worker_id : list(segments_times)
+                         for worker_id, segments_times
+                         in self.work_mapper.worker_segment_times.items()}
 
             # count up the total sampling time from the segments
-            sampling_time = 0
-            for worker_id, segments_times in self.work_mapper.worker_segment_times.items():
-                for seg_time in segments_times:
-                    sampling_time += seg_time
+            sampling_time = sum(sum(segments_times)
+                                for segments_times in seg_times.values())
 
             # calculate the overhead for logging
             sim_manager_segment_overhead_time = sim_manager_segment_time - sampling_time
@@ -497,8 +533,9 @@ class Manager(object):
 
         logging.info("Starting reporting")
         # report results to the reporters
-        for reporter in self.reporters:
-            reporter.report(**report)
+        self._report_buffer.append(report)
+        if len(self._report_buffer) >= self.report_batch_size:
+            self._flush_reports()
 
         # prepare resampled walkers for running new state changes
         walkers = resampled_walkers
@@ -524,10 +561,99 @@ class Manager(object):
         logging.info("Done: returning walkers")
         return walkers, filters
 
+    def _report(self, reports):
+        """Pass a batch of reports to all of the reporters."""
+
+        for reporter in self.reporters:
+
+            if len(reports) == 1:
+                reporter.report(**reports[0])
+
+            # reporters not derived from the base class may not
+            # support batches
+            elif hasattr(reporter, 'report_batch'):
+                reporter.report_batch(reports)
+
+            else:
+                for report in reports:
+                    reporter.report(**report)
+
+    def flush_reports(self):
+        """Pass all collected reports to the reporters and wait for
+        any running in the background to finish.
+
+        Call this before saving a checkpoint of the simulation so that
+        the reporters have all of the cycles it covers.
+
+        Raises
+        ------
+        Exception
+            Any error raised by a reporter in the background.
+
+        """
+
+        self._flush_reports()
+
+        if self._report_executor is not None:
+            self._check_reports(wait=True)
+
+    def _flush_reports(self):
+        """Pass the collected reports to the reporters, in the
+        background if reporting asynchronously."""
+
+        if len(self._report_buffer) == 0:
+            return
+
+        # raise any errors from reports that have already finished,
+        # keeping the collected reports to be passed on later
+        if self._report_executor is not None:
+            self._check_reports()
+
+        reports = self._report_buffer
+        self._report_buffer = []
+
+        if self._report_executor is not None:
+            self._report_futures.append(
+                self._report_executor.submit(self._report, reports))
+
+        else:
+            self._report(reports)
+
+    def _check_reports(self, wait=False):
+        """Discard finished asynchronous reports, raising any error
+        that occured in them.
+
+        Parameters
+        ----------
+        wait : bool
+            Wait for all pending reports to finish.
+
+        """
+
+        futures = self._report_futures
+        self._report_futures = []
+
+        for future_idx, future in enumerate(futures):
+
+            if wait or future.done():
+
+                try:
+                    future.result()
+
+                # an error is only raised once, but the reports after
+                # it are still checked later
+                except Exception:
+                    self._report_futures.extend(futures[future_idx + 1:])
+                    raise
+
+            else:
+                self._report_futures.append(future)
+
     @log_call
     def init(self,
              num_workers=None,
              continue_run=None,
+             n_cycles=None,
     ):
         """Initialize wepy configuration components for use at runtime.
 
@@ -548,6 +674,13 @@ class Manager(object):
         Passes the segment_func of the runner and the number of
         workers to the work_mapper.
 
+        If no work mapper was given to the constructor and more than
+        one worker is requested, the default serial Mapper is replaced
+        with a PoolMapper so that segments run in parallel worker
+        processes. Since these processes may be spawned, scripts
+        should protect their entry point with an `if __name__ ==
+        '__main__':` block.
+
         Passes the following things to each reporter `init` method:
 
         - init_walkers
@@ -557,6 +690,7 @@ class Manager(object):
         - work_mapper
         - reporters
         - continue_run
+        - n_cycles
 
         Parameters
         ----------
@@ -566,6 +700,10 @@ class Manager(object):
         continue_run : int
             Index of a run this one is continuing.
              (Default value = None)
+        n_cycles : int
+            The number of cycles that will be run, if known in
+            advance.
+             (Default value = None)
 
         """
 
@@ -579,6 +717,13 @@ class Manager(object):
         if self.monitor is not None:
             self.monitor.init()
 
+        # the serial mapper ignores the number of workers so use a
+        # process pool instead if it was asked for
+        if (self._default_work_mapper and
+            num_workers is not None and num_workers > 1):
+
+            self.work_mapper = PoolMapper()
+
         # initialize the work_mapper with the function it will be
         # mapping and the number of workers, this may include things like starting processes
         # etc.
@@ -588,6 +733,12 @@ class Manager(object):
         )
 
 
+        if self.async_reporting:
+            self._report_executor = ThreadPoolExecutor(max_workers=1)
+            self._report_futures = []
+
+        self._report_buffer = []
+
         # init the reporter
         for reporter in self.reporters:
             reporter.init(init_walkers=self.init_walkers,
@@ -596,7 +747,8 @@ class Manager(object):
                           boundary_conditions=self.boundary_conditions,
                           work_mapper=self.work_mapper,
                           reporters=self.reporters,
-                          continue_run=continue_run)
+                          continue_run=continue_run,
+                          n_cycles=n_cycles)
 
     def cleanup(self):
         """Perform cleanup actions for wepy configuration components.
@@ -627,6 +779,24 @@ class Manager(object):
         # cleanup the mapper
         self.work_mapper.cleanup()
 
+        # pass on any collected reports and finish any still running
+        # in the background, an error in them is raised after the
+        # reporters are cleaned up
+        report_exception = None
+        try:
+            self.flush_reports()
+
+        except Exception as exception:
+            report_exception = exception
+
+        finally:
+            self._report_buffer = []
+
+            if self._report_executor is not None:
+                self._report_executor.shutdown(wait=True)
+                self._report_executor = None
+                self._report_futures = []
+
         # cleanup things associated with the reporter
         for reporter in self.reporters:
             reporter.cleanup(runner=self.runner,
@@ -635,6 +805,37 @@ class Manager(object):
                              boundary_conditions=self.boundary_conditions,
                              reporters=self.reporters)
 
+        if report_exception is not None:
+            raise report_exception
+
+
+    @staticmethod
+    def _cycle_segment_lengths(n_cycles, segment_lengths):
+        """Iterate over the segment lengths for each cycle of a run.
+
+        Parameters
+        ----------
+        n_cycles : int
+            Number of cycles to perform.
+
+        segment_lengths : int or list of int
+            The number of steps for the runner segments of every
+            cycle, or of each cycle.
+
+        Returns
+        -------
+        cycle_segment_lengths : iterator of int
+
+        """
+
+        # the same length is used every cycle so don't make a list
+        if type(segment_lengths) == int:
+            return it.repeat(segment_lengths, n_cycles)
+
+        assert len(segment_lengths) >= n_cycles, \
+            "A segment length must be given for each cycle"
+
+        return iter(segment_lengths)
 
     def run_simulation_by_time(self, run_time, segments_length, num_workers=None):
         """Run a simulation for a certain amount of time.
@@ -683,11 +884,11 @@ class Manager(object):
         walkers = self.init_walkers
         while time.time() - start_time < run_time:
 
-            logging.info("starting cycle {} at time {}".format(cycle_idx, time.time() - start_time))
+            logging.info("starting cycle %s at time %s", cycle_idx, time.time() - start_time)
 
             walkers, filters = self.run_cycle(walkers, segments_length, cycle_idx)
 
-            logging.info("ending cycle {} at time {}".format(cycle_idx, time.time() - start_time))
+            logging.info("ending cycle %s at time %s", cycle_idx, time.time() - start_time)
 
 
             cycle_idx += 1
@@ -715,8 +916,9 @@ class Manager(object):
         n_cycles : int
             Number of cycles to perform.
 
-        segment_lengths : int
-            The number of steps for each runner segment.
+        segment_lengths : int or list of int
+            The number of steps for the runner segments of every
+            cycle, or of each cycle.
 
         num_workers : int
             The number of workers to use for the work mapper.
@@ -740,22 +942,21 @@ class Manager(object):
 
         """
 
-        self.init(num_workers=num_workers)
+        segment_lengths = self._cycle_segment_lengths(n_cycles, segment_lengths)
 
-        if type(segment_lengths) == int:
-            segment_lengths = [segment_lengths for _ in range(n_cycles)]
+        self.init(num_workers=num_workers,
+                  n_cycles=n_cycles)
 
         walkers = self.init_walkers
 
+        # this also runs the simulation monitor for each cycle
+        run_cycle = self.run_cycle
+
         # the main cycle loop
         with start_action(action_type="Simulation Loop") as simloop_cx:
             for cycle_idx in range(n_cycles):
 
-                walkers, filters = self.run_cycle(walkers, segment_lengths[cycle_idx], cycle_idx)
-
-                # run the simulation monitor to get metrics on everything
-                if self.monitor is not None:
-                    self.monitor.cycle_monitor(self, walkers)
+                walkers, filters = run_cycle(walkers, next(segment_lengths), cycle_idx)
 
         self.cleanup()
 
@@ -780,8 +981,9 @@ class Manager(object):
         n_cycles : int
             Number of cycles to perform.
 
-        segment_lengths : int
-            The number of steps for each runner segment.
+        segment_lengths : int or list of int
+            The number of steps for the runner segments of every
+            cycle, or of each cycle.
 
         num_workers : int
             The number of workers to use for the work mapper.
@@ -804,18 +1006,20 @@ class Manager(object):
 
         """
 
+        segment_lengths = self._cycle_segment_lengths(n_cycles, segment_lengths)
+
         self.init(num_workers=num_workers,
-                  continue_run=run_idx)
+                  continue_run=run_idx,
+                  n_cycles=n_cycles)
 
         walkers = self.init_walkers
-        # the main cycle loop
-        for cycle_idx in range(n_cycles):
-            walkers, filters = self.run_cycle(walkers, segment_lengths[cycle_idx], cycle_idx)
 
-            # run the simulation monitor to get metrics on everything
-            if self.monitor is not None:
-                self.monitor.cycle_monitor(self, walkers)
+        # this also runs the simulation monitor for each cycle
+        run_cycle = self.run_cycle
 
+        # the main cycle loop
+        for cycle_idx in range(n_cycles):
+            walkers, filters = run_cycle(walkers, next(segment_lengths), cycle_idx)
 
         self.cleanup()
 
@@ -859,15 +1063,11 @@ class Manager(object):
         walkers = self.init_walkers
         while time.time() - start_time < run_time:
 
-            logging.info("starting cycle {} at time {}".format(cycle_idx, time.time() - start_time))
+            logging.info("starting cycle %s at time %s", cycle_idx, time.time() - start_time)
 
             walkers, filters = self.run_cycle(walkers, segments_length, cycle_idx)
 
-            logging.info("ending cycle {} at time {}".format(cycle_idx, time.time() - start_time))
-
-            # run the simulation monitor to get metrics on everything
-            if self.monitor is not None:
-                self.monitor.cycle_monitor(self, walkers)
+            logging.info("ending cycle %s at time %s", cycle_idx, time.time() - start_time)
 
             cycle_idx += 1
 
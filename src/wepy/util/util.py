@@ -52,23 +52,21 @@ def traj_box_vectors_to_lengths_angles(traj_box_vectors):
 
     """
 
-    traj_unitcell_lengths = []
-    for basis in traj_box_vectors:
-        traj_unitcell_lengths.append(np.array([np.linalg.norm(frame_v) for frame_v in basis]))
+    traj_box_vectors = np.asarray(traj_box_vectors)
 
-    traj_unitcell_lengths = np.array(traj_unitcell_lengths)
+    # the lengths of each box vector for all of the frames at once
+    traj_unitcell_lengths = np.linalg.norm(traj_box_vectors, axis=2)
 
-    traj_unitcell_angles = []
-    for vs in traj_box_vectors:
+    # the angles between the pairs of vectors (0,1), (1,2), and (2,0)
+    # for all of the frames at once
+    first_idxs = [0, 1, 2]
+    second_idxs = [1, 2, 0]
+    dots = np.einsum('nij,nij->ni',
+                     traj_box_vectors[:, first_idxs],
+                     traj_box_vectors[:, second_idxs])
 
-        angles = np.array([np.degrees(
-                            np.arccos(np.dot(vs[i], vs[j])/
-                                      (np.linalg.norm(vs[i]) * np.linalg.norm(vs[j]))))
-                           for i, j in [(0,1), (1,2), (2,0)]])
-
-        traj_unitcell_angles.append(angles)
-
-    traj_unitcell_angles = np.array(traj_unitcell_angles)
+    traj_unitcell_angles = np.degrees(np.arccos(
+        dots / (traj_unitcell_lengths[:, first_idxs] * traj_unitcell_lengths[:, second_idxs])))
 
     return traj_unitcell_lengths, traj_unitcell_angles
 
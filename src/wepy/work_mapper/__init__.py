@@ -39,6 +39,10 @@ simple test systems) you can use the reference implementation
 (wepy.work_mapper.mapper.Mapper) which is basically just a wrapper
 around a for-loop.
 
+For CPU bound runners with cheaply serializable walkers the
+wepy.work_mapper.mapper.PoolMapper runs segments on a persistent pool
+of worker processes.
+
 This sub-module provides reference implementations and/or abstract
 base classes for a few interfaces.
 
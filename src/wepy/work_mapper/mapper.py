@@ -4,9 +4,13 @@ wepy simulation cycles.
 
 """
 import sys
+import os
+import itertools as it
 import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 import queue as pyq
 import traceback
+import pickle
 import time
 from warnings import warn
 import signal
@@ -95,6 +99,37 @@ class ABCMapper(object):
 
 
 
+def _iter_call_args(args, kwargs):
+    """Generate the args and kwargs for each call of a mapped function
+    from iterables of them, without expanding them into lists first.
+
+    Parameters
+    ----------
+    args : list of iterables
+        The positional arguments for each call.
+
+    kwargs : dict of str : iterable
+        The key-word arguments for each call.
+
+    Yields
+    ------
+    call_args : tuple
+
+    call_kwargs : dict of str : value
+
+    """
+
+    keys = list(kwargs.keys())
+
+    # without any kwargs there is nothing to zip them from
+    if len(keys) > 0:
+        kwarg_values = zip(*[kwargs[key] for key in keys])
+    else:
+        kwarg_values = it.repeat(())
+
+    for call_args, call_kwarg_values in zip(zip(*args), kwarg_values):
+        yield call_args, dict(zip(keys, call_kwarg_values))
+
 class Mapper(ABCMapper):
     """Basic non-parallel reference implementation of a mapper."""
 
@@ -136,19 +171,11 @@ class Mapper(ABCMapper):
 
         """
 
-        # expand the generators for the args and kwargs
-        args = [list(arg) for arg in args]
-        kwargs = {key : list(kwarg) for key, kwarg in kwargs.items()}
-
         segment_times = []
         results = []
-        for arg_idx in range(len(args[0])):
+        for call_args, call_kwargs in _iter_call_args(args, kwargs):
             start = time.time()
 
-            # get just the args for this call to func
-            call_args = [arg[arg_idx] for arg in args]
-            call_kwargs = {key : value[arg_idx] for key, value in kwargs.items()}
-
             # run the task, catch any errors and reraise as a
             # TaskException to satisfy the pattern
             try:
@@ -367,6 +394,239 @@ class ABCWorkerMapper(ABCMapper):
         return Task(self._func, *args, **kwargs)
 
 
+_pool_segment_func = None
+"""The segment function of the current map in a pool worker process."""
+
+_pool_segment_func_map_idx = None
+"""The index of the map the pool worker segment function is for."""
+
+def _run_pool_task(map_idx, segment_func_pickle, args, kwargs):
+    """Run a task in a pool worker process.
+
+    Must be at module level so it can be pickled and sent to the
+    workers of a process pool.
+
+    The segment function is only unpickled for the first task of each
+    map a worker runs.
+
+    Parameters
+    ----------
+    map_idx : int
+        Index of the map call this task is part of.
+
+    segment_func_pickle : bytes
+        The pickled segment function for the map.
+
+    args : tuple
+        The arguments to the segment function.
+
+    kwargs : dict of str : value
+        The key-word arguments to the segment function.
+
+    Returns
+    -------
+    pid : int
+        Process ID of the worker that ran the task.
+
+    task_time : float
+        Time in seconds it took to run the task.
+
+    result
+        Result of running the task.
+
+    """
+
+    global _pool_segment_func, _pool_segment_func_map_idx
+
+    if _pool_segment_func_map_idx != map_idx:
+        _pool_segment_func = pickle.loads(segment_func_pickle)
+        _pool_segment_func_map_idx = map_idx
+
+    task = Task(_pool_segment_func, *args, **kwargs)
+
+    start = time.time()
+
+    try:
+        result = task()
+
+    except Exception as task_exception:
+
+        # get the traceback for the exception
+        tb = sys.exc_info()[2]
+
+        msg = "Exception '{}({})' caught in a task.".format(
+                               type(task_exception).__name__, task_exception)
+        traceback_log_msg = \
+            """Traceback:
+--------------------------------------------------------------------------------
+{}
+--------------------------------------------------------------------------------
+            """.format(''.join(traceback.format_exception(
+                type(task_exception), task_exception, tb)),
+            )
+
+        logging.critical(msg + '\n' + traceback_log_msg)
+
+        raise TaskException("Error occured during task execution, recovery not possible.",
+                            wrapped_exception=task_exception,
+                            tb=tb)
+
+    end = time.time()
+
+    return os.getpid(), end - start, result
+
+class PoolMapper(ABCWorkerMapper):
+    """Work mapper implementation using a persistent pool of worker
+    processes.
+
+    The pool is a `concurrent.futures.ProcessPoolExecutor` which is
+    started once on `init` and shut down on `cleanup`, so the cost of
+    starting the processes is not paid every cycle.
+
+    The segment function (and thus the runner) and the walkers are
+    pickled and sent to the worker processes, so this is best suited
+    for CPU bound runners with cheaply serializable state. For GPU
+    runners see the WorkerMapper.
+
+    Because worker processes may be spawned, scripts using this mapper
+    should protect their entry point with an `if __name__ ==
+    '__main__':` block.
+
+    """
+
+    CHUNKS_PER_WORKER = 4
+    """The number of chunks of tasks each worker receives per map when
+    no explicit chunksize is given."""
+
+    def __init__(self,
+                 num_workers=None,
+                 segment_func=None,
+                 chunksize=None,
+                 cache_segment_func=False,
+                 **kwargs):
+        """Constructor for PoolMapper.
+
+        Parameters
+        ----------
+        num_workers : int
+            The number of worker processes to spawn.
+
+        segment_func : callable, optional
+            Set a default segment_func. Typically set at runtime.
+
+        chunksize : int, optional
+            The number of tasks sent to a worker at a time. If not
+            given it is chosen so each worker gets CHUNKS_PER_WORKER
+            chunks per map.
+
+        cache_segment_func : bool, optional
+            If True workers keep using the segment function (and
+            runner) they already have as long as it pickles the same as
+            in the last map, so any state the runner builds up in a
+            worker, e.g. a simulation context, is kept between
+            cycles. Only use this with runners that don't depend on
+            being fresh for every cycle.
+
+        """
+
+        super().__init__(num_workers=num_workers,
+                         segment_func=segment_func,
+                         **kwargs)
+
+        self._chunksize = chunksize
+        self._cache_segment_func = cache_segment_func
+
+    def _task_chunksize(self, num_tasks):
+        """The chunksize to use for mapping over a number of tasks."""
+
+        if self._chunksize is not None:
+            return self._chunksize
+
+        return max(1, num_tasks // (self.num_workers * self.CHUNKS_PER_WORKER))
+
+    def init(self, num_workers=None, segment_func=None,
+             **kwargs):
+        """Runtime initialization and starting of the process pool.
+
+        Parameters
+        ----------
+        num_workers : int
+            The number of worker processes to spawn
+
+        segment_func : callable implementing the Runner.run_segment interface
+
+        """
+
+        super().init(num_workers=num_workers,
+                     segment_func=segment_func,
+                     **kwargs)
+
+        self._executor = ProcessPoolExecutor(max_workers=self.num_workers,
+                                             mp_context=self._mp_ctx)
+
+        # worker indices are assigned to process IDs as they are seen
+        self._worker_idxs = {}
+
+        self._map_idx = 0
+        self._segment_func_pickle = None
+
+    def cleanup(self, **kwargs):
+        """Runtime post-simulation tasks.
+
+        Shuts down the process pool.
+
+        """
+
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+        super().cleanup(**kwargs)
+
+    def map(self, *args, **kwargs):
+        # docstring in superclass
+
+        tasks_args, tasks_kwargs = [], []
+        for call_args, call_kwargs in _iter_call_args(args, kwargs):
+            tasks_args.append(call_args)
+            tasks_kwargs.append(call_kwargs)
+
+        num_tasks = len(tasks_args)
+
+        # the segment function (and thus the runner) can change
+        # between cycles so it is sent with each map, but pickled only
+        # once here instead of with every task. Each chunk of tasks
+        # carries the same bytes which are only unpickled once per
+        # worker.
+        segment_func_pickle = pickle.dumps(self._func)
+
+        # workers only reload the segment function for a new map
+        # index, so keep it if the function hasn't changed and we are
+        # caching them
+        if not (self._cache_segment_func and
+                segment_func_pickle == self._segment_func_pickle):
+
+            self._map_idx += 1
+            self._segment_func_pickle = segment_func_pickle
+
+        self._worker_segment_times = {i : [] for i in range(self.num_workers)}
+
+        results = []
+        for pid, task_time, result in self._executor.map(
+                _run_pool_task,
+                it.repeat(self._map_idx, num_tasks),
+                it.repeat(segment_func_pickle, num_tasks),
+                tasks_args,
+                tasks_kwargs,
+                chunksize=self._task_chunksize(num_tasks)):
+
+            worker_idx = self._worker_idxs.setdefault(pid, len(self._worker_idxs))
+            self._worker_segment_times.setdefault(worker_idx, []).append(task_time)
+
+            results.append(result)
+
+        return results
+
+
 # ----------------------------------
 # everything below this logically belongs in worker.py and should be imported from there
 
@@ -391,6 +651,10 @@ class WorkerMapper(ABCWorkerMapper):
     processes which watch a task queue of walker segments.
     """
 
+    RESULT_POLL_TIMEOUT = 0.1
+    """Seconds to wait for a result to arrive before checking the
+    exception queue again while mapping."""
+
     def __init__(self,
                  num_workers=None,
                  worker_type=None,
@@ -717,16 +981,17 @@ class WorkerMapper(ABCWorkerMapper):
                     raise exception
 
 
-            # attempt to get something off of the results queue
+            # wait for something to come off of the results queue, but
+            # not so long that errors aren't noticed
             try:
-                result = self._result_queue.get_nowait()
+                result = self._result_queue.get(timeout=self.RESULT_POLL_TIMEOUT)
             except pyq.Empty:
                 pass
 
             # if we get something handle it
             else:
 
-                logging.info("Retrieved result: {}".format(result))
+                logging.info("Retrieved result: %s", result)
                 results.append(result)
 
                 # reduce the counter so we know when we are done
@@ -763,6 +1028,10 @@ class Worker(mp.Process):
     """A string formatting template to identify worker processes in
     logs. The field will be filled with the worker index."""
 
+    TASK_POLL_TIMEOUT = 0.1
+    """Seconds to wait for a task to arrive before checking the
+    interrupt channel again."""
+
     def __init__(self, worker_idx,
                  task_queue,
                  result_queue,
@@ -991,9 +1260,9 @@ class Worker(mp.Process):
 
             # get the next task
             try:
-                 task_idx, next_task = self._task_queue.get(block=False, timeout=None)
+                 task_idx, next_task = self._task_queue.get(timeout=self.TASK_POLL_TIMEOUT)
 
-                 logging.debug("{}: Got task {}".format(self.name, task_idx))
+                 logging.debug("%s: Got task %s", self.name, task_idx)
 
             except pyq.Empty:
 
@@ -1018,8 +1287,8 @@ class Worker(mp.Process):
             # the queue; an Ellipsis indicates continue the loop
             elif next_task is not Ellipsis:
 
-                logging.info('{}; task_idx : {}; args : {} '.format(
-                    self.name, task_idx, next_task.args))
+                logging.info('%s; task_idx : %s; args : %s ',
+                             self.name, task_idx, next_task.args)
 
                 # run the task
                 start = time.time()
@@ -1029,8 +1298,8 @@ class Worker(mp.Process):
                 end = time.time()
                 task_time = end - start
 
-                logging.info('{}: task_idx : {}; COMPLETED in {} s'.format(
-                    self.name, task_idx, task_time))
+                logging.info('%s: task_idx : %s; COMPLETED in %s s',
+                             self.name, task_idx, task_time)
 
                 # put the results into the results queue with it's task
                 # index so we can sort them later
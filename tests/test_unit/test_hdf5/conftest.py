@@ -0,0 +1,148 @@
+"""Fixtures for generating small WepyHDF5 files with known data."""
+
+import json
+
+import numpy as np
+import pytest
+
+from wepy.hdf5 import WepyHDF5
+from wepy.walker import Walker, WalkerState
+
+N_ATOMS = 5
+N_WALKERS = 4
+N_CYCLES = 7
+
+# the sparse velocities are saved every this many cycles
+VELOCITIES_CYCLE_STEP = 2
+
+ALT_REPS = {'sub' : [0, 1]}
+
+UNITS = {'positions' : 'nanometer'}
+
+DECISION_ENUM = {'NOTHING' : 1, 'CLONE' : 2, 'SQUASH' : 3, 'KEEP_MERGE' : 4}
+
+def gen_topology(n_atoms=N_ATOMS):
+
+    atoms = [{'index' : i, 'name' : 'Ar', 'element' : 'Ar'}
+             for i in range(n_atoms)]
+
+    return json.dumps({'chains' : [{'index' : 0,
+                                    'residues' : [{'index' : 0,
+                                                   'name' : 'AR',
+                                                   'resSeq' : 0,
+                                                   'segmentID' : '',
+                                                   'atoms' : atoms}]}],
+                       'bonds' : []})
+
+def gen_frame(rng, cycle_idx, n_atoms=N_ATOMS):
+    """Trajectory field data for the single frame of a cycle."""
+
+    frame = {'positions' : rng.random((1, n_atoms, 3)),
+             'box_vectors' : np.eye(3)[np.newaxis],
+             'alt_reps/sub' : rng.random((1, len(ALT_REPS['sub']), 3))}
+
+    if cycle_idx % VELOCITIES_CYCLE_STEP == 0:
+        frame['velocities'] = rng.random((1, n_atoms, 3))
+
+    return frame
+
+class RunData():
+    """The data written for each trajectory of a run, to compare
+    against what is read back."""
+
+    def __init__(self, n_walkers):
+
+        self.fields = [{} for _ in range(n_walkers)]
+        self.velocities_cycle_idxs = [[] for _ in range(n_walkers)]
+
+    def add(self, traj_idx, cycle_idx, frame):
+
+        traj_fields = self.fields[traj_idx]
+        for field, values in frame.items():
+            if field in traj_fields:
+                traj_fields[field] = np.concatenate([traj_fields[field], values])
+            else:
+                traj_fields[field] = values
+
+        if 'velocities' in frame:
+            self.velocities_cycle_idxs[traj_idx].append(cycle_idx)
+
+def write_cycles(wepy_h5, rng, run_data, run_idx, cycle_idxs):
+    """Extend every trajectory of a run with a frame for each cycle,
+    as a reporter does."""
+
+    for cycle_idx in cycle_idxs:
+        for traj_idx in range(len(run_data.fields)):
+
+            frame = gen_frame(rng, cycle_idx)
+
+            if traj_idx in wepy_h5.run_traj_idxs(run_idx):
+                wepy_h5.extend_traj(run_idx, traj_idx, frame)
+            else:
+                sparse_idxs = {'velocities' : [cycle_idx]} if 'velocities' in frame else {}
+                wepy_h5.add_traj(run_idx, frame, sparse_idxs=sparse_idxs)
+
+            run_data.add(traj_idx, cycle_idx, frame)
+
+@pytest.fixture
+def gen_wepy_h5(tmp_path):
+    """Factory for a closed WepyHDF5 file with a single run, along
+    with the data written for it.
+
+    Keyword arguments are passed to the WepyHDF5 constructor.
+    """
+
+    rng = np.random.default_rng(0)
+
+    def gen(n_cycles=N_CYCLES, n_walkers=N_WALKERS, name='test.wepy.h5', **kwargs):
+
+        wepy_h5 = WepyHDF5(str(tmp_path / name), mode='w',
+                           topology=gen_topology(),
+                           units=UNITS,
+                           sparse_fields=['velocities'],
+                           alt_reps=ALT_REPS,
+                           **kwargs)
+
+        # so reopening it doesn't truncate it again
+        wepy_h5.set_mode('r+')
+
+        init_walkers = [Walker(WalkerState(positions=rng.random((N_ATOMS, 3)),
+                                           box_vectors=np.eye(3)),
+                               1 / n_walkers)
+                        for _ in range(n_walkers)]
+
+        run_data = RunData(n_walkers)
+
+        with wepy_h5:
+
+            run_grp = wepy_h5.new_run(init_walkers)
+            run_idx = run_grp.attrs['run_idx']
+
+            wepy_h5.init_run_fields_resampling_decision(run_idx, DECISION_ENUM)
+
+            write_cycles(wepy_h5, rng, run_data, run_idx, list(range(n_cycles)))
+
+        run_data.init_walkers = init_walkers
+        run_data.n_cycles = n_cycles
+
+        # the settings the file was created with
+        run_data.topology = gen_topology()
+        run_data.units = UNITS
+        run_data.alt_reps = ALT_REPS
+        run_data.decision_enum = DECISION_ENUM
+
+        return wepy_h5, run_data
+
+    return gen
+
+@pytest.fixture
+def extend_cycles():
+    """Function extending every trajectory of a run of an open file
+    with frames for more cycles, adding them to its run data."""
+
+    rng = np.random.default_rng(1)
+
+    def extend(wepy_h5, run_data, cycle_idxs, run_idx=0):
+        write_cycles(wepy_h5, rng, run_data, run_idx, cycle_idxs)
+
+    return extend
@@ -0,0 +1,148 @@
+import numpy as np
+
+POSITIONS_PATH = 'runs/0/trajectories/{}/positions'
+
+def n_disk_frames(wepy_h5, traj_idx=0):
+    """Number of frames of the positions actually written to the file."""
+
+    return wepy_h5.h5[POSITIONS_PATH.format(traj_idx)].shape[0]
+
+def check_run_data(wepy_h5, run_data):
+
+    for traj_idx, traj_fields in enumerate(run_data.fields):
+
+        for field in ('positions', 'box_vectors', 'alt_reps/sub'):
+            assert np.array_equal(wepy_h5.get_traj_field(0, traj_idx, field),
+                                  traj_fields[field])
+
+        assert np.array_equal(
+            wepy_h5.get_traj_field(0, traj_idx, 'velocities', masked=False),
+            traj_fields['velocities'])
+
+        assert list(wepy_h5.get_traj_field_cycle_idxs(0, traj_idx, 'velocities')) == \
+            run_data.velocities_cycle_idxs[traj_idx]
+
+        assert wepy_h5.get_traj_field(0, traj_idx, 'weights').shape[0] == \
+            traj_fields['positions'].shape[0]
+
+class TestBufferedWrites():
+
+    def test_frames_buffered(self, gen_wepy_h5, extend_cycles):
+
+        wepy_h5, run_data = gen_wepy_h5()
+        n_cycles, n_walkers = run_data.n_cycles, len(run_data.fields)
+
+        with wepy_h5:
+
+            with wepy_h5.buffered_writes(n=None):
+
+                extend_cycles(wepy_h5, run_data, range(n_cycles, n_cycles + 3))
+
+                # nothing is written in the block
+                for traj_idx in range(n_walkers):
+                    assert n_disk_frames(wepy_h5, traj_idx) == n_cycles
+
+            # everything is written at the end of it
+            for traj_idx in range(n_walkers):
+                assert n_disk_frames(wepy_h5, traj_idx) == n_cycles + 3
+
+            check_run_data(wepy_h5, run_data)
+
+    def test_flush_nth_extension(self, gen_wepy_h5, extend_cycles):
+
+        wepy_h5, run_data = gen_wepy_h5()
+        n_cycles, n_walkers = run_data.n_cycles, len(run_data.fields)
+
+        with wepy_h5:
+
+            with wepy_h5.buffered_writes(n=3):
+
+                extend_cycles(wepy_h5, run_data, [n_cycles, n_cycles + 1])
+
+                assert n_disk_frames(wepy_h5) == n_cycles
+
+                # the first dataset to get its third extension writes
+                # out everything buffered so far
+                extend_cycles(wepy_h5, run_data, [n_cycles + 2])
+
+                for traj_idx in range(n_walkers):
+                    assert n_disk_frames(wepy_h5, traj_idx) >= n_cycles + 2
+                    assert wepy_h5.num_traj_frames(0, traj_idx) == n_cycles + 3
+
+            check_run_data(wepy_h5, run_data)
+
+    def test_reads_see_pending(self, gen_wepy_h5, extend_cycles):
+
+        wepy_h5, run_data = gen_wepy_h5()
+        n_cycles, n_walkers = run_data.n_cycles, len(run_data.fields)
+
+        with wepy_h5:
+
+            with wepy_h5.buffered_writes(n=None):
+
+                extend_cycles(wepy_h5, run_data, [n_cycles, n_cycles + 1])
+
+                positions = run_data.fields[0]['positions']
+
+                assert wepy_h5.num_traj_frames(0, 0) == n_cycles + 2
+
+                # the last pending frame can be read
+                assert np.array_equal(
+                    wepy_h5.get_traj_field(0, 0, 'positions', frames=[n_cycles + 1]),
+                    positions[[n_cycles + 1]])
+
+                assert np.array_equal(wepy_h5.get_traj_field(0, 0, 'positions'),
+                                      positions)
+
+                chunk_frames = np.concatenate(
+                    [frame_idxs for frame_idxs, _ in
+                     wepy_h5.iter_traj_field_chunks(0, 0, 'positions')])
+                assert np.array_equal(chunk_frames, np.arange(n_cycles + 2))
+
+                # the velocities of the pending frames are masked
+                # properly
+                velocities = wepy_h5.get_traj_field(0, 0, 'velocities')
+                assert velocities.shape[0] == n_cycles + 2
+                assert list(np.flatnonzero(~velocities.mask[:, 0, 0])) == \
+                    run_data.velocities_cycle_idxs[0]
+
+                # only the trajectory that was read was written out
+                assert n_disk_frames(wepy_h5, 1) == n_cycles
+
+            check_run_data(wepy_h5, run_data)
+
+    def test_pending_sparse_idxs(self, gen_wepy_h5, extend_cycles):
+
+        wepy_h5, run_data = gen_wepy_h5()
+        n_cycles, n_walkers = run_data.n_cycles, len(run_data.fields)
+
+        with wepy_h5:
+
+            # the sparse frames are assigned their cycles from the
+            # number of frames including the pending ones
+            with wepy_h5.buffered_writes(n=None):
+
+                extend_cycles(wepy_h5, run_data, range(n_cycles, n_cycles + 5))
+
+                assert wepy_h5.num_traj_frames(0, 2) == n_cycles + 5
+
+            check_run_data(wepy_h5, run_data)
+
+    def test_flush_on_close(self, gen_wepy_h5, extend_cycles):
+
+        wepy_h5, run_data = gen_wepy_h5()
+        n_cycles, n_walkers = run_data.n_cycles, len(run_data.fields)
+
+        with wepy_h5.buffered_writes(n=None):
+
+            with wepy_h5:
+                extend_cycles(wepy_h5, run_data, [n_cycles, n_cycles + 1])
+
+            assert wepy_h5.closed
+
+        with wepy_h5:
+
+            for traj_idx in range(n_walkers):
+                assert n_disk_frames(wepy_h5, traj_idx) == n_cycles + 2
+
+            check_run_data(wepy_h5, run_data)
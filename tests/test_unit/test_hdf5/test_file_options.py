@@ -0,0 +1,41 @@
+import warnings
+
+import h5py
+import pytest
+
+class TestOldH5py():
+
+    @pytest.fixture(autouse=True)
+    def old_h5py(self, monkeypatch):
+        monkeypatch.setattr(h5py.version, 'version_tuple', (2, 10, 0))
+
+    @pytest.mark.parametrize('kwargs',
+                             [{'page_buf_size' : 1024**2},
+                              {'fs_strategy' : 'fsm'},
+                              {'fs_page_size' : 1024**2}])
+    def test_ignored_warns(self, gen_wepy_h5, kwargs):
+
+        with pytest.warns(RuntimeWarning, match=list(kwargs.keys())[0]):
+            wepy_h5, run_data = gen_wepy_h5(**kwargs)
+
+        # the file is still usable
+        with wepy_h5:
+            assert wepy_h5.num_run_cycles(0) == run_data.n_cycles
+
+    def test_defaults_silent(self, gen_wepy_h5):
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            gen_wepy_h5()
+
+def test_page_buf_size(gen_wepy_h5):
+
+    if h5py.version.version_tuple < (3, 3):
+        pytest.skip("page_buf_size needs h5py 3.3 or later")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        wepy_h5, run_data = gen_wepy_h5(page_buf_size=4 * 1024**2)
+
+    with wepy_h5:
+        assert wepy_h5.num_run_cycles(0) == run_data.n_cycles
@@ -0,0 +1,100 @@
+import h5py
+import numpy as np
+import pytest
+
+from wepy.hdf5 import FORMAT_VERSION
+
+# the type of the object at each path in the file for each layout
+LAYOUTS = {
+    1 : {'topology' : h5py.Dataset,
+         '_settings/field_feature_shapes' : h5py.Group,
+         '_settings/field_feature_dtypes' : h5py.Group,
+         '_settings/alt_reps_idxs' : h5py.Group,
+         'units' : h5py.Group,
+         'runs/0/init_walkers/0' : h5py.Group,
+         'runs/0/decision/CLONE' : h5py.Dataset},
+    2 : {'topology' : h5py.Dataset,
+         '_settings/fields_meta' : h5py.Dataset,
+         '_settings/alt_reps_idxs' : h5py.Dataset,
+         'units' : h5py.Dataset,
+         'runs/0/init_walkers/weights' : h5py.Dataset,
+         'runs/0/decision/_enum' : h5py.Dataset},
+}
+
+@pytest.mark.parametrize('format_version', [1, 2])
+class TestFormatVersion():
+
+    def test_layout(self, gen_wepy_h5, format_version):
+
+        wepy_h5, run_data = gen_wepy_h5(format_version=format_version)
+
+        with h5py.File(wepy_h5.filename, 'r') as h5:
+
+            assert h5['_settings'].attrs['format_version'] == format_version
+
+            for path, h5_type in LAYOUTS[format_version].items():
+                assert isinstance(h5[path], h5_type)
+
+            # the version 1 topology is a string not a byte array
+            assert (h5['topology'].shape == ()) == (format_version == 1)
+
+    def test_read(self, gen_wepy_h5, format_version):
+
+        wepy_h5, run_data = gen_wepy_h5(format_version=format_version)
+
+        with wepy_h5:
+
+            assert wepy_h5.format_version == format_version
+
+            assert wepy_h5.topology == run_data.topology
+            assert wepy_h5.units == run_data.units
+            assert {name : list(idxs) for name, idxs in wepy_h5.alt_reps_idxs.items()} == \
+                run_data.alt_reps
+
+            assert tuple(wepy_h5.field_feature_shapes['positions']) == (5, 3)
+            assert wepy_h5.field_feature_dtypes['positions'] == np.float64
+            assert wepy_h5.field_feature_shapes['alt_reps/sub'] is None
+
+            assert wepy_h5.decision_enum(0) == run_data.decision_enum
+
+            assert wepy_h5.num_init_walkers(0) == len(run_data.init_walkers)
+            init_fields = wepy_h5.initial_walker_fields(0, ['positions', 'weights'])
+            assert np.array_equal(init_fields['positions'],
+                                  [walker.state['positions']
+                                   for walker in run_data.init_walkers])
+            assert np.array_equal(init_fields['weights'][:, 0],
+                                  [walker.weight for walker in run_data.init_walkers])
+
+            for traj_idx, traj_fields in enumerate(run_data.fields):
+                assert np.array_equal(wepy_h5.get_traj_field(0, traj_idx, 'positions'),
+                                      traj_fields['positions'])
+                assert np.array_equal(wepy_h5.get_traj_field(0, traj_idx, 'alt_reps/sub'),
+                                      traj_fields['alt_reps/sub'])
+
+    def test_new_runs(self, gen_wepy_h5, format_version):
+
+        wepy_h5, run_data = gen_wepy_h5(format_version=format_version)
+
+        # runs added later have the layout of the file
+        with wepy_h5:
+
+            run_idx = wepy_h5.new_run(run_data.init_walkers).attrs['run_idx']
+            wepy_h5.init_run_fields_resampling_decision(run_idx, run_data.decision_enum)
+
+            packed = isinstance(wepy_h5.init_walkers_grp(run_idx).get('weights'),
+                                h5py.Dataset)
+            assert packed == (format_version >= 2)
+
+            assert wepy_h5.decision_enum(run_idx) == run_data.decision_enum
+
+def test_default_version(gen_wepy_h5):
+
+    wepy_h5, run_data = gen_wepy_h5()
+
+    with wepy_h5:
+        assert wepy_h5.format_version == FORMAT_VERSION
+
+def test_bad_version(gen_wepy_h5):
+
+    with pytest.raises(AssertionError):
+        gen_wepy_h5(format_version=3)
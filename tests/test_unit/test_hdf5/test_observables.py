@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+class TestAppendRunObservable():
+
+    def test_append(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+        n_walkers = len(run_data.fields)
+
+        rng = np.random.default_rng(2)
+        first = rng.random((n_walkers, 3, 2))
+        second = rng.random((n_walkers, 2, 2))
+
+        with wepy_h5:
+
+            # the first call creates the datasets
+            wepy_h5.append_run_observable(0, 'obs', first)
+
+            assert 'observables/obs' in wepy_h5.traj(0, 0)
+
+            wepy_h5.append_run_observable(0, 'obs', second)
+
+        with wepy_h5:
+            for traj_idx in range(n_walkers):
+                assert np.array_equal(
+                    wepy_h5.get_traj_field(0, traj_idx, 'observables/obs'),
+                    np.concatenate([first[traj_idx], second[traj_idx]]))
+
+    def test_buffered(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+        n_walkers = len(run_data.fields)
+
+        values = np.arange(n_walkers * 4, dtype=float).reshape((n_walkers, 4, 1))
+
+        with wepy_h5:
+
+            # the observable is computed as the run goes, a cycle at
+            # a time
+            with wepy_h5.buffered_writes(n=None):
+                for cycle_i in range(4):
+                    wepy_h5.append_run_observable(0, 'obs', values[:, cycle_i:cycle_i + 1])
+
+            for traj_idx in range(n_walkers):
+                assert np.array_equal(
+                    wepy_h5.get_traj_field(0, traj_idx, 'observables/obs'),
+                    values[traj_idx])
+
+    def test_wrong_n_trajs(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+            with pytest.raises(AssertionError):
+                wepy_h5.append_run_observable(0, 'obs', np.ones((len(run_data.fields) - 1, 1)))
@@ -0,0 +1,237 @@
+import h5py
+import numpy as np
+import pytest
+
+import wepy.hdf5
+from wepy.hdf5 import _read_frames_bulk, _masked_frames
+
+N_FRAMES = 100
+FEATURE_SHAPE = (3, 2)
+CHUNK_FRAMES = 4
+
+FRAME_LISTS = {
+    'single' : [42],
+    'contiguous' : list(range(10, 30)),
+    'unsorted' : [57, 3, 91, 12, 40],
+    'repeated' : [5, 70, 5, 5, 99, 70],
+    # close enough together to be read as a single span
+    'strided' : list(range(1, 60, 2)),
+    # far apart so they are read as hyperslab selections
+    'scattered' : [0, 17, 18, 19, 50, 83, 99],
+    'scattered_unsorted_repeated' : [99, 0, 50, 17, 50, 83, 0],
+}
+
+@pytest.fixture(params=['chunked', 'compressed', 'contiguous'])
+def dset(request, tmp_path):
+
+    rng = np.random.default_rng(0)
+    data = rng.random((N_FRAMES, *FEATURE_SHAPE))
+
+    h5 = h5py.File(str(tmp_path / 'frames.h5'), 'w')
+
+    if request.param == 'chunked':
+        dset = h5.create_dataset('data', data=data,
+                                 chunks=(CHUNK_FRAMES, *FEATURE_SHAPE))
+    elif request.param == 'compressed':
+        dset = h5.create_dataset('data', data=data,
+                                 chunks=(CHUNK_FRAMES, *FEATURE_SHAPE),
+                                 compression='gzip')
+    else:
+        dset = h5.create_dataset('data', data=data)
+
+    yield dset
+
+    h5.close()
+
+class TestReadFramesBulk():
+
+    @pytest.mark.parametrize('frames', list(FRAME_LISTS.values()),
+                             ids=list(FRAME_LISTS.keys()))
+    def test_frames(self, dset, frames):
+
+        data = _read_frames_bulk(dset, frames)
+
+        assert data.dtype == dset.dtype
+        assert np.array_equal(data, dset[...][frames])
+
+    @pytest.mark.parametrize('frames', [FRAME_LISTS['scattered'],
+                                        FRAME_LISTS['scattered_unsorted_repeated']],
+                             ids=['scattered', 'scattered_unsorted_repeated'])
+    def test_batched_selections(self, dset, frames, monkeypatch):
+
+        # read the runs in several batches
+        monkeypatch.setattr(wepy.hdf5, 'MAX_READ_SELECTIONS', 2)
+
+        assert np.array_equal(_read_frames_bulk(dset, frames),
+                              dset[...][frames])
+
+    def test_no_inmem_span(self, dset, monkeypatch):
+
+        # the strided frames are read as selections when the span
+        # doesn't fit in memory
+        monkeypatch.setattr(wepy.hdf5, 'MAX_INMEM_READ_BYTES', 0)
+
+        frames = FRAME_LISTS['strided']
+
+        assert np.array_equal(_read_frames_bulk(dset, frames),
+                              dset[...][frames])
+
+def test_masked_frames():
+
+    data = np.arange(6, dtype=float).reshape((2, 3))
+    present = np.array([False, True, False, True])
+
+    masked_data = _masked_frames(data, present)
+
+    assert masked_data.shape == (4, 3)
+    assert masked_data.mask.all(axis=1).tolist() == (~present).tolist()
+    assert np.array_equal(masked_data[present], data)
+
+class TestSparseFrames():
+
+    @pytest.mark.parametrize('frames', [[0], [1], [6, 2, 4], [3, 3, 0, 5],
+                                        list(range(7))],
+                             ids=['present', 'missing', 'unsorted',
+                                  'repeated', 'all'])
+    def test_masked(self, gen_wepy_h5, frames):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+
+            all_velocities = wepy_h5.get_traj_field(0, 0, 'velocities')
+            velocities = wepy_h5.get_traj_field(0, 0, 'velocities', frames=frames)
+
+        assert isinstance(velocities, np.ma.MaskedArray)
+        assert np.array_equal(velocities.mask, all_velocities.mask[frames])
+        assert np.array_equal(velocities.compressed(),
+                              all_velocities[frames].compressed())
+
+    def test_unmasked(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        frames = [6, 1, 2, 2]
+
+        with wepy_h5:
+            velocities = wepy_h5.get_traj_field(0, 0, 'velocities',
+                                                frames=frames, masked=False)
+
+        # only the values of the frames present are returned
+        cycle_idxs = run_data.velocities_cycle_idxs[0]
+        data_idxs = [cycle_idxs.index(frame) for frame in frames
+                     if frame in cycle_idxs]
+
+        assert np.array_equal(velocities,
+                              run_data.fields[0]['velocities'][data_idxs])
+
+class TestReadOut():
+
+    def test_contiguous(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        out = np.empty_like(run_data.fields[0]['positions'])
+
+        with wepy_h5:
+
+            # the same buffer is reused for each trajectory
+            for traj_idx, traj_fields in enumerate(run_data.fields):
+                positions = wepy_h5.get_traj_field(0, traj_idx, 'positions', out=out)
+
+                assert positions is out
+                assert np.array_equal(out, traj_fields['positions'])
+
+    def test_sparse(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        velocities = run_data.fields[0]['velocities']
+        out = np.empty_like(velocities)
+
+        with wepy_h5:
+
+            assert wepy_h5.get_traj_field(0, 0, 'velocities', masked=False, out=out) is out
+            assert np.array_equal(out, velocities)
+
+            out[...] = 0
+            sparse_field = wepy_h5.get_traj_field(0, 0, 'velocities', lazy=True, out=out)
+            assert np.array_equal(out, velocities)
+            assert np.array_equal(sparse_field.data, velocities)
+
+    @pytest.mark.parametrize('field_path, kwargs',
+                             [('positions', {'frames' : [0, 1]}),
+                              ('velocities', {'frames' : [0, 2], 'masked' : False}),
+                              ('velocities', {}),
+                              ('velocities', {'masked' : True})],
+                             ids=['frames', 'sparse_frames', 'masked_default', 'masked'])
+    def test_not_readable(self, gen_wepy_h5, field_path, kwargs):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        out = np.empty_like(run_data.fields[0][field_path])
+
+        with wepy_h5:
+            with pytest.raises(ValueError):
+                wepy_h5.get_traj_field(0, 0, field_path, out=out, **kwargs)
+
+    @pytest.mark.parametrize('field_path', ['positions', 'velocities'])
+    def test_wrong_shape(self, gen_wepy_h5, field_path):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        out = np.empty_like(run_data.fields[0][field_path][1:])
+
+        with wepy_h5:
+            with pytest.raises(ValueError):
+                wepy_h5.get_traj_field(0, 0, field_path, masked=False, out=out)
+
+class TestIterTrajFieldChunks():
+
+    @pytest.mark.parametrize('chunk_frames', [1, 2, 3, 7, 10])
+    def test_contiguous(self, gen_wepy_h5, chunk_frames):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+
+            wepy_h5.retune_chunks('positions', (chunk_frames, 5, 3))
+
+            blocks = list(wepy_h5.iter_traj_field_chunks(0, 1, 'positions'))
+
+        # the blocks are the whole chunks, except the last one
+        assert all(len(frame_idxs) == chunk_frames for frame_idxs, _ in blocks[:-1])
+        assert 0 < len(blocks[-1][0]) <= chunk_frames
+
+        for frame_idxs, block in blocks:
+            assert len(frame_idxs) == block.shape[0]
+
+        assert np.array_equal(np.concatenate([frame_idxs for frame_idxs, _ in blocks]),
+                              np.arange(run_data.n_cycles))
+        assert np.array_equal(np.concatenate([block for _, block in blocks]),
+                              run_data.fields[1]['positions'])
+
+    def test_sparse(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+
+            wepy_h5.retune_chunks('velocities', (3, 5, 3))
+
+            blocks = list(wepy_h5.iter_traj_field_chunks(0, 1, 'velocities'))
+
+        # the frame idxs are the cycles with values
+        assert [len(frame_idxs) for frame_idxs, _ in blocks] == [3, 1]
+        assert list(np.concatenate([frame_idxs for frame_idxs, _ in blocks])) == \
+            run_data.velocities_cycle_idxs[1]
+        assert np.array_equal(np.concatenate([block for _, block in blocks]),
+                              run_data.fields[1]['velocities'])
+
+    def test_missing_field(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+            with pytest.raises(KeyError):
+                next(wepy_h5.iter_traj_field_chunks(0, 0, 'forces'))
@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+
+import wepy.hdf5
+from wepy.hdf5 import WepyHDF5
+
+FIELD_PATHS = ('positions', 'box_vectors', 'velocities')
+
+def field_dset(wepy_h5, traj_idx, field_path):
+
+    path = 'runs/0/trajectories/{}/{}'.format(traj_idx, field_path)
+    if field_path in wepy_h5.sparse_fields:
+        path = '{}/data'.format(path)
+
+    return wepy_h5.h5[path]
+
+def read_fields(wepy_h5):
+
+    return [{field_path : wepy_h5.get_traj_field(0, traj_idx, field_path, masked=False)
+             for field_path in FIELD_PATHS}
+            for traj_idx in wepy_h5.run_traj_idxs(0)]
+
+class TestRetuneChunks():
+
+    @pytest.mark.parametrize('field_path, chunk_shape',
+                             [('positions', (1, 5, 3)),
+                              ('box_vectors', (2, 3, 3)),
+                              ('velocities', (3, 5, 3))])
+    def test_retune(self, gen_wepy_h5, field_path, chunk_shape):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+
+            old_fields = read_fields(wepy_h5)
+            old_compression = field_dset(wepy_h5, 0, field_path).compression
+
+            wepy_h5.retune_chunks(field_path, chunk_shape)
+
+            for traj_idx in wepy_h5.run_traj_idxs(0):
+                dset = field_dset(wepy_h5, traj_idx, field_path)
+                assert dset.chunks == chunk_shape
+                assert dset.compression == old_compression
+
+            # the data of the field and the others is unchanged
+            for new_fields, old_values in zip(read_fields(wepy_h5), old_fields):
+                for field, new_values in new_fields.items():
+                    assert np.array_equal(new_values, old_values[field])
+
+        # and after reopening
+        with wepy_h5:
+            for traj_idx in wepy_h5.run_traj_idxs(0):
+                assert field_dset(wepy_h5, traj_idx, field_path).chunks == chunk_shape
+
+            for new_fields, old_values in zip(read_fields(wepy_h5), old_fields):
+                for field, new_values in new_fields.items():
+                    assert np.array_equal(new_values, old_values[field])
+
+    def test_compression_kept(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+
+            old_dset = field_dset(wepy_h5, 0, 'positions')
+            filters = (old_dset.compression, old_dset.compression_opts, old_dset.shuffle)
+
+            assert old_dset.compression is not None
+
+            wepy_h5.retune_chunks('positions', (2, 5, 3))
+
+            dset = field_dset(wepy_h5, 0, 'positions')
+            assert (dset.compression, dset.compression_opts, dset.shuffle) == filters
+
+    def test_direct_chunks(self, gen_wepy_h5, monkeypatch):
+
+        written_ranges = []
+        write_direct_chunks = wepy.hdf5._write_direct_chunks
+        def spy_write_direct_chunks(dset, start, frames):
+            direct_range = write_direct_chunks(dset, start, frames)
+            written_ranges.append((dset.compression, direct_range))
+            return direct_range
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+
+            monkeypatch.setattr(wepy.hdf5, '_write_direct_chunks', spy_write_direct_chunks)
+
+            # the 7 frames are 3 whole chunks and part of one
+            wepy_h5.retune_chunks('box_vectors', (2, 3, 3))
+            assert written_ranges == [(None, (0, 6))] * len(run_data.fields)
+
+            # the compressed chunks aren't written directly
+            written_ranges.clear()
+            wepy_h5.retune_chunks('positions', (2, 5, 3))
+            assert written_ranges == [(wepy.hdf5.COMPRESSION, (0, 0))] * len(run_data.fields)
+
+            for traj_idx, traj_fields in enumerate(run_data.fields):
+                for field_path in ('positions', 'box_vectors'):
+                    assert np.array_equal(
+                        wepy_h5.get_traj_field(0, traj_idx, field_path),
+                        traj_fields[field_path])
+
+    def test_cache_cleared(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+
+            path = 'runs/0/trajectories/0/positions'
+
+            old_dset = wepy_h5._dataset(path)
+
+            wepy_h5.retune_chunks('positions', (1, 5, 3))
+
+            dset = wepy_h5._dataset(path)
+            assert dset.id != old_dset.id
+            assert dset.chunks == (1, 5, 3)
+
+            # the new dataset is the one which is extended
+            wepy_h5.extend_traj(0, 0, {'positions' : np.ones((1, 5, 3)),
+                                       'box_vectors' : np.eye(3)[np.newaxis],
+                                       'alt_reps/sub' : np.ones((1, 2, 3))})
+
+            assert field_dset(wepy_h5, 0, 'positions').shape[0] == run_data.n_cycles + 1
+
+    def test_read_mode(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        wepy_h5 = WepyHDF5(wepy_h5.filename, mode='r')
+
+        with wepy_h5:
+
+            old_chunks = field_dset(wepy_h5, 0, 'positions').chunks
+
+            with pytest.raises(AssertionError):
+                wepy_h5.retune_chunks('positions', (1, 5, 3))
+
+            assert field_dset(wepy_h5, 0, 'positions').chunks == old_chunks
@@ -0,0 +1,38 @@
+import numpy as np
+
+def positions_chunks(wepy_h5, run_idx):
+
+    return wepy_h5.h5['runs/{}/trajectories/0/positions'.format(run_idx)].chunks
+
+class TestRunNCycles():
+
+    def test_chunks(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+
+            default_chunks = positions_chunks(wepy_h5, 0)
+            assert default_chunks[0] > 3
+
+            run_grp = wepy_h5.new_run(run_data.init_walkers, n_cycles=3)
+            run_idx = run_grp.attrs['run_idx']
+
+            assert run_grp.attrs['n_cycles'] == 3
+
+        # the hint is used for trajectories added after reopening the
+        # file
+        with wepy_h5:
+
+            wepy_h5.add_traj(run_idx, {'positions' : np.ones((1, 5, 3)),
+                                       'box_vectors' : np.eye(3)[np.newaxis]})
+
+            assert positions_chunks(wepy_h5, run_idx) == (3, *default_chunks[1:])
+
+            # runs without it are chunked as usual
+            run_idx = wepy_h5.new_run(run_data.init_walkers).attrs['run_idx']
+            wepy_h5.add_traj(run_idx, {'positions' : np.ones((1, 5, 3)),
+                                       'box_vectors' : np.eye(3)[np.newaxis]})
+
+            assert positions_chunks(wepy_h5, run_idx) == default_chunks
+            assert 'n_cycles' not in wepy_h5.run(run_idx).attrs
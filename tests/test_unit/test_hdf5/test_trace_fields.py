@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+class TestCycleTraceFields():
+
+    @pytest.mark.parametrize('cycle_idx', [0, 3, 6])
+    def test_cycle(self, gen_wepy_h5, cycle_idx):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+            cycle_fields = wepy_h5.get_cycle_trace_fields(0, cycle_idx,
+                                                          ['positions', 'box_vectors'])
+
+        assert set(cycle_fields.keys()) == {'positions', 'box_vectors'}
+
+        for field, values in cycle_fields.items():
+            assert np.array_equal(values,
+                                  [traj_fields[field][cycle_idx]
+                                   for traj_fields in run_data.fields])
+
+    def test_pending(self, gen_wepy_h5, extend_cycles):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+            with wepy_h5.buffered_writes(n=None):
+
+                extend_cycles(wepy_h5, run_data, [run_data.n_cycles])
+
+                # the frames of the cycle just added are read
+                cycle_fields = wepy_h5.get_cycle_trace_fields(0, run_data.n_cycles,
+                                                              ['positions'])
+
+        assert np.array_equal(cycle_fields['positions'],
+                              [traj_fields['positions'][-1]
+                               for traj_fields in run_data.fields])
+
+class FakeComm():
+    """Stands in for the MPI communicator of one rank, for running the
+    ranks one after the other.
+
+    Without the values sent by every rank `allgather` only gives back
+    the values of this rank, otherwise it gives the values sent by
+    each rank in the same call.
+    """
+
+    def __init__(self, rank, size, gathered=None):
+        self._rank = rank
+        self._size = size
+        self.gathered = gathered
+        self.sent = []
+
+    def Get_rank(self):
+        return self._rank
+
+    def Get_size(self):
+        return self._size
+
+    def allgather(self, sendobj):
+
+        call_i = len(self.sent)
+        self.sent.append(sendobj)
+
+        if self.gathered is None:
+            return [sendobj]
+        else:
+            return [rank_sent[call_i] for rank_sent in self.gathered]
+
+CONTIG_TRACE = [(0, 2), (0, 0), (0, 5), (0, 5), (0, 6)]
+
+class TestContigTraceFields():
+
+    def test_trace(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        with wepy_h5:
+            contig_fields = wepy_h5.get_contig_trace_fields(CONTIG_TRACE, ['positions'])
+
+        frames = [frame_idx for _, frame_idx in CONTIG_TRACE]
+
+        assert contig_fields['positions'].shape == (len(CONTIG_TRACE), len(run_data.fields), 5, 3)
+        for traj_idx, traj_fields in enumerate(run_data.fields):
+            assert np.array_equal(contig_fields['positions'][:, traj_idx],
+                                  traj_fields['positions'][frames])
+
+    @pytest.mark.parametrize('n_ranks', [1, 2, 3])
+    def test_mpi(self, gen_wepy_h5, n_ranks):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        fields = ['positions', 'box_vectors']
+
+        with wepy_h5:
+
+            contig_fields = wepy_h5.get_contig_trace_fields(CONTIG_TRACE, fields)
+
+            # each rank reads its own trajectories
+            comms = [FakeComm(rank, n_ranks) for rank in range(n_ranks)]
+            for comm in comms:
+                wepy_h5.get_contig_trace_fields(CONTIG_TRACE, fields, mpi_comm=comm)
+
+            # once for each field
+            assert all(len(comm.sent) == len(fields) for comm in comms)
+
+            # the trajectories are split between the ranks
+            for field_i in range(len(fields)):
+                rank_traj_is = [[traj_i for _, traj_i, _ in comm.sent[field_i]]
+                                for comm in comms]
+                assert sorted(sum(rank_traj_is, [])) == list(range(len(run_data.fields)))
+                assert all(len(traj_is) > 0 for traj_is in rank_traj_is)
+
+            # then every rank gets all of the values
+            gathered = [comm.sent for comm in comms]
+            for rank in range(n_ranks):
+                rank_fields = wepy_h5.get_contig_trace_fields(
+                    CONTIG_TRACE, fields,
+                    mpi_comm=FakeComm(rank, n_ranks, gathered=gathered))
+
+                for field in fields:
+                    assert np.array_equal(rank_fields[field], contig_fields[field])
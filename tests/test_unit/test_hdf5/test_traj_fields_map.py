@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from wepy.hdf5 import WepyHDF5
+
+# the workers are spawned so the mapped function must be importable
+def scaled_sum(fields, scale):
+    return scale * (fields['positions'].sum(axis=(1, 2)) +
+                    fields['box_vectors'].sum(axis=(1, 2)))
+
+def expected_results(run_data, scale):
+
+    return [scale * (traj_fields['positions'].sum(axis=(1, 2)) +
+                     traj_fields['box_vectors'].sum(axis=(1, 2)))
+            for traj_fields in run_data.fields]
+
+class TestTrajFieldsMap():
+
+    @pytest.mark.parametrize('mode', ['r', 'r+'])
+    def test_n_workers(self, gen_wepy_h5, mode):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        # read only files are read by the workers, others are read
+        # here and sent to them
+        wepy_h5 = WepyHDF5(wepy_h5.filename, mode=mode)
+
+        with wepy_h5:
+
+            serial_results = list(wepy_h5.traj_fields_map(scaled_sum,
+                                                          ['positions', 'box_vectors'],
+                                                          (2.0,)))
+
+            traj_ids, results = zip(*wepy_h5.traj_fields_map(scaled_sum,
+                                                             ['positions', 'box_vectors'],
+                                                             (2.0,),
+                                                             idxs=True,
+                                                             n_workers=2))
+
+        assert list(traj_ids) == [(0, traj_idx) for traj_idx in range(len(run_data.fields))]
+
+        for result, serial_result, expected in zip(results, serial_results,
+                                                   expected_results(run_data, 2.0)):
+            assert np.allclose(result, expected)
+            assert np.array_equal(result, serial_result)
+
+    def test_traj_sel(self, gen_wepy_h5):
+
+        wepy_h5, run_data = gen_wepy_h5()
+
+        traj_sel = [(0, 3), (0, 1)]
+
+        with wepy_h5:
+            results = wepy_h5.traj_fields_map(scaled_sum,
+                                              ['positions', 'box_vectors'],
+                                              (1.0,),
+                                              traj_sel=traj_sel,
+                                              n_workers=2)
+
+        expected = expected_results(run_data, 1.0)
+
+        assert len(results) == len(traj_sel)
+        for result, (run_idx, traj_idx) in zip(results, traj_sel):
+            assert np.allclose(result, expected[traj_idx])
@@ -0,0 +1,274 @@
+from concurrent.futures import wait
+from threading import Event
+
+import pytest
+
+from wepy.walker import Walker, WalkerState
+from wepy.reporter.reporter import Reporter
+from wepy.runners.runner import NoRunner
+from wepy.resampling.resamplers.resampler import NoResampler
+from wepy.work_mapper.mapper import Mapper, PoolMapper
+from wepy.sim_manager import Manager
+
+N_WALKERS = 4
+
+def gen_walkers():
+
+    return [Walker(WalkerState(**{'num' : i}), 1/N_WALKERS)
+            for i in range(N_WALKERS)]
+
+def gen_manager(**kwargs):
+
+    return Manager(gen_walkers(),
+                   runner=NoRunner(),
+                   resampler=NoResampler(),
+                   **kwargs)
+
+def run_cycles(sim_manager, n_cycles):
+
+    walkers = sim_manager.init_walkers
+    for cycle_idx in range(n_cycles):
+        walkers, filters = sim_manager.run_cycle(walkers, 1, cycle_idx)
+
+# reporter that records the cycles it is passed and how
+class RecordingReporter(Reporter):
+
+    def __init__(self):
+        self.calls = []
+        self.init_kwargs = None
+        self.cleaned_up = False
+
+    def init(self, **kwargs):
+        self.init_kwargs = kwargs
+
+    def report(self, cycle_idx=None, **kwargs):
+        self.calls.append(('report', [cycle_idx]))
+
+    def report_batch(self, reports):
+        self.calls.append(('report_batch', [report['cycle_idx'] for report in reports]))
+
+    def cleanup(self, **kwargs):
+        self.cleaned_up = True
+
+class FailingReporter(RecordingReporter):
+
+    def __init__(self, fail_cycle_idx, release=None):
+        super().__init__()
+        self.fail_cycle_idx = fail_cycle_idx
+
+        # if given the failing report waits for this to be set
+        self.release = release
+
+    def report(self, cycle_idx=None, **kwargs):
+
+        if cycle_idx == self.fail_cycle_idx:
+            if self.release is not None:
+                self.release.wait()
+            raise RuntimeError("Reporter failed")
+
+        super().report(cycle_idx=cycle_idx, **kwargs)
+
+class TestDefaultWorkMapper():
+
+    def test_serial_mapper(self):
+
+        sim_manager = gen_manager()
+
+        sim_manager.init()
+
+        assert type(sim_manager.work_mapper) is Mapper
+
+        sim_manager.cleanup()
+
+    def test_pool_mapper(self):
+
+        sim_manager = gen_manager(work_mapper=None)
+
+        sim_manager.init(num_workers=2)
+
+        assert isinstance(sim_manager.work_mapper, PoolMapper)
+        assert sim_manager.work_mapper.num_workers == 2
+
+        executor = sim_manager.work_mapper._executor
+
+        sim_manager.cleanup()
+
+        # the process pool was shut down
+        assert sim_manager.work_mapper._executor is None
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
+
+    def test_given_mapper(self):
+
+        work_mapper = Mapper()
+
+        sim_manager = gen_manager(work_mapper=work_mapper)
+
+        sim_manager.init(num_workers=2)
+
+        assert sim_manager.work_mapper is work_mapper
+
+        sim_manager.cleanup()
+
+class TestReportBatches():
+
+    def test_batch_order(self):
+
+        reporter = RecordingReporter()
+
+        sim_manager = gen_manager(reporters=[reporter],
+                                  report_batch_size=2)
+
+        sim_manager.init()
+
+        run_cycles(sim_manager, 5)
+
+        # full batches are passed in cycle order as they are filled
+        assert reporter.calls == [('report_batch', [0, 1]),
+                                  ('report_batch', [2, 3])]
+
+        sim_manager.cleanup()
+
+        # the leftover cycle is passed on cleanup
+        assert reporter.calls == [('report_batch', [0, 1]),
+                                  ('report_batch', [2, 3]),
+                                  ('report', [4])]
+        assert reporter.cleaned_up
+
+    def test_flush_reports(self):
+
+        reporter = RecordingReporter()
+
+        sim_manager = gen_manager(reporters=[reporter],
+                                  report_batch_size=4)
+
+        sim_manager.init()
+
+        run_cycles(sim_manager, 3)
+
+        assert reporter.calls == []
+
+        sim_manager.flush_reports()
+
+        assert reporter.calls == [('report_batch', [0, 1, 2])]
+
+        # nothing is left to pass on cleanup
+        sim_manager.cleanup()
+
+        assert reporter.calls == [('report_batch', [0, 1, 2])]
+
+class TestAsyncReporting():
+
+    def test_report_order(self):
+
+        reporter = RecordingReporter()
+
+        sim_manager = gen_manager(reporters=[reporter],
+                                  async_reporting=True)
+
+        sim_manager.init()
+
+        run_cycles(sim_manager, 3)
+
+        sim_manager.flush_reports()
+
+        assert reporter.calls == [('report', [0]),
+                                  ('report', [1]),
+                                  ('report', [2])]
+
+        sim_manager.cleanup()
+
+        assert reporter.cleaned_up
+
+    def test_error_next_cycle(self):
+
+        reporter = FailingReporter(0)
+
+        sim_manager = gen_manager(reporters=[reporter],
+                                  async_reporting=True)
+
+        sim_manager.init()
+
+        run_cycles(sim_manager, 1)
+
+        # once the failed report is finished the next cycle raises it
+        wait(sim_manager._report_futures)
+
+        with pytest.raises(RuntimeError):
+            sim_manager.run_cycle(sim_manager.init_walkers, 1, 1)
+
+        # it isn't raised again and the report of the cycle is kept
+        sim_manager.cleanup()
+
+        assert reporter.calls == [('report', [1])]
+        assert reporter.cleaned_up
+
+    def test_error_at_flush(self):
+
+        # the failed report is only finished after all the cycles are
+        # run so it isn't raised by one of them
+        release = Event()
+        reporter = FailingReporter(1, release=release)
+
+        sim_manager = gen_manager(reporters=[reporter],
+                                  async_reporting=True)
+
+        sim_manager.init()
+
+        run_cycles(sim_manager, 3)
+
+        release.set()
+
+        with pytest.raises(RuntimeError):
+            sim_manager.flush_reports()
+
+        # the reports after the failed one are still run
+        sim_manager.cleanup()
+
+        assert reporter.calls == [('report', [0]),
+                                  ('report', [2])]
+        assert reporter.cleaned_up
+
+    def test_error_at_cleanup(self):
+
+        reporter = FailingReporter(2)
+
+        sim_manager = gen_manager(reporters=[reporter],
+                                  async_reporting=True)
+
+        sim_manager.init()
+
+        run_cycles(sim_manager, 3)
+
+        with pytest.raises(RuntimeError):
+            sim_manager.cleanup()
+
+        # the reporter is cleaned up anyways
+        assert reporter.cleaned_up
+
+class TestReporterInit():
+
+    def test_n_cycles(self):
+
+        reporter = RecordingReporter()
+
+        sim_manager = gen_manager(reporters=[reporter])
+
+        sim_manager.run_simulation(3, 1)
+
+        assert reporter.init_kwargs['n_cycles'] == 3
+        assert reporter.init_kwargs['continue_run'] is None
+        assert reporter.calls == [('report', [0]),
+                                  ('report', [1]),
+                                  ('report', [2])]
+
+    def test_continue_n_cycles(self):
+
+        reporter = RecordingReporter()
+
+        sim_manager = gen_manager(reporters=[reporter])
+
+        sim_manager.continue_run_simulation(0, 2, 1)
+
+        assert reporter.init_kwargs['n_cycles'] == 2
+        assert reporter.init_kwargs['continue_run'] == 0
@@ -1,4 +1,5 @@
 import multiprocessing as mp
+import pickle
 import logging
 from copy import deepcopy
 import time
@@ -6,7 +7,7 @@ import time
 import pytest
 
 from wepy.walker import Walker, WalkerState
-from wepy.work_mapper.mapper import Mapper, TaskException
+from wepy.work_mapper.mapper import Mapper, PoolMapper, TaskException, _run_pool_task
 from wepy.work_mapper.worker import Worker, WorkerMapper, WorkerException
 from wepy.work_mapper.task_mapper import TaskMapper, WalkerTaskProcess, TaskProcessException
 
@@ -76,6 +77,119 @@ class TestWorkMappers():
 
         time.sleep(1)
 
+    def test_pool_mapper(self):
+
+        mapper = PoolMapper(segment_func=task_pass,
+                            num_workers=3)
+
+        mapper.init()
+
+        results = mapper.map(gen_walkers())
+
+        assert all([res.state['num'] == TASK_PASS_ANSWER[i]
+                    for i, res in enumerate(results)])
+
+        # every task is timed for some worker
+        assert sum([len(seg_times) for seg_times
+                    in mapper.worker_segment_times.values()]) == len(ARGS)
+
+        mapper.cleanup()
+
+# segment function that keeps state in the worker process it is run in
+class CountingSegmentFunc():
+
+    def __init__(self, offset=0):
+        self.offset = offset
+        self.n_calls = 0
+
+    def __call__(self, walker):
+
+        self.n_calls += 1
+        return Walker(WalkerState(**{'num' : self.offset + self.n_calls}), walker.weight)
+
+class TestPoolMapper():
+
+    def test_chunksize(self):
+
+        mapper = PoolMapper(num_workers=3)
+
+        # each worker gets CHUNKS_PER_WORKER chunks
+        assert mapper._task_chunksize(48) == 48 // (3 * PoolMapper.CHUNKS_PER_WORKER)
+
+        # but chunks always have at least one task
+        assert mapper._task_chunksize(2) == 1
+
+        # an explicit chunksize is always used
+        mapper = PoolMapper(num_workers=3, chunksize=2)
+        assert mapper._task_chunksize(48) == 2
+
+    def test_chunked_map(self):
+
+        walkers = [Walker(WalkerState(**{'num' : i}), 0.1) for i in range(10)]
+
+        mapper = PoolMapper(segment_func=task_pass,
+                            num_workers=2,
+                            chunksize=3)
+
+        mapper.init()
+
+        results = mapper.map(walkers)
+
+        assert [res.state['num'] for res in results] == list(range(1, 11))
+
+        mapper.cleanup()
+
+    def test_run_pool_task_reload(self):
+
+        first_pickle = pickle.dumps(CountingSegmentFunc())
+        other_pickle = pickle.dumps(CountingSegmentFunc(offset=100))
+
+        walker = gen_walkers()[0]
+
+        # the segment function is only unpickled for a new map index
+        nums = []
+        for map_idx, segment_func_pickle in [(1, first_pickle),
+                                             (1, first_pickle),
+                                             (1, other_pickle),
+                                             (2, other_pickle)]:
+
+            _, _, result = _run_pool_task(map_idx, segment_func_pickle,
+                                          (walker,), {})
+            nums.append(result.state['num'])
+
+        assert nums == [1, 2, 3, 101]
+
+    @pytest.mark.parametrize('cache_segment_func', [False, True])
+    def test_cache_segment_func(self, cache_segment_func):
+
+        segment_func = CountingSegmentFunc()
+
+        mapper = PoolMapper(segment_func=segment_func,
+                            num_workers=1,
+                            cache_segment_func=cache_segment_func)
+
+        mapper.init()
+
+        first_nums = [res.state['num'] for res in mapper.map(gen_walkers())]
+        second_nums = [res.state['num'] for res in mapper.map(gen_walkers())]
+
+        assert first_nums == [1, 2, 3]
+
+        # the worker keeps the segment function from the last map
+        # only when caching
+        if cache_segment_func:
+            assert second_nums == [4, 5, 6]
+        else:
+            assert second_nums == [1, 2, 3]
+
+        # a changed segment function is always reloaded
+        segment_func.offset = 100
+        third_nums = [res.state['num'] for res in mapper.map(gen_walkers())]
+
+        assert third_nums == [101, 102, 103]
+
+        mapper.cleanup()
+
 # test that task failures are passed up properly
 def task_fail(walker):
 
@@ -127,3 +241,15 @@ class TestTaskFail():
             results = mapper.map(gen_walkers())
 
         mapper.cleanup()
+
+    def test_pool_mapper(self):
+
+        mapper = PoolMapper(segment_func=task_fail,
+                            num_workers=3)
+
+        mapper.init()
+
+        with pytest.raises(TaskException) as task_exc_info:
+            results = mapper.map(gen_walkers())
+
+        mapper.cleanup()